@@ -0,0 +1,175 @@
+# asset_cache.py
+import hashlib
+import json
+import os
+import sys
+import threading
+from PIL import Image
+from lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+
+def default_cache_dir():
+    """Per-user cache directory (%LOCALAPPDATA%\\MyWindows\\asset_cache on Windows)."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+        return os.path.join(base, "MyWindows", "asset_cache")
+    return os.path.join(os.path.expanduser("~"), ".cache", "mywindows", "asset_cache")
+
+
+class AssetCache:
+    """On-disk cache of images that are already resized and converted for display.
+
+    Entries are keyed by the hash of the source file, the target size and the DPI
+    scale, so one source can be cached at several sizes for the current display. When
+    a source is requested, its entries made from older content of the file or for
+    another DPI scale are evicted, so a display change does not leave old sizes behind.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self._lock = threading.RLock()
+        self._index = None
+        self._memory = {}  # Entries already loaded in this process
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(os.path.join(self.cache_dir, self.INDEX_FILE), "r") as f:
+                    self._index = json.load(f)
+            except (FileNotFoundError, ValueError):
+                self._index = {"sources": {}, "entries": {}}
+        return self._index
+
+    def _save_index(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        temp_path = index_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(temp_path, index_path)
+
+    def source_hash(self, source_path):
+        """Content hash of the source, rehashed only when its size or mtime changes."""
+        source_path = os.path.abspath(source_path)
+        stat = os.stat(source_path)
+        known = self._load_index()["sources"].get(source_path)
+        if known and known["mtime_ns"] == stat.st_mtime_ns and known["size"] == stat.st_size:
+            return known["sha1"]
+
+        digest = hashlib.sha1()
+        with open(source_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+
+        self._index["sources"][source_path] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha1": digest.hexdigest()}
+        return self._index["sources"][source_path]["sha1"]
+
+    def _evict_stale(self, source_path, sha1, dpi_scale):
+        """Remove the entries of this source made from an older file or for another DPI scale."""
+        entries = self._index["entries"]
+        for name, entry in list(entries.items()):
+            if entry["source"] == source_path and (entry["sha1"] != sha1 or entry.get("dpi") != dpi_scale):
+                del entries[name]
+                self._memory.pop(name, None)
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    pass
+
+    def _lookup(self, source_path, size, dpi_scale, kind, build, save, load):
+        source_path = os.path.abspath(source_path)
+        # Only the index is guarded, decoding runs unlocked so several assets can load in parallel
+        with self._lock:
+            sha1 = self.source_hash(source_path)
+            size_key = "x".join(str(int(v)) for v in size) if size else "native"
+            name = f"{sha1[:16]}_{size_key}_{dpi_scale:g}.{kind}"
+
+            if name in self._memory:
+                return self._memory[name]
+
+            self._evict_stale(source_path, sha1, dpi_scale)
+
+            cached_path = os.path.join(self.cache_dir, name)
+            is_cached = name in self._index["entries"] and os.path.exists(cached_path)
+
+        if is_cached:
+            try:
+                value = load(cached_path)
+                with self._lock:
+                    self._memory[name] = value
+                return value
+            except Exception as e:
+                print(f"Discarding unreadable cached asset '{name}': {e}")
+
+        value = build(source_path)
+        with self._lock:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                save(value, cached_path)
+                self._index["entries"][name] = {"source": source_path, "sha1": sha1, "dpi": dpi_scale, "size": size_key}
+                self._save_index()
+            except OSError as e:
+                print(f"Could not write asset cache entry '{name}': {e}")
+
+            self._memory[name] = value
+        return value
+
+    def load_scaled_image(self, source_path, size, dpi_scale=1.0, mode="RGBA"):
+        """Return the source image resized to `size` (LANCZOS) and converted to `mode`."""
+        size = (int(size[0]), int(size[1]))
+
+        def build(path):
+            with Image.open(path) as image:
+                return image.convert(mode).resize(size, Image.Resampling.LANCZOS)
+
+        def save(image, path):
+            image.save(path, format="PNG", compress_level=1)  # Favour decode speed over file size
+
+        def load(path):
+            with Image.open(path) as image:
+                image.load()
+                return image
+
+        return self._lookup(source_path, size, dpi_scale, "png", build, save, load)
+
+    def load_image_array(self, source_path, dpi_scale=1.0):
+        """Return the decoded source image as a numpy array, as plt.imread would."""
+
+        def build(path):
+            with Image.open(path) as image:
+                return np.asarray(image.convert("RGB"))
+
+        def save(array, path):
+            with open(path, "wb") as f:
+                np.save(f, array)
+
+        def load(path):
+            return np.load(path)
+
+        return self._lookup(source_path, None, dpi_scale, "npy", build, save, load)
+
+    def clear(self):
+        """Delete every cached entry."""
+        with self._lock:
+            for name in list(self._load_index()["entries"]):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except FileNotFoundError:
+                    pass
+            self._index = {"sources": {}, "entries": {}}
+            self._memory.clear()
+            self._save_index()
+
+
+_asset_cache = None
+
+def get_asset_cache():
+    """Return the process-wide asset cache."""
+    global _asset_cache
+    if _asset_cache is None:
+        _asset_cache = AssetCache()
+    return _asset_cache
@@ -0,0 +1,129 @@
+# asset_loader.py
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from PIL import Image
+from asset_cache import get_asset_cache
+from configuration_manager import get_screen_info
+from startup_profiler import profiler
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+APP_ICON_PATH = os.path.join(BASE_DIR, "tray_icons", "registry.png")
+TRACKPAD_IMAGE_PATH = os.path.join(BASE_DIR, "trackpad", "gb4p16_trackpad.jpg")
+TASKBAR_BACKGROUND_PATH = os.path.join(BASE_DIR, "taskbar", "background_image.png")
+TASKBAR_IMAGE_PATH = os.path.join(BASE_DIR, "taskbar", "taskbar.png")
+
+# The splash screen stays up until these are decoded; the view images keep loading
+# in the background and are waited for only when a view is first built
+CRITICAL_ASSETS = ("app_icon",)
+
+# Decoded at a size that depends on the display, so a display change invalidates them
+SIZED_ASSETS = ("taskbar_background", "taskbar_image")
+
+TASKBAR_RATIO = 40.55  # The taskbar image is 40.55 times wider than high
+
+
+def taskbar_preview_sizes(screen_info):
+    """Sizes of the background and (full length) taskbar images in the taskbar preview."""
+    background_width = int(screen_info.window_width * 0.8)
+    screen_ratio = screen_info.screen_width / screen_info.screen_height
+    background_height = int(background_width / screen_ratio)
+
+    taskbar_width = background_width
+    taskbar_height = int(taskbar_width / TASKBAR_RATIO)
+    return (background_width, background_height), (taskbar_width, taskbar_height)
+
+
+def _load_app_icon():
+    with Image.open(APP_ICON_PATH) as image:
+        image.load()
+        return image
+
+
+def _load_trackpad_image():
+    return get_asset_cache().load_image_array(TRACKPAD_IMAGE_PATH)
+
+
+def _load_taskbar_background():
+    screen_info = get_screen_info()
+    background_size, _ = taskbar_preview_sizes(screen_info)
+    return get_asset_cache().load_scaled_image(TASKBAR_BACKGROUND_PATH, background_size, screen_info.dpi)
+
+
+def _load_taskbar_image():
+    screen_info = get_screen_info()
+    _, taskbar_size = taskbar_preview_sizes(screen_info)
+    return get_asset_cache().load_scaled_image(TASKBAR_IMAGE_PATH, taskbar_size, screen_info.dpi)
+
+
+ASSET_LOADERS = {
+    "app_icon": _load_app_icon,
+    "trackpad_image": _load_trackpad_image,
+    "taskbar_background": _load_taskbar_background,
+    "taskbar_image": _load_taskbar_image,
+}
+
+
+class AssetLoader:
+    """Decode images on a small thread pool and hand out futures for them."""
+
+    def __init__(self, loaders=None, max_workers=3):
+        self.loaders = loaders if loaders is not None else ASSET_LOADERS
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="asset-loader")
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def _run(self, name):
+        with profiler.phase(f"decode {name}"):
+            return self.loaders[name]()
+
+    def future(self, name):
+        """Return the future for an asset, starting to load it if nobody asked for it yet."""
+        with self._lock:
+            future = self._futures.get(name)
+            if future is None:
+                future = self._executor.submit(self._run, name)
+                self._futures[name] = future
+            return future
+
+    def preload(self, names=None):
+        """Start loading the given assets (all known assets by default)."""
+        for name in (names if names is not None else self.loaders):
+            self.future(name)
+
+    def result(self, name, timeout=None):
+        """Wait for an asset and return it. Errors raised while loading are re-raised here."""
+        return self.future(name).result(timeout)
+
+    def is_ready(self, names):
+        """Check without blocking whether all the given assets finished loading."""
+        return all(self.future(name).done() for name in names)
+
+    def wait(self, names, timeout=None):
+        wait([self.future(name) for name in names], timeout=timeout)
+
+    def invalidate(self, names):
+        """Forget loaded assets (e.g. after a display change) so they are decoded again."""
+        with self._lock:
+            for name in names:
+                self._futures.pop(name, None)
+
+
+_asset_loader = None
+_asset_loader_lock = threading.Lock()
+
+def get_asset_loader():
+    """Return the process-wide asset loader."""
+    global _asset_loader
+    if _asset_loader is None:
+        with _asset_loader_lock:
+            if _asset_loader is None:
+                _asset_loader = AssetLoader()
+    return _asset_loader
+
+def start_preloading():
+    """Start decoding every known asset in the background. Safe to call more than once."""
+    loader = get_asset_loader()
+    loader.preload()
+    return loader
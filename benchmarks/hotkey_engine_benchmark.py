@@ -0,0 +1,136 @@
+"""Dispatch synthetic key events through 10, 100 and 1000 hotkey remaps.
+
+"legacy" models the previous setup: one keyboard.remap_hotkey per shortcut, so every
+key event is tested against each shortcut's combination in turn. "engine" is
+keyboards.hotkey_engine: one table lookup per event. Both are fed the same stream of
+chords (some matching a shortcut, the rest plain typing) and must fire the same
+targets. Scan codes come from the key catalogue, so the keyboard library is not needed.
+
+    python benchmarks/hotkey_engine_benchmark.py --shortcuts 10 100 1000 --events 200000
+"""
+import argparse
+import itertools
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyboards.hotkey_engine import HotkeyEngine
+from keyboards.key_catalogue import get_key_catalogue
+
+# Both sides of the plain modifiers, as keyboard.key_to_scan_codes reports them
+MODIFIER_CODES = {"ctrl": (0x1D,), "shift": (0x2A, 0x36), "alt": (0x38,), "windows": (0x5B, 0x5C)}
+
+
+def scan_codes(name):
+    if name in MODIFIER_CODES:
+        return MODIFIER_CODES[name]
+    key = get_key_catalogue().by_hook_name.get(name)
+    if key is None:
+        raise ValueError(f"Unknown key '{name}'")
+    return (key.scancode & 0xFF,)
+
+
+def make_shortcuts(count, rng):
+    catalogue = get_key_catalogue()
+    modifier_codes = {code for codes in MODIFIER_CODES.values() for code in codes}
+    # Pause (E1 1D) shares its low byte with Ctrl, so it is left out like the modifiers
+    triggers = [key.hook_name for key in catalogue.keys
+                if key.hook_name and key.scancode & 0xFF not in modifier_codes]
+    modifier_sets = [list(combination) for size in (1, 2, 3)
+                     for combination in itertools.combinations(MODIFIER_CODES, size)]
+    chords = [(modifiers, trigger) for modifiers in modifier_sets for trigger in triggers]
+    shortcuts = {}
+    for modifiers, trigger in rng.sample(chords, count):
+        shortcuts['+'.join(modifiers + [trigger])] = {
+            'modifiers': modifiers, 'key': trigger, 'to_modifiers': [], 'to_key': rng.choice(triggers)
+        }
+    return shortcuts, triggers
+
+
+def make_events(shortcuts, triggers, count, rng):
+    """(scan code, is_down) events: chords of the shortcuts mixed with plain key presses."""
+    chords = list(shortcuts.values())
+    events = []
+    while len(events) < count:
+        if rng.random() < 0.3:
+            chord = rng.choice(chords)
+            modifiers = [rng.choice(MODIFIER_CODES[name]) for name in chord['modifiers']]
+            trigger = scan_codes(chord['key'])[0]
+        else:
+            modifiers, trigger = [], scan_codes(rng.choice(triggers))[0]
+        events += [(code, True) for code in modifiers]
+        events += [(trigger, True), (trigger, False)]
+        events += [(code, False) for code in reversed(modifiers)]
+    return events
+
+
+class LegacyDispatcher:
+    """One matcher per shortcut, each checked against the pressed keys on every event."""
+
+    def __init__(self, shortcuts):
+        self.matchers = []
+        for shortcut in shortcuts.values():
+            steps = [frozenset(scan_codes(name)) for name in shortcut['modifiers'] + [shortcut['key']]]
+            self.matchers.append((steps, '+'.join(shortcut['to_modifiers'] + [shortcut['to_key']])))
+        self.pressed = set()
+
+    def process(self, scan_code, is_down):
+        if not is_down:
+            self.pressed.discard(scan_code)
+            return None
+        self.pressed.add(scan_code)
+        pressed = self.pressed
+        result = None
+        for steps, target in self.matchers:
+            if scan_code in steps[-1] and len(pressed) == len(steps) and all(pressed & step for step in steps):
+                result = target
+        return result
+
+
+def run(dispatcher, events):
+    """(fired targets, events per second, p50 and p99 latency in microseconds)."""
+    process = dispatcher.process
+    start = time.perf_counter()
+    fired = [process(scan_code, is_down) for scan_code, is_down in events]
+    elapsed = time.perf_counter() - start
+
+    latencies = []
+    clock = time.perf_counter_ns
+    for scan_code, is_down in events[:20000]:
+        before = clock()
+        process(scan_code, is_down)
+        latencies.append((clock() - before) / 1000)
+    quantiles = statistics.quantiles(latencies, n=100)
+    targets = [result for result in fired if result is not None and result is not True]
+    return targets, len(events) / elapsed, quantiles[49], quantiles[98]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shortcuts", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'shortcuts':>9}  {'dispatcher':<10}{'events/s':>14}{'p50 us':>9}{'p99 us':>9}")
+    for count in args.shortcuts:
+        rng = random.Random(args.seed)
+        shortcuts, triggers = make_shortcuts(count, rng)
+        events = make_events(shortcuts, triggers, args.events, rng)
+
+        engine = HotkeyEngine(scan_codes)
+        engine.compile(shortcuts)
+        results = {}
+        for name, dispatcher in [("legacy", LegacyDispatcher(shortcuts)), ("engine", engine)]:
+            results[name] = run(dispatcher, events)
+            _, rate, p50, p99 = results[name]
+            print(f"{count:>9}  {name:<10}{rate:>14,.0f}{p50:>9.2f}{p99:>9.2f}")
+        assert results["legacy"][0] == results["engine"][0], "dispatchers fired different targets"
+
+
+if __name__ == "__main__":
+    main()
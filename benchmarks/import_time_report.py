@@ -0,0 +1,113 @@
+"""Report the cold-start import cost of main.py per module, using `-X importtime`.
+
+The import is repeated in fresh interpreters and the fastest run is kept, so the
+numbers are reproducible on a busy machine. The script exits with status 1 when a
+budget from import_budget.json is exceeded or a deferred module is imported eagerly.
+
+    python benchmarks/import_time_report.py --runs 5 --top 25
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BUDGET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_budget.json")
+
+
+def parse_importtime(stderr):
+    """Parse `-X importtime` output into a list of (module, self_us, cumulative_us, depth).
+
+    Entries are in the order Python prints them: children before their parent.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def measure(target):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True, text=True, cwd=ROOT_DIR
+    )
+    if result.returncode != 0:
+        print(result.stderr.splitlines()[-1] if result.stderr else "import failed")
+        sys.exit(2)
+    return parse_importtime(result.stderr)
+
+
+def target_breakdown(entries, target):
+    """Return the modules imported by the target and its cost grouped by top-level package.
+
+    Interpreter start-up imports (site, encodings...) are excluded. The target's own
+    code is reported under its name.
+    """
+    end = next(i for i, entry in enumerate(entries) if entry[0] == target and entry[3] == 0)
+    start = end
+    while start > 0 and entries[start - 1][3] > 0:
+        start -= 1
+
+    modules = {entry[0] for entry in entries[start:end + 1]}
+    packages = {target: entries[end][1]}
+    for name, self_us, cumulative_us, depth in entries[start:end]:
+        if depth == 1:
+            package = name.split(".")[0]
+            packages[package] = packages.get(package, 0) + cumulative_us
+    return modules, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20, help="number of packages to list")
+    parser.add_argument("--budget", default=DEFAULT_BUDGET)
+    args = parser.parse_args()
+
+    with open(args.budget, "r") as f:
+        budget = json.load(f)
+    target = budget.get("target", "main")
+
+    # Keep the fastest run per package to filter out disk cache and scheduler noise
+    best = None
+    best_modules = set()
+    for _ in range(args.runs):
+        modules, packages = target_breakdown(measure(target), target)
+        best_modules |= modules
+        if best is None:
+            best = packages
+        else:
+            best = {name: min(cost, best.get(name, cost)) for name, cost in packages.items()}
+
+    total_ms = sum(best.values()) / 1000
+    print(f"Cold import of '{target}': {total_ms:.1f} ms over {len(best_modules)} modules\n")
+    print(f"{'package':<32}{'cumulative ms':>14}")
+    for name, cost in sorted(best.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{name:<32}{cost / 1000:>14.1f}")
+
+    failures = []
+    if total_ms > budget["total_ms"]:
+        failures.append(f"total import time {total_ms:.1f} ms exceeds budget of {budget['total_ms']} ms")
+    for name, limit_ms in budget.get("modules_ms", {}).items():
+        cost_ms = best.get(name, 0) / 1000
+        if cost_ms > limit_ms:
+            failures.append(f"'{name}' takes {cost_ms:.1f} ms, budget is {limit_ms} ms")
+    for name in budget.get("deferred", []):
+        if any(module == name or module.startswith(name + ".") for module in best_modules):
+            failures.append(f"'{name}' should be imported lazily but is loaded at startup")
+
+    if failures:
+        print("\nImport budget exceeded:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\nImport budget OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Time loading (replaying) the change journal, with and without compaction.
+
+Appends --entries applied plans to a journal in a temporary directory, then
+measures how long a fresh ChangeJournal takes to replay the file, and how long
+undo takes once loaded.
+
+    python benchmarks/journal_replay_benchmark.py --entries 2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from registry.apply_planner import apply_plan, plan_batch, undo_last_change
+from registry.change_journal import ChangeJournal
+from registry.managed_keys import STUCKRECTS_PATH, TOUCHPAD_PATH
+from registry.registry_backend import HKCU, HKLM, REG_BINARY, REG_DWORD, MemoryRegistryBackend, WriteBatch
+from registry.registry_snapshot import RegistrySnapshot
+
+
+def fill(journal, entries):
+    registry = RegistrySnapshot(MemoryRegistryBackend())
+    for i in range(entries):
+        batch = WriteBatch()
+        batch.set(HKLM, TOUCHPAD_PATH, "CurtainTop", i, REG_DWORD)
+        batch.set(HKLM, TOUCHPAD_PATH, "CurtainLeft", i * 2, REG_DWORD)
+        batch.set(HKCU, STUCKRECTS_PATH, "Settings", i.to_bytes(4, "little") * 12, REG_BINARY)
+        apply_plan(plan_batch(batch, registry), registry, actions={}, journal=journal)
+    return registry
+
+
+def measure(name, path, registry):
+    size_kb = os.path.getsize(path) / 1024
+    start = time.perf_counter()
+    journal = ChangeJournal(path)
+    journal.can_undo()  # Forces the replay
+    replay_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    undo_last_change(journal, registry, actions={})
+    undo_ms = (time.perf_counter() - start) * 1000
+    print(f"{name:<10}file {size_kb:8.1f} KiB   replay {replay_ms:8.2f} ms   undo {undo_ms:6.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "raw.jsonl")
+        registry = fill(ChangeJournal(path, compact_every=args.entries + 1), args.entries)
+        measure("raw", path, registry)
+
+        path = os.path.join(directory, "compacted.jsonl")
+        registry = fill(ChangeJournal(path, compact_every=500), args.entries)
+        measure("compacted", path, registry)
+
+
+if __name__ == "__main__":
+    main()
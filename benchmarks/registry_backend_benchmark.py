@@ -0,0 +1,89 @@
+"""Time the save and reset hot paths against the file-backed registry stand-in.
+
+"per-value" issues one backend call per registry value, like the old code that
+opened a key and wrote or deleted values one by one. "batched" puts everything
+into a single WriteBatch, so each key is opened (and the file written) once.
+
+    python benchmarks/registry_backend_benchmark.py --rounds 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from registry.registry_backend import HKCU, HKLM, REG_BINARY, MemoryRegistryBackend, WriteBatch
+
+TOUCHPAD_PATH = r"SOFTWARE\Microsoft\Windows\CurrentVersion\PrecisionTouchPad"
+STUCKRECTS_PATH = r"Software\Microsoft\Windows\CurrentVersion\Explorer\StuckRects3"
+ADVANCED_PATH = r"Software\Microsoft\Windows\CurrentVersion\Explorer\Advanced"
+TASKBAND_PATH = r"Software\Microsoft\Windows\CurrentVersion\Explorer\Taskband"
+
+CURTAIN_KEYS = ["CurtainTop", "CurtainLeft", "CurtainRight", "SuperCurtainTop", "SuperCurtainLeft", "SuperCurtainRight",
+                "RightClickZoneWidth", "RightClickZoneHeight"]
+
+
+def save_operations(i):
+    """Registry writes of one touchpad save followed by one taskbar save."""
+    operations = [(HKLM, TOUCHPAD_PATH, key, i % 100, 4) for key in CURTAIN_KEYS]
+    operations.append((HKCU, STUCKRECTS_PATH, "Settings", bytes(48), REG_BINARY))
+    operations += [(HKCU, ADVANCED_PATH, name, i % 2, 4) for name in ("TaskbarSmallIcons", "TaskbarAl", "ShowClock", "TaskbarGlomLevel")]
+    operations.append((HKCU, TASKBAND_PATH, "MinThumbSizePx", 200, 4))
+    return operations
+
+
+def reset_operations():
+    """Registry deletes of SettingsView.reset_options."""
+    operations = [(HKLM, TOUCHPAD_PATH, key) for key in CURTAIN_KEYS]
+    operations += [(HKCU, ADVANCED_PATH, name) for name in ("TaskbarSmallIcons", "TaskbarAl", "ShowClock", "TaskbarGlomLevel")]
+    operations.append((HKCU, TASKBAND_PATH, "MinThumbSizePx"))
+    return operations
+
+
+def run_per_value(backend, i):
+    for root, path, name, value, value_type in save_operations(i):
+        backend.write_values(root, path, {name: (value, value_type)})
+    for root, path, name in reset_operations():
+        backend.delete_values(root, path, [name])
+
+
+def run_batched(backend, i):
+    batch = WriteBatch()
+    for root, path, name, value, value_type in save_operations(i):
+        batch.set(root, path, name, value, value_type)
+    backend.apply_batch(batch)
+
+    batch = WriteBatch()
+    for root, path, name in reset_operations():
+        batch.delete(root, path, name)
+    backend.apply_batch(batch)
+
+
+def measure(name, run, rounds, directory):
+    backend = MemoryRegistryBackend(os.path.join(directory, f"{name}.json"))
+    latencies = []
+    for i in range(rounds):
+        start = time.perf_counter()
+        run(backend, i)
+        latencies.append(time.perf_counter() - start)
+
+    latencies_us = [latency * 1e6 for latency in latencies]
+    print(f"{name:<10}median {statistics.median(latencies_us):9.1f} us   "
+          f"backend calls {backend.batch_count // rounds:3d}/round   values {backend.write_count // rounds:3d}/round")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        measure("per-value", run_per_value, args.rounds, directory)
+        measure("batched", run_batched, args.rounds, directory)
+
+
+if __name__ == "__main__":
+    main()
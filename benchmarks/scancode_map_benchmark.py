@@ -0,0 +1,89 @@
+"""Time decoding and encoding Scancode Maps with thousands of entries.
+
+"legacy" is the previous implementation: one int.from_bytes slice per scancode and a
+linear scan of the key table to name every mapping. "struct" is keyboards.scancode_map:
+one struct call for the whole map and dictionary lookups for the names. Every map is
+checked to round-trip byte for byte.
+
+    python benchmarks/scancode_map_benchmark.py --entries 100 1000 5000 --rounds 20
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keyboards.key_catalogue import KEYS
+from keyboards.scancode_map import decode_remappings, decode_scancode_map, encode_scancode_map
+
+# The key table as the legacy code had it, a {name: scancode} dictionary
+SCANCODES = {name: scancode for name, scancode, _, _ in KEYS}
+
+
+def legacy_encode(mappings):
+    header = b"\x00\x00\x00\x00\x00\x00\x00\x00"
+    body = b"".join([key_to.to_bytes(2, 'little') + key_from.to_bytes(2, 'little') for key_from, key_to in mappings])
+    return header + (len(mappings) + 1).to_bytes(4, 'little') + body + b"\x00\x00\x00\x00"
+
+
+def legacy_name(scancode):
+    for key_name, key_scancode in SCANCODES.items():
+        if key_scancode == scancode:
+            return key_name
+    return None
+
+
+def legacy_decode_remappings(scancode_map):
+    num_mappings = int.from_bytes(scancode_map[8:12], byteorder='little') - 1
+    remappings = []
+    for i in range(num_mappings):
+        offset = 12 + i * 4
+        new_key = int.from_bytes(scancode_map[offset:offset + 2], byteorder='little')
+        old_key = int.from_bytes(scancode_map[offset + 2:offset + 4], byteorder='little')
+        old_key_name, new_key_name = legacy_name(old_key), legacy_name(new_key)
+        if old_key_name and new_key_name:
+            remappings.append((old_key_name, new_key_name))
+    return remappings
+
+
+def best_ms(function, argument, rounds):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function(argument)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    codes = list(SCANCODES.values())
+    print(f"{'entries':>8}  {'operation':<18}{'legacy ms':>12}{'struct ms':>12}{'speed-up':>10}")
+    for entries in args.entries:
+        mappings = [(random.choice(codes), random.choice(codes)) for _ in range(entries)]
+        scancode_map = encode_scancode_map(mappings)
+        assert scancode_map == legacy_encode(mappings)
+        assert decode_scancode_map(scancode_map) == mappings
+        assert encode_scancode_map(decode_scancode_map(scancode_map)) == scancode_map
+        assert decode_remappings(scancode_map) == legacy_decode_remappings(scancode_map)
+
+        for operation, legacy, new, argument in [
+            ("encode", legacy_encode, encode_scancode_map, mappings),
+            ("decode + names", legacy_decode_remappings, decode_remappings, scancode_map),
+        ]:
+            legacy_ms, _ = best_ms(legacy, argument, args.rounds)
+            new_ms, _ = best_ms(new, argument, args.rounds)
+            print(f"{entries:>8}  {operation:<18}{legacy_ms:>12.3f}{new_ms:>12.3f}{legacy_ms / new_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
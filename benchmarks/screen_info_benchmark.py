@@ -0,0 +1,53 @@
+"""Measure the cost of building ScreenInfo per view versus sharing one instance.
+
+Runs headless with FakeMetricsProvider by default; pass --win32 on Windows to use
+the real user32/gdi32 provider.
+
+    python benchmarks/screen_info_benchmark.py --views 8 --runs 200
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from configuration_manager import FakeMetricsProvider, ScreenInfo, Win32MetricsProvider
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--views", type=int, default=8, help="number of views asking for screen metrics")
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--win32", action="store_true", help="use the real Win32 metrics provider")
+    args = parser.parse_args()
+
+    provider = Win32MetricsProvider() if args.win32 else FakeMetricsProvider()
+
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        for _ in range(args.views):
+            ScreenInfo(provider)
+    per_view = (time.perf_counter() - start) / args.runs
+
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        shared = ScreenInfo(provider)
+        for _ in range(args.views):
+            shared.refresh_if_changed()
+    shared_cost = (time.perf_counter() - start) / args.runs
+
+    print(f"one ScreenInfo per view: {per_view * 1e6:10.1f} us per startup")
+    print(f"shared + change checks: {shared_cost * 1e6:10.1f} us per startup")
+
+    # Geometry must follow a display change
+    if not args.win32:
+        shared = ScreenInfo(FakeMetricsProvider())
+        before = shared.geometry
+        shared.provider.set_metrics(dpi=144)
+        changed = shared.refresh_if_changed()
+        print(f"display change detected: {changed} ({before} -> {shared.geometry})")
+
+
+if __name__ == "__main__":
+    main()
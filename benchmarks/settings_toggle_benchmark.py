@@ -0,0 +1,78 @@
+"""Compare the latency of toggling a setting before and after SettingsStore.
+
+"before" is the old KeyShortcutsView.toggle_shortcuts behaviour: read and parse
+settings.json, change one key, rewrite the whole file. "after" goes through the
+in-memory store, which publishes the change and coalesces the writes.
+
+    python benchmarks/settings_toggle_benchmark.py --toggles 200
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from settings.settings_store import SettingsStore
+
+SAMPLE_SETTINGS = {
+    "version": 1,
+    "require_admin": False,
+    "minimize_to_tray": True,
+    "display_discharge_rate": False,
+    "theme": "Dark",
+    "enable_hotkey_remapping": False,
+}
+
+
+def toggle_rewrite(path, value):
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            settings_data = json.load(f)
+    else:
+        settings_data = {}
+
+    settings_data["enable_hotkey_remapping"] = value
+    with open(path, "w") as f:
+        json.dump(settings_data, f, indent=4)
+
+
+def report(name, latencies, writes):
+    latencies_us = [latency * 1e6 for latency in latencies]
+    p99 = sorted(latencies_us)[int(len(latencies_us) * 0.99) - 1]
+    print(f"{name:<8}median {statistics.median(latencies_us):8.1f} us   p99 {p99:8.1f} us   file writes {writes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--toggles", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "settings.json")
+        with open(path, "w") as f:
+            json.dump(SAMPLE_SETTINGS, f, indent=4)
+
+        latencies = []
+        for i in range(args.toggles):
+            start = time.perf_counter()
+            toggle_rewrite(path, i % 2 == 0)
+            latencies.append(time.perf_counter() - start)
+        report("before", latencies, args.toggles)
+
+        store = SettingsStore(path, debounce_s=0.5)
+        store.settings  # The store loads once, at startup
+        latencies = []
+        for i in range(args.toggles):
+            start = time.perf_counter()
+            store.set("enable_hotkey_remapping", i % 2 == 0)
+            latencies.append(time.perf_counter() - start)
+        store.flush()
+        report("after", latencies, store.write_count)
+
+
+if __name__ == "__main__":
+    main()
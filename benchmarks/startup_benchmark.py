@@ -0,0 +1,85 @@
+"""Compare MainApp startup with eager and lazy view construction.
+
+Each measurement runs in a fresh interpreter so module caches do not leak between
+runs. Must be run on Windows as administrator (MainApp re-launches itself otherwise):
+
+    python benchmarks/startup_benchmark.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_child(mode):
+    """Start MainApp in this process and print the timings as JSON."""
+    os.chdir(ROOT_DIR)
+    sys.path.insert(0, ROOT_DIR)
+
+    start = time.perf_counter()
+    import main
+    from tray_icons import tray_manager
+    imported = time.perf_counter()
+
+    app = main.MainApp(eager_views=(mode == "eager"))
+    constructed = time.perf_counter()
+    timings = {}
+
+    def finish():
+        # create_sliding_frames runs 100 ms after construction, wait for the first idle after it
+        timings["first_idle"] = time.perf_counter() - start
+        tray_manager.stop_main_tray_icon()
+        app.destroy()
+
+    def wait_for_idle():
+        # Measure how long the event loop stays blocked once the views are (or are not) built
+        probe = time.perf_counter()
+        app.update()
+        timings["event_latency"] = time.perf_counter() - probe
+        app.after_idle(finish)
+
+    app.after(150, wait_for_idle)
+    app.mainloop()
+
+    timings["import"] = imported - start
+    timings["construct"] = constructed - imported
+    print(json.dumps(timings))
+    os._exit(0)
+
+
+def run_mode(mode, runs):
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", mode],
+            capture_output=True, text=True, cwd=ROOT_DIR, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", choices=["eager", "lazy"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure_child(args.child)
+        return
+
+    print(f"{'mode':<8}{'metric':<16}{'median ms':>12}{'min ms':>10}")
+    for mode in ("eager", "lazy"):
+        results = run_mode(mode, args.runs)
+        for metric in ("import", "construct", "event_latency", "first_idle"):
+            values = [r[metric] * 1000 for r in results]
+            print(f"{mode:<8}{metric:<16}{statistics.median(values):>12.1f}{min(values):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# cli.py
+# Headless entry point for scripts and provisioning; imports no GUI toolkit.
+#
+#   python cli.py get [touchpad|keyboard|shortcuts|taskbar]
+#   python cli.py set touchpad CurtainTop=1000 CurtainLeft=500
+#   python cli.py set keyboard "Caps Lock=Left Ctrl"
+#   python cli.py set taskbar Position=Top IconSize=Small ThumbnailSize=200
+#   python cli.py apply settings.json
+#   python cli.py export settings.reg
+#   python cli.py import settings.reg
+#   python cli.py reset [--backup 3]
+import argparse
+import json
+import os
+import sys
+from keyboards.shortcut_store import SHORTCUT_FILE
+from registry.apply_planner import COST_EXPLORER, COST_LIVE, COST_REBOOT, apply_plan, plan_batch
+from registry.managed_keys import MANAGED_VALUES
+from registry.registry_backend import MemoryRegistryBackend, WriteBatch
+from registry.reg_file import export_reg, import_batch
+from registry.registry_backups import BASELINE, get_backup_store, restore_batch
+from registry.registry_snapshot import RegistrySnapshot
+from registry.shell_refresh import broadcast_setting_change, restart_explorer
+from settings.profiles import TASKBAR_PROFILE_OPTIONS, apply_compiled, capture_profile, compile_profile
+
+# Command line section name -> profile section
+SECTIONS = {"touchpad": "touchpad", "keyboard": "key_remaps", "shortcuts": "shortcuts", "taskbar": "taskbar"}
+
+
+def notify_reboot():
+    print("Restart Windows for the touchpad and keyboard changes to take effect.")
+
+
+def apply_actions(refresh):
+    """Actions run after writing; unlike the GUI, Explorer is restarted in the foreground and nothing prompts."""
+    return {
+        COST_LIVE: broadcast_setting_change if refresh else None,
+        COST_EXPLORER: restart_explorer if refresh else None,
+        COST_REBOOT: notify_reboot,
+    }
+
+
+def parse_assignments(section, assignments):
+    """Turn NAME=VALUE arguments into a profile section."""
+    pairs = []
+    for assignment in assignments:
+        name, separator, value = assignment.partition("=")
+        if not separator:
+            raise ValueError(f"Expected NAME=VALUE, got '{assignment}'")
+        pairs.append((name.strip(), value.strip()))
+
+    if section == "keyboard":
+        return [[key_from, key_to] for key_from, key_to in pairs]
+    if section == "touchpad":
+        try:
+            return {name: int(value) for name, value in pairs}
+        except ValueError:
+            raise ValueError("Touchpad values are integers in 1/1000 cm, e.g. CurtainTop=1000")
+
+    values = {}
+    for name, value in pairs:
+        # Options without labels (the thumbnail size) are plain numbers
+        if name in TASKBAR_PROFILE_OPTIONS and TASKBAR_PROFILE_OPTIONS[name][1] is None:
+            try:
+                value = int(value)
+            except ValueError:
+                raise ValueError(f"Taskbar option '{name}' must be an integer")
+        values[name] = value
+    return values
+
+
+def shortcuts_path(args):
+    """shortcuts.json, or a file next to the registry stand-in so trial runs leave the real shortcuts alone."""
+    if args.registry_file:
+        return os.path.splitext(args.registry_file)[0] + ".shortcuts.json"
+    return SHORTCUT_FILE
+
+
+def apply_definition(definition, registry, args):
+    compiled = compile_profile("command line", definition)
+    plan = apply_compiled(compiled, registry, dry_run=args.dry_run, actions=apply_actions(args.refresh),
+                          shortcuts_path=shortcuts_path(args))
+    if not args.dry_run:
+        print(f"{len(plan)} registry change(s) written." if plan else "Already up to date.")
+
+
+def command_get(args, registry):
+    definition = capture_profile(registry, shortcuts_path(args))
+    if args.section:
+        definition = definition[SECTIONS[args.section]]
+    print(json.dumps(definition, indent=4))
+
+
+def command_set(args, registry):
+    if args.section == "shortcuts":
+        raise ValueError("Shortcuts are set with 'apply' and a file holding a \"shortcuts\" object")
+    apply_definition({SECTIONS[args.section]: parse_assignments(args.section, args.values)}, registry, args)
+
+
+def command_apply(args, registry):
+    """Apply a file in the format printed by 'get' (a profile definition)."""
+    with open(args.file, "r") as f:
+        definition = json.load(f)
+    apply_definition(definition, registry, args)
+
+
+def command_export(args, registry):
+    count = export_reg(args.file, registry, encoding="utf-8" if args.utf8 else "utf-16")
+    print(f"{count} value(s) exported to '{args.file}'.")
+
+
+def command_import(args, registry):
+    """Apply the managed values of a .reg file in one batch; other keys in the file are ignored."""
+    plan = plan_batch(import_batch(args.file), registry)
+    apply_plan(plan, registry, dry_run=args.dry_run, actions=apply_actions(args.refresh))
+    if not args.dry_run:
+        print(f"{len(plan)} registry change(s) imported." if plan else "Already up to date.")
+
+
+def command_reset(args, registry):
+    """Restore a backup, the original settings by default."""
+    store = get_backup_store()
+    backup_id = args.backup or BASELINE
+    if backup_id == BASELINE and not store.has_baseline():
+        # No backup yet: the values were changed before backups existed, delete them
+        batch = WriteBatch()
+        for root, path, names in MANAGED_VALUES:
+            for name in names:
+                batch.delete(root, path, name)
+    else:
+        batch = restore_batch(store.load(backup_id))
+
+    plan = plan_batch(batch, registry)
+    apply_plan(plan, registry, dry_run=args.dry_run, actions=apply_actions(args.refresh))
+    if not args.dry_run:
+        print(f"{len(plan)} registry change(s) reset." if plan else "Already up to date.")
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="MyWindows command line: read and change settings without the GUI")
+    parser.add_argument("--dry-run", action="store_true", help="print the registry changes instead of writing them")
+    parser.add_argument("--no-refresh", dest="refresh", action="store_false",
+                        help="do not notify the taskbar or restart Explorer after writing")
+    parser.add_argument("--registry-file", metavar="JSON",
+                        help="read and write a JSON registry stand-in instead of the registry (no backups or journal); "
+                             "shortcuts go to JSON's name with .shortcuts.json instead of shortcuts.json")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    get_parser = commands.add_parser("get", help="print current settings as JSON")
+    get_parser.add_argument("section", nargs="?", choices=list(SECTIONS))
+    get_parser.set_defaults(run=command_get)
+
+    set_parser = commands.add_parser("set", help="change settings of one section")
+    set_parser.add_argument("section", choices=list(SECTIONS))
+    set_parser.add_argument("values", nargs="*", metavar="NAME=VALUE",
+                            help="keyboard: FROM=TO key names, replacing every remapping (none clears them)")
+    set_parser.set_defaults(run=command_set)
+
+    apply_parser = commands.add_parser("apply", help="apply a JSON file in the format printed by 'get'")
+    apply_parser.add_argument("file")
+    apply_parser.set_defaults(run=command_apply)
+
+    export_parser = commands.add_parser("export", help="write every managed value to a .reg file")
+    export_parser.add_argument("file")
+    export_parser.add_argument("--utf8", action="store_true", help="write UTF-8 instead of regedit's UTF-16")
+    export_parser.set_defaults(run=command_export)
+
+    import_parser = commands.add_parser("import", help="apply the managed values of a .reg file")
+    import_parser.add_argument("file")
+    import_parser.set_defaults(run=command_import)
+
+    reset_parser = commands.add_parser("reset", help="restore a backup (the original settings by default)")
+    reset_parser.add_argument("--backup", help="numbered backup to restore instead of the original settings")
+    reset_parser.set_defaults(run=command_reset)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    # None writes through the process-wide snapshot, with backups and the change journal
+    registry = RegistrySnapshot(MemoryRegistryBackend(args.registry_file)) if args.registry_file else None
+    try:
+        args.run(args, registry)
+    except PermissionError:
+        print("Permission denied. Run the command from an administrator prompt.", file=sys.stderr)
+        return 1
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
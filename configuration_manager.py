@@ -1,7 +1,9 @@
 import ctypes
-from ctypes import wintypes, windll
+import sys
+import threading
+from collections import namedtuple
+from ctypes import wintypes
 
-ctypes.windll.shcore.SetProcessDpiAwareness(2)
 
 class RECT(ctypes.Structure):
     _fields_ = [
@@ -27,127 +29,265 @@ class POINT(ctypes.Structure):
         ("y", wintypes.LONG)
     ]
 
-class ScreenInfo:
+
+# Raw monitor measurements, everything the geometry math needs
+DisplayMetrics = namedtuple("DisplayMetrics", [
+    "dpi",               # Logical DPI of the primary monitor (96 = 100 %)
+    "screen_width",      # Primary monitor size in pixels
+    "screen_height",
+    "work_area_bottom",  # Bottom edge of the work area (screen minus taskbar)
+    "physical_width_mm",  # Physical monitor size, 0 if unknown
+    "physical_height_mm",
+])
+
+# Default values if the physical dimensions cannot be retrieved
+DEFAULT_PHYSICAL_SIZE_IN = (15.0, 9.0)  # Typical laptop size
+
+
+class Win32MetricsProvider:
+    """Read monitor metrics through user32/gdi32.
+
+    The process is per-monitor DPI aware, so GetDeviceCaps and GetDpiForSystem keep
+    returning the DPI the process started with. Once a window is attached, its DPI
+    (GetDpiForWindow) is used instead, which follows later scaling changes.
+    """
+
+    LOGPIXELSX = 88
+    HORZSIZE = 4  # Width in millimeters
+    VERTSIZE = 6  # Height in millimeters
+
     def __init__(self):
-        self.screen_width = 0
-        self.screen_height = 0
-        self.window_width = 0
-        self.window_height = 0
-        
+        self.user32 = ctypes.windll.user32
+        self.gdi32 = ctypes.windll.gdi32
+        self.hwnd = None
+        try:
+            ctypes.windll.shcore.SetProcessDpiAwareness(2)
+        except Exception as e:
+            print(f"Error setting DPI awareness: {e}")
+
+    def attach_window(self, hwnd):
+        """Take the DPI from this top-level window from now on."""
+        self.hwnd = hwnd
+
+    def _window_dpi(self):
+        try:
+            return self.user32.GetDpiForWindow(self.hwnd) if self.hwnd else 0
+        except AttributeError:  # Before Windows 10 1607
+            return 0
+
+    def _primary_monitor_info(self):
+        monitor_info = MONITORINFO()
+        monitor_info.cbSize = ctypes.sizeof(MONITORINFO)
+        monitor = self.user32.MonitorFromPoint(POINT(0, 0), 1)
+        self.user32.GetMonitorInfoW(monitor, ctypes.byref(monitor_info))
+        return monitor_info
+
+    def read_metrics(self):
+        """Read every metric in one pass, using a single DC that is released afterwards."""
+        hdc = self.user32.GetDC(0)
+        try:
+            dpi = self.gdi32.GetDeviceCaps(hdc, self.LOGPIXELSX)
+            width_mm = self.gdi32.GetDeviceCaps(hdc, self.HORZSIZE)
+            height_mm = self.gdi32.GetDeviceCaps(hdc, self.VERTSIZE)
+        finally:
+            self.user32.ReleaseDC(0, hdc)
+
+        monitor_info = self._primary_monitor_info()
+
+        return DisplayMetrics(
+            dpi=self._window_dpi() or dpi or 96,
+            screen_width=int(self.user32.GetSystemMetrics(0)),
+            screen_height=int(self.user32.GetSystemMetrics(1)),
+            work_area_bottom=monitor_info.rcWork.bottom,
+            physical_width_mm=width_mm,
+            physical_height_mm=height_mm,
+        )
+
+    def display_signature(self):
+        """Cheap fingerprint of the display setup: the window's DPI and the primary monitor and work area."""
+        monitor_info = self._primary_monitor_info()
+        monitor, work = monitor_info.rcMonitor, monitor_info.rcWork
+        return (
+            self._window_dpi(),
+            (monitor.left, monitor.top, monitor.right, monitor.bottom),
+            (work.left, work.top, work.right, work.bottom),
+        )
+
+
+class FakeMetricsProvider:
+    """Metrics provider with fixed values, for headless tests and benchmarks."""
+
+    def __init__(self, screen_width=1920, screen_height=1080, dpi=96, taskbar_height=48,
+                 physical_width_mm=344, physical_height_mm=194):
+        self.metrics = DisplayMetrics(
+            dpi=dpi,
+            screen_width=screen_width,
+            screen_height=screen_height,
+            work_area_bottom=screen_height - taskbar_height,
+            physical_width_mm=physical_width_mm,
+            physical_height_mm=physical_height_mm,
+        )
+        self.read_count = 0
+
+    def read_metrics(self):
+        self.read_count += 1
+        return self.metrics
+
+    def attach_window(self, hwnd):
+        pass
+
+    def display_signature(self):
+        return self.metrics
+
+    def set_metrics(self, **changes):
+        """Simulate a display change (resolution, DPI, taskbar...)."""
+        self.metrics = self.metrics._replace(**changes)
+
+
+def physical_size_in(metrics):
+    """Physical monitor size in inches, falling back to a typical laptop size."""
+    if metrics.physical_width_mm > 0 and metrics.physical_height_mm > 0:
+        # Convert millimeters to inches (1 inch = 25.4 mm)
+        return metrics.physical_width_mm / 25.4, metrics.physical_height_mm / 25.4
+    return DEFAULT_PHYSICAL_SIZE_IN
+
+
+def window_proportions(physical_diagonal):
+    """Fraction of the screen the window should cover, based on the physical screen size."""
+    if physical_diagonal < 15:
+        return 0.26, 0.55
+    elif 15 <= physical_diagonal <= 18:
+        return 0.22, 0.50
+    elif 18 < physical_diagonal <= 24:
+        return 0.20, 0.42
+    elif 24 < physical_diagonal <= 27:
+        return 0.18, 0.35
+    else:
+        return 0.15, 0.30
+
+
+class ScreenInfo:
+    """Monitor metrics and window geometry, computed once from a metrics provider.
+
+    Use `get_screen_info()` to share one instance across the application; call
+    `refresh_if_changed()` to recompute after a display or DPI change.
+    """
+
+    def __init__(self, provider=None):
+        self.provider = provider if provider is not None else default_provider()
+
         self.padding_x = 10
         self.padding_y = 10
-        
-        self.dpi = self.get_scaling_factor()
-        self.taskbar_height = self.get_taskbar_height()
-        
+
+        self._callbacks = []
+        self._signature = None
+        self.refresh()
+
+    def refresh(self):
+        """Read the metrics from the provider and recompute the geometry."""
+        self.metrics = self.provider.read_metrics()
+        self._signature = self.provider.display_signature()
+
+        self.dpi = self.metrics.dpi / 96.0
+        self.screen_width = self.metrics.screen_width
+        self.screen_height = self.metrics.screen_height
+        self.taskbar_height = self.metrics.screen_height - self.metrics.work_area_bottom
+        self.physical_width_in, self.physical_height_in = physical_size_in(self.metrics)
+
         self.geometry = self.get_window_size()
-        
-    @staticmethod
-    def get_scaling_factor():
+
+    def attach_window(self, hwnd):
+        """Follow the DPI of the application window (see Win32MetricsProvider)."""
+        self.provider.attach_window(hwnd)
+        self.refresh_if_changed()
+
+    def refresh_if_changed(self):
+        """Recompute the metrics only if the display setup changed. Returns True if it did."""
         try:
-            user32 = ctypes.windll.user32
-            user32.SetProcessDPIAware()
-            hdc = user32.GetDC(0)
-            dpi = ctypes.windll.gdi32.GetDeviceCaps(hdc, 88)
-            scaling_factor = dpi / 96.0
-            return scaling_factor
+            signature = self.provider.display_signature()
         except Exception as e:
-            print(f"Error getting DPI scaling: {e}")
-            return 1.0
-        
+            print(f"Error checking display configuration: {e}")
+            return False
+
+        if signature == self._signature:
+            return False
+
+        self.refresh()
+        for callback in list(self._callbacks):
+            callback(self)
+        return True
+
+    def subscribe(self, callback):
+        """Register a callback called with this ScreenInfo after the metrics changed."""
+        self._callbacks.append(callback)
+
+    def get_scaling_factor(self):
+        return self.dpi
+
     def get_taskbar_height(self):
-        user32 = ctypes.windll.user32
-        monitor_info = MONITORINFO()
-        monitor_info.cbSize = ctypes.sizeof(MONITORINFO)
-        point = POINT(0, 0)
-        monitor = user32.MonitorFromPoint(point, 1)
-        user32.GetMonitorInfoW(monitor, ctypes.byref(monitor_info))
-        work_area = monitor_info.rcWork
-        screen_area = monitor_info.rcMonitor
-        taskbar_height = screen_area.bottom - work_area.bottom
-        return taskbar_height
-       
+        return self.taskbar_height
+
     def get_physical_monitor_size(self):
-        """Retrieve the physical dimensions of the primary monitor in inches."""
-        user32 = ctypes.windll.user32
-        hdc = user32.GetDC(0)
-        
-        # Retrieve the width and height in millimeters
-        HORZSIZE = 4  # Width in millimeters
-        VERTSIZE = 6  # Height in millimeters
-        width_mm = ctypes.windll.gdi32.GetDeviceCaps(hdc, HORZSIZE)
-        height_mm = ctypes.windll.gdi32.GetDeviceCaps(hdc, VERTSIZE)
-
-        if width_mm > 0 and height_mm > 0:
-            # Convert millimeters to inches (1 inch = 25.4 mm)
-            width_in = width_mm / 25.4
-            height_in = height_mm / 25.4
-        else:
-            # Use default values if unable to retrieve dimensions
-            width_in, height_in = 15.0, 9.0  # Typical laptop size
-
-        return width_in, height_in
-        
+        """Return the physical dimensions of the primary monitor in inches."""
+        return self.physical_width_in, self.physical_height_in
+
     def get_window_size(self):
-        scaling_factor = self.get_scaling_factor()
-
-        user32 = ctypes.windll.user32
-        
-        screen_width = int(user32.GetSystemMetrics(0))
-        screen_height = int(user32.GetSystemMetrics(1))
-        
-        self.screen_width = screen_width
-        self.screen_height = screen_height
-        
-                # Get physical dimensions of the monitor in inches
-        physical_width, physical_height = self.get_physical_monitor_size()
-        physical_diagonal = (physical_width**2 + physical_height**2)**0.5 # actual screen size
-          
-        width, height = 0, 0
+        physical_diagonal = (self.physical_width_in**2 + self.physical_height_in**2)**0.5 # actual screen size
+
         # Determine proportions based on physical size
-        if physical_diagonal < 15:
-            width = 0.26
-            height = 0.55
-        elif 15 <= physical_diagonal <= 18:
-            width = 0.22
-            height = 0.50
-        elif 18 < physical_diagonal <= 24:
-            width = 0.20
-            height = 0.42
-        elif 24 < physical_diagonal <= 27:
-            width = 0.18
-            height = 0.35
-        else:
-            width = 0.15
-            height = 0.30
-        
-        # Adjust window size based on DPI scaling factor
+        width, height = window_proportions(physical_diagonal)
+
         window_width = int(self.screen_width * width)
         window_height = int(self.screen_height * height)
-        
-        # Calculate taskbar height and subtract it from the vertical position
-        taskbar_height = self.get_taskbar_height()
 
         # Position the window in the bottom-right corner, above the taskbar
-        position_right = screen_width - window_width - 5  # 5px margin from right edge
-        position_down = screen_height - window_height - taskbar_height - 5  # 5px margin from taskbar
-        
+        position_right = self.screen_width - window_width - 5  # 5px margin from right edge
+        position_down = self.screen_height - window_height - self.taskbar_height - 5  # 5px margin from taskbar
+
         # Adjust window size based on DPI scaling factor
-        dpi_window_width = int(window_width/scaling_factor)
-        dpi_window_height = int(window_height/scaling_factor)
-        
+        dpi_window_width = int(window_width/self.dpi)
+        dpi_window_height = int(window_height/self.dpi)
+
         self.window_width = dpi_window_width
         self.window_height = dpi_window_height
-        
+
         return f"{dpi_window_width}x{dpi_window_height}+{position_right}+{position_down}"
-    
+
+
+def default_provider():
+    """Win32 provider on Windows, fixed fake metrics elsewhere."""
+    if sys.platform == "win32":
+        return Win32MetricsProvider()
+    return FakeMetricsProvider()
+
+
+_screen_info = None
+_screen_info_lock = threading.Lock()
+
+def get_screen_info():
+    """Return the process-wide ScreenInfo, creating it on first use."""
+    global _screen_info
+    if _screen_info is None:
+        with _screen_info_lock:
+            if _screen_info is None:
+                _screen_info = ScreenInfo()
+    return _screen_info
+
+def set_metrics_provider(provider):
+    """Replace the shared ScreenInfo with one backed by the given provider."""
+    global _screen_info
+    with _screen_info_lock:
+        _screen_info = ScreenInfo(provider)
+    return _screen_info
+
+
 # Main function to test the get_physical_monitor_size method
 def main():
-    screen_info = ScreenInfo()
+    screen_info = get_screen_info()
     width_in, height_in = screen_info.get_physical_monitor_size()
     print(f"Physical Monitor Size: {width_in:.2f} inches (Width) x {height_in:.2f} inches (Height)")
     print(f"window_width: {screen_info.window_width}")
     print(f"window_height: {screen_info.window_height}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
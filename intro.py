@@ -1,15 +1,19 @@
 # intro.py
+import time
 import customtkinter as ctk
-import os
-from PIL import Image
-from configuration_manager import ScreenInfo
+from asset_loader import CRITICAL_ASSETS, get_asset_loader
+from configuration_manager import get_screen_info
 from widgets.sliding_frames import SlidingFrame
 
 
 class IntroView(SlidingFrame):
+    MIN_DISPLAY_MS = 300  # Avoid a flash when every asset is already cached
+    MAX_DISPLAY_MS = 5000  # Never keep the splash up longer than this, even if an asset is stuck
+    POLL_INTERVAL_MS = 30
+
     def __init__(self, parent, controller=None):
         # Screen information for dynamic scaling and geometry
-        self.screen_info = ScreenInfo()
+        self.screen_info = get_screen_info()
         super().__init__(parent, width=self.screen_info.window_width, height=self.screen_info.window_height)
         self.controller = controller
 
@@ -19,10 +23,8 @@ class IntroView(SlidingFrame):
         # Correct the size if it's not applied
         self.configure(width=self.screen_info.window_width, height=self.screen_info.window_height)
         self.pack_propagate(0)
-        # Base directory for locating resources (images)
-        base_dir = os.path.dirname(__file__)
-        # Correct path to the icon image in the `tray_icons` folder
-        self.icon_image_path = os.path.join(base_dir, "tray_icons", "registry.png")
+        self.asset_loader = get_asset_loader()
+        self.shown_at = time.perf_counter()
 
         #print("Intro Frame Size:", self.screen_info.window_width, self.screen_info.window_height)
         
@@ -33,13 +35,8 @@ class IntroView(SlidingFrame):
         #self.content_frame.configure(width=self.screen_info.window_width, height=self.screen_info.window_height)
         #self.content_frame.pack_propagate(0)
 
-        # Display the program's logo if the image file exists
-        if os.path.exists(self.icon_image_path):
-            self.icon_image = ctk.CTkImage(Image.open(self.icon_image_path), size=(120, 120))
-            self.icon_label = ctk.CTkLabel(self.content_frame, image=self.icon_image, text="")
-            self.icon_label.pack(pady=(30, 15))  # Place image with some padding
-
-        # Display the program name below the logo
+        # Display the program name; the logo is added above it once it has been decoded
+        self.logo_shown = False
         self.program_name_label = ctk.CTkLabel(
             self.content_frame,
             text="MyWindows",
@@ -47,9 +44,31 @@ class IntroView(SlidingFrame):
         )
         self.program_name_label.pack(pady=10)
 
-        # Automatically slide out and pack_forget after 2 seconds
-        self.after(2000, self.hide_intro_frame)
+        # Poll instead of waiting on the futures, so the UI thread is never blocked
+        self.after(self.POLL_INTERVAL_MS, self.wait_for_assets)
+
+    def show_logo(self):
+        """Display the program's logo if it could be loaded (the decode has finished)."""
+        try:
+            self.icon_image = ctk.CTkImage(self.asset_loader.result("app_icon"), size=(120, 120))
+            self.icon_label = ctk.CTkLabel(self.content_frame, image=self.icon_image, text="")
+            self.icon_label.pack(pady=(30, 15), before=self.program_name_label)  # Place image with some padding
+        except Exception as e:
+            print(f"Error loading program logo: {e}")
+
+    def wait_for_assets(self):
+        """Poll the asset loader and hide the intro once the critical assets are ready."""
+        ready = self.asset_loader.is_ready(CRITICAL_ASSETS)
+        if ready and not self.logo_shown:
+            self.logo_shown = True
+            self.show_logo()
+
+        elapsed_ms = (time.perf_counter() - self.shown_at) * 1000
+        if (ready and elapsed_ms >= self.MIN_DISPLAY_MS) or elapsed_ms >= self.MAX_DISPLAY_MS:
+            self.hide_intro_frame()
+        else:
+            self.after(self.POLL_INTERVAL_MS, self.wait_for_assets)
 
     def hide_intro_frame(self):
         """Slide out the intro frame and hide it."""
-        self.pack_forget()  # Slide out and hide the frame after 2 seconds
+        self.pack_forget()  # Slide out and hide the frame
@@ -0,0 +1,178 @@
+# hotkey_engine.py
+import itertools
+import threading
+from lazy_imports import lazy_import
+
+# The keyboard hook library is only loaded once the engine starts
+keyboard = lazy_import("keyboard")
+
+# Modifier-state bits; left and right keys share a bit, like in the keyboard library's hotkeys
+MODIFIER_BITS = {"ctrl": 1, "shift": 2, "alt": 4, "windows": 8}
+
+NO_KEYS = frozenset()
+
+
+class HotkeyEngine:
+    """Hotkey remaps served by one low-level keyboard hook.
+
+    The shortcuts are compiled into one dictionary keyed by (scan code of the last
+    key, modifier bitmask, other held keys). The hook keeps the modifier bitmask up to
+    date as modifiers go down and up, so every key press is a single lookup however
+    many shortcuts exist. Before, each shortcut added its own hook callback and every
+    key press was tested against all of them.
+
+    `scan_codes(name)` returns the scan codes of a `keyboard` library key name; it is
+    keyboard.key_to_scan_codes by default.
+    """
+
+    def __init__(self, scan_codes=None):
+        self._scan_codes = scan_codes
+        self.table = {}
+        self.modifier_codes = {}  # scan code -> modifier bit
+        self.held_modifiers = set()
+        self.mask = 0
+        self.held = {}  # Other held scan codes -> the other keys held when it went down
+        self.others = NO_KEYS
+        self.suppressed = set()  # Triggers whose key-up is swallowed too
+        self._hook = None
+        self._lock = threading.Lock()
+
+    def scan_codes(self, name):
+        return (self._scan_codes or keyboard.key_to_scan_codes)(name)
+
+    def compile(self, shortcuts):
+        """Build the lookup table from {from combination: shortcut} as saved in shortcuts.json.
+
+        Names are `keyboard` library names (see KeyCatalogue.hook_name). Shortcuts with
+        keys the library does not know are skipped.
+        """
+        modifier_codes = {}
+        for name, bit in MODIFIER_BITS.items():
+            for code in self.scan_codes(name):
+                modifier_codes[code] = bit
+
+        table = {}
+        for combination, shortcut in shortcuts.items():
+            try:
+                entries = self._chord_entries(shortcut['modifiers'], shortcut['key'], modifier_codes)
+            except ValueError as e:
+                print(f"Skipping shortcut '{combination}': {e}")
+                continue
+            target = '+'.join(shortcut['to_modifiers'] + [shortcut['to_key']])
+            for entry in entries:
+                table.setdefault(entry, target)
+
+        with self._lock:
+            self.table = table
+            self.modifier_codes = modifier_codes
+        return len(table)
+
+    def _chord_entries(self, modifiers, key, modifier_codes):
+        """Every (trigger scan code, modifier mask, other held keys) that should fire the chord."""
+        mask = 0
+        other_alternatives = []
+        for name in modifiers:
+            codes = self.scan_codes(name)
+            if codes and all(code in modifier_codes for code in codes):
+                mask |= modifier_codes[codes[0]]
+            else:
+                # Any key can be held as part of a chord; a name may stand for several scan codes
+                other_alternatives.append(codes)
+
+        triggers = self.scan_codes(key)
+        return [(trigger, mask, frozenset(others))
+                for trigger in triggers
+                for others in itertools.product(*other_alternatives)]
+
+    def process(self, scan_code, is_down):
+        """Feed one key event. Returns the target combination to send for a matched press,
+        True to swallow the event, or None to let it through.
+        """
+        bit = self.modifier_codes.get(scan_code)
+        if bit is not None:
+            if is_down and scan_code not in self.held_modifiers:
+                # A modifier can end a chord too (e.g. Ctrl + Shift)
+                target = self.table.get((scan_code, self.mask, self.others))
+                if target is not None:
+                    self.suppressed.add(scan_code)
+                    return target
+            if scan_code in self.suppressed:
+                if not is_down:
+                    self.suppressed.discard(scan_code)
+                return True
+            if is_down:
+                self.held_modifiers.add(scan_code)
+            else:
+                self.held_modifiers.discard(scan_code)
+            mask = 0
+            for code in self.held_modifiers:
+                mask |= self.modifier_codes[code]
+            self.mask = mask
+            return None
+
+        if not is_down:
+            if self.held.pop(scan_code, None) is not None:
+                self.others = frozenset(self.held)
+            if scan_code in self.suppressed:
+                self.suppressed.discard(scan_code)
+                return True
+            return None
+
+        # Auto-repeat sends more key-downs; match them with the keys held at the first one
+        others = self.held.get(scan_code)
+        if others is None:
+            others = self.others
+            self.held[scan_code] = others
+            self.others = frozenset(self.held)
+
+        target = self.table.get((scan_code, self.mask, others))
+        if target is not None:
+            self.suppressed.add(scan_code)
+        return target
+
+    def _on_event(self, event):
+        with self._lock:
+            result = self.process(event.scan_code, event.event_type == keyboard.KEY_DOWN)
+        if result is None:
+            return True
+        if result is not True:
+            # Release the held modifiers so they do not combine with the sent keys, like keyboard.remap_hotkey
+            held = sorted(self.held_modifiers)
+            for code in held:
+                keyboard.release(code)
+            keyboard.send(result)
+            for code in reversed(held):
+                keyboard.press(code)
+        return False
+
+    def start(self, shortcuts):
+        """Compile the shortcuts and install the hook (once; later calls only swap the table).
+
+        Without any shortcut the hook is removed instead, so key presses are not intercepted for nothing.
+        """
+        if not self.compile(shortcuts):
+            self.stop()
+            return
+        if self._hook is None:
+            self._hook = keyboard.hook(self._on_event, suppress=True)
+
+    def stop(self):
+        if self._hook is not None:
+            keyboard.unhook(self._hook)
+            self._hook = None
+        with self._lock:
+            self.held_modifiers.clear()
+            self.mask = 0
+            self.held.clear()
+            self.others = NO_KEYS
+            self.suppressed.clear()
+
+
+_hotkey_engine = None
+
+def get_hotkey_engine():
+    """Return the process-wide hotkey engine."""
+    global _hotkey_engine
+    if _hotkey_engine is None:
+        _hotkey_engine = HotkeyEngine()
+    return _hotkey_engine
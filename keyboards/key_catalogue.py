@@ -0,0 +1,118 @@
+# key_catalogue.py
+from collections import namedtuple
+from types import MappingProxyType
+
+Key = namedtuple("Key", ["name", "scancode", "vk", "hook_name"])
+
+# (display name, set 1 scancode, virtual-key code, `keyboard` library name)
+# Extended scancodes carry their prefix in the high byte (0xE0, 0xE1 for Pause), as the
+# Scancode Map stores them. The plain Shift, Ctrl and Alt match either side in hotkeys
+# and stand for the left key when remapping. Numpad keys have no hook name: the hook
+# library reports them under the digit and operator names.
+KEYS = (
+    ("A", 0x1E, 0x41, "a"), ("B", 0x30, 0x42, "b"), ("C", 0x2E, 0x43, "c"), ("D", 0x20, 0x44, "d"),
+    ("E", 0x12, 0x45, "e"), ("F", 0x21, 0x46, "f"), ("G", 0x22, 0x47, "g"), ("H", 0x23, 0x48, "h"),
+    ("I", 0x17, 0x49, "i"), ("J", 0x24, 0x4A, "j"), ("K", 0x25, 0x4B, "k"), ("L", 0x26, 0x4C, "l"),
+    ("M", 0x32, 0x4D, "m"), ("N", 0x31, 0x4E, "n"), ("O", 0x18, 0x4F, "o"), ("P", 0x19, 0x50, "p"),
+    ("Q", 0x10, 0x51, "q"), ("R", 0x13, 0x52, "r"), ("S", 0x1F, 0x53, "s"), ("T", 0x14, 0x54, "t"),
+    ("U", 0x16, 0x55, "u"), ("V", 0x2F, 0x56, "v"), ("W", 0x11, 0x57, "w"), ("X", 0x2D, 0x58, "x"),
+    ("Y", 0x15, 0x59, "y"), ("Z", 0x2C, 0x5A, "z"),
+
+    # Numbers
+    ("0", 0x0B, 0x30, "0"), ("1", 0x02, 0x31, "1"), ("2", 0x03, 0x32, "2"), ("3", 0x04, 0x33, "3"),
+    ("4", 0x05, 0x34, "4"), ("5", 0x06, 0x35, "5"), ("6", 0x07, 0x36, "6"), ("7", 0x08, 0x37, "7"),
+    ("8", 0x09, 0x38, "8"), ("9", 0x0A, 0x39, "9"),
+
+    # Special characters
+    ("`", 0x29, 0xC0, "`"), ("-", 0x0C, 0xBD, "-"), ("=", 0x0D, 0xBB, "="), ("[", 0x1A, 0xDB, "["),
+    ("]", 0x1B, 0xDD, "]"), ("\\", 0x2B, 0xDC, "\\"), (";", 0x27, 0xBA, ";"), ("'", 0x28, 0xDE, "'"),
+    (",", 0x33, 0xBC, ","), (".", 0x34, 0xBE, "."), ("/", 0x35, 0xBF, "/"),
+
+    # Function keys
+    ("Esc", 0x01, 0x1B, "esc"), ("F1", 0x3B, 0x70, "f1"), ("F2", 0x3C, 0x71, "f2"), ("F3", 0x3D, 0x72, "f3"),
+    ("F4", 0x3E, 0x73, "f4"), ("F5", 0x3F, 0x74, "f5"), ("F6", 0x40, 0x75, "f6"), ("F7", 0x41, 0x76, "f7"),
+    ("F8", 0x42, 0x77, "f8"), ("F9", 0x43, 0x78, "f9"), ("F10", 0x44, 0x79, "f10"), ("F11", 0x57, 0x7A, "f11"),
+    ("F12", 0x58, 0x7B, "f12"),
+
+    # Control keys
+    ("Tab", 0x0F, 0x09, "tab"), ("Caps Lock", 0x3A, 0x14, "caps lock"),
+    ("Left Shift", 0x2A, 0xA0, "left shift"), ("Right Shift", 0x36, 0xA1, "right shift"),
+    ("Left Ctrl", 0x1D, 0xA2, "left ctrl"), ("Right Ctrl", 0xE01D, 0xA3, "right ctrl"),
+    ("Left Alt", 0x38, 0xA4, "left alt"), ("Right Alt", 0xE038, 0xA5, "right alt"),
+    ("Shift", 0x2A, 0x10, "shift"), ("Ctrl", 0x1D, 0x11, "ctrl"), ("Alt", 0x38, 0x12, "alt"),
+    ("Space", 0x39, 0x20, "space"), ("Enter", 0x1C, 0x0D, "enter"), ("Backspace", 0x0E, 0x08, "backspace"),
+
+    # Arrow keys
+    ("Up", 0xE048, 0x26, "up"), ("Down", 0xE050, 0x28, "down"), ("Left", 0xE04B, 0x25, "left"), ("Right", 0xE04D, 0x27, "right"),
+
+    # Numpad keys
+    ("Numpad 0", 0x52, 0x60, None), ("Numpad 1", 0x4F, 0x61, None), ("Numpad 2", 0x50, 0x62, None),
+    ("Numpad 3", 0x51, 0x63, None), ("Numpad 4", 0x4B, 0x64, None), ("Numpad 5", 0x4C, 0x65, None),
+    ("Numpad 6", 0x4D, 0x66, None), ("Numpad 7", 0x47, 0x67, None), ("Numpad 8", 0x48, 0x68, None),
+    ("Numpad 9", 0x49, 0x69, None), ("Numpad +", 0x4E, 0x6B, None), ("Numpad -", 0x4A, 0x6D, None),
+    ("Numpad *", 0x37, 0x6A, None), ("Numpad /", 0xE035, 0x6F, None), ("Numpad .", 0x53, 0x6E, None),
+    ("Numpad Enter", 0xE01C, 0x0D, None),
+
+    # Other keys
+    ("Insert", 0xE052, 0x2D, "insert"), ("Delete", 0xE053, 0x2E, "delete"), ("Home", 0xE047, 0x24, "home"),
+    ("End", 0xE04F, 0x23, "end"), ("Page Up", 0xE049, 0x21, "page up"), ("Page Down", 0xE051, 0x22, "page down"),
+    ("Print Screen", 0xE037, 0x2C, "print screen"), ("Scroll Lock", 0x46, 0x91, "scroll lock"),
+    ("Pause", 0xE11D, 0x13, "pause"), ("Num Lock", 0x45, 0x90, "num lock"),
+
+    # Windows and Application keys
+    ("Left Win", 0xE05B, 0x5B, "left windows"), ("Right Win", 0xE05C, 0x5C, "right windows"), ("Application", 0xE05D, 0x5D, "apps"),
+)
+
+
+class KeyCatalogue:
+    """Every key the program knows, with O(1) lookups between its names and codes.
+
+    Built once per process and read-only, so the views, the profile compiler and the
+    command line share it. When several keys have the same code (Shift and Left Shift,
+    Enter and Numpad Enter), lookups by code return the first one in KEYS.
+    """
+
+    def __init__(self, keys=KEYS):
+        self.keys = tuple(Key(*key) for key in keys)
+        self.by_name = MappingProxyType({key.name: key for key in self.keys})
+        self.by_scancode = MappingProxyType(self._first(key.scancode for key in self.keys))
+        self.by_vk = MappingProxyType(self._first(key.vk for key in self.keys))
+        self.by_hook_name = MappingProxyType(self._first(key.hook_name for key in self.keys))
+
+        # Dropdown values: one name per scancode for remapping, every hookable key for hotkeys
+        self.remap_names = tuple(key.name for key in self.keys if self.by_scancode[key.scancode] is key)
+        self.hotkey_names = tuple(key.name for key in self.keys if key.hook_name)
+
+    def _first(self, codes):
+        index = {}
+        for key, code in zip(self.keys, codes):
+            if code is not None:
+                index.setdefault(code, key)
+        return index
+
+    def scancode(self, name):
+        """Scancode of a key name; raises KeyError for unknown names."""
+        return self.by_name[name].scancode
+
+    def scancode_name(self, scancode):
+        """Key name of a scancode, or None."""
+        key = self.by_scancode.get(scancode)
+        return key.name if key else None
+
+    def hook_name(self, name):
+        """`keyboard` library name of a key name; names it does not know are passed on lower-cased."""
+        key = self.by_name.get(name)
+        return key.hook_name if key and key.hook_name else name.lower()
+
+    def __contains__(self, name):
+        return name in self.by_name
+
+
+_key_catalogue = None
+
+def get_key_catalogue():
+    """Return the process-wide key catalogue."""
+    global _key_catalogue
+    if _key_catalogue is None:
+        _key_catalogue = KeyCatalogue()
+    return _key_catalogue
@@ -1,65 +1,33 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
-from reboot_prompt import prompt_reboot
-import winreg
 from widgets.button import BouncingButton
 from widgets.sliding_frames import SlidingFrame
-from configuration_manager import ScreenInfo
+from widgets.virtual_list import ListModel, VirtualList
+from configuration_manager import get_screen_info
+from registry.registry_backend import HKLM, WriteBatch
+from registry.pending_changes import get_pending_changes
+from registry.managed_keys import KEYBOARD_LAYOUT_PATH
+from keyboards.key_catalogue import get_key_catalogue
+from keyboards.scancode_map import ScancodeMapError, decode_remappings
+from keyboards.key_remaps import remap_batch
+from keyboards.remap_graph import RemapGraph, errors
+from registry.registry_snapshot import get_registry_snapshot
+from registry.registry_watcher import get_registry_watcher
 
 class KeyRemapView(SlidingFrame):
     def __init__(self, parent, controller):
-        self.screen_info = ScreenInfo()
+        self.screen_info = get_screen_info()
         super().__init__(parent, width=self.screen_info.window_width, height=self.screen_info.window_height)
         self.controller = controller
 
-        self.available_keys = {
-            "A": 0x1E, "B": 0x30, "C": 0x2E, "D": 0x20,
-            "E": 0x12, "F": 0x21, "G": 0x22, "H": 0x23,
-            "I": 0x17, "J": 0x24, "K": 0x25, "L": 0x26,
-            "M": 0x32, "N": 0x31, "O": 0x18, "P": 0x19,
-            "Q": 0x10, "R": 0x13, "S": 0x1F, "T": 0x14,
-            "U": 0x16, "V": 0x2F, "W": 0x11, "X": 0x2D,
-            "Y": 0x15, "Z": 0x2C,
-            
-            # Numbers
-            "0": 0x0B, "1": 0x02, "2": 0x03, "3": 0x04, "4": 0x05,
-            "5": 0x06, "6": 0x07, "7": 0x08, "8": 0x09, "9": 0x0A,
-
-            # Special characters
-            "`": 0x29, "-": 0x0C, "=": 0x0D, "[": 0x1A, "]": 0x1B,
-            "\\": 0x2B, ";": 0x27, "'": 0x28, ",": 0x33, ".": 0x34, "/": 0x35,
-
-            # Function keys
-            "Esc": 0x01, "F1": 0x3B, "F2": 0x3C, "F3": 0x3D, "F4": 0x3E,
-            "F5": 0x3F, "F6": 0x40, "F7": 0x41, "F8": 0x42, "F9": 0x43,
-            "F10": 0x44, "F11": 0x57, "F12": 0x58,
-
-            # Control keys
-            "Tab": 0x0F, "Caps Lock": 0x3A, "Shift": 0x2A, "Left Ctrl": 0x1D,
-            "Right Ctrl": 0x1D, "Left Alt": 0x38, "Right Alt": 0x38, "Space": 0x39,
-            "Enter": 0x1C, "Backspace": 0x0E,
-
-            # Arrow keys
-            "Up": 0x48, "Down": 0x50, "Left": 0x4B, "Right": 0x4D,
-
-            # Numpad keys
-            "Numpad 0": 0x52, "Numpad 1": 0x4F, "Numpad 2": 0x50, "Numpad 3": 0x51,
-            "Numpad 4": 0x4B, "Numpad 5": 0x4C, "Numpad 6": 0x4D, "Numpad 7": 0x47,
-            "Numpad 8": 0x48, "Numpad 9": 0x49, "Numpad +": 0x4E, "Numpad -": 0x4A,
-            "Numpad *": 0x37, "Numpad /": 0x35, "Numpad .": 0x53,
-
-            # Other keys
-            "Insert": 0x52, "Delete": 0x53, "Home": 0x47, "End": 0x4F,
-            "Page Up": 0x49, "Page Down": 0x51, "Print Screen": 0x37, "Scroll Lock": 0x46,
-            "Pause": 0x45, "Num Lock": 0x45,
-
-            # Windows and Application keys
-            "Left Win": 0x5B, "Right Win": 0x5C, "Application": 0x5D
-        }
+        self.key_catalogue = get_key_catalogue()
+
+        # Checks every added remapping against the others, by scancode
+        self.remap_graph = RemapGraph(name=self.key_catalogue.scancode_name)
 
         # Store the remapped keys
-        self.remapped_keys = []
+        self.remapped_keys = ListModel()
         padding_x, padding_y = self.screen_info.padding_x, self.screen_info.padding_y
 
         scroll_width = self.screen_info.window_width - 2 * self.screen_info.padding_x
@@ -72,24 +40,27 @@ class KeyRemapView(SlidingFrame):
         # Layout
         self.setup_ui()
 
+        # Follow changes to the Scancode Map made outside of the program
+        get_registry_watcher().subscribe(self.on_registry_change, keys=[(HKLM, KEYBOARD_LAYOUT_PATH)])
+
     def setup_ui(self):
         # Dropdowns for key selection
         ctk.CTkLabel(self.container_frame, text="Select Key to Remap:").pack(pady=5)
         self.key_from_var = tk.StringVar()
-        self.key_from_dropdown = ctk.CTkComboBox(self.container_frame, variable=self.key_from_var, values=list(self.available_keys.keys()))
+        self.key_from_dropdown = ctk.CTkComboBox(self.container_frame, variable=self.key_from_var, values=self.key_catalogue.remap_names)
         self.key_from_dropdown.pack(pady=5)
 
         ctk.CTkLabel(self.container_frame, text="Select Key to Remap To:").pack(pady=5)
         self.key_to_var = tk.StringVar()
-        self.key_to_dropdown = ctk.CTkComboBox(self.container_frame, variable=self.key_to_var, values=list(self.available_keys.keys()))
+        self.key_to_dropdown = ctk.CTkComboBox(self.container_frame, variable=self.key_to_var, values=self.key_catalogue.remap_names)
         self.key_to_dropdown.pack(pady=5)
 
         # Add button
         BouncingButton(self.container_frame, text="Add Remapping", command=self.add_remapping).pack(pady=10)
 
         # Scrollable frame to display remapped keys
-        self.scrollable_frame = ctk.CTkScrollableFrame(self.container_frame, width=400, height=200)
-        self.scrollable_frame.pack(pady=10)
+        self.remapped_list = VirtualList(self.container_frame, self.remapped_keys, width=400, height=200)
+        self.remapped_list.pack(pady=10)
 
         self.get_remapped_list() #retrieves the remapped keys from the registry and updates the list
 
@@ -100,8 +71,6 @@ class KeyRemapView(SlidingFrame):
         BouncingButton(button_frame, text="Reset", command=self.reset_mappings).grid(row=0, column=1, padx=10)
 
         BouncingButton(self.container_frame, text="Back", command=self.controller.wrap_command(self.controller.go_back)).pack(pady=10)
-        # List to display the current remappings
-        self.update_remapped_list()
 
     def add_remapping(self):
         key_from = self.key_from_var.get()
@@ -110,52 +79,33 @@ class KeyRemapView(SlidingFrame):
         if not key_from or not key_to:
             messagebox.showwarning("Input Error", "Please select both keys.")
             return
+        if key_from not in self.key_catalogue or key_to not in self.key_catalogue:
+            messagebox.showwarning("Input Error", "Please select keys from the lists.")
+            return
+
+        # Duplicates, conflicts and no-ops are refused; chains are added after a warning
+        problems = self.remap_graph.add(self.key_catalogue.scancode(key_from), self.key_catalogue.scancode(key_to))
+        if errors(problems):
+            messagebox.showwarning("Remapping Not Added", "\n".join(problem.message for problem in problems))
+            return
+        if problems:
+            messagebox.showinfo("Check Remapping", "\n".join(problem.message for problem in problems))
 
         # Add the remapping to the list
         remapping = f"{key_from} -> {key_to}"
         self.remapped_keys.append(remapping)
-        self.update_remapped_list()
-
-    def update_remapped_list(self):
-        # Clear the current list in the scrollable frame
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-
-        # Display each remapped key
-        for remapping in self.remapped_keys:
-            ctk.CTkLabel(self.scrollable_frame, text=remapping).pack(pady=5)
 
     def save_mappings(self):
         try:
-            reg_key = winreg.CreateKey(winreg.HKEY_LOCAL_MACHINE, r"SYSTEM\CurrentControlSet\Control\Keyboard Layout")
-            scancode_map = self.generate_scancode_map()
-            winreg.SetValueEx(reg_key, "Scancode Map", 0, winreg.REG_BINARY, scancode_map)
-            winreg.CloseKey(reg_key)
-            
-            prompt_reboot()
-            
+            batch = remap_batch(remapping.split(" -> ") for remapping in self.remapped_keys)
+
+            # Written by "Apply All Changes", which prompts for a reboot only if the map is different
+            get_pending_changes().stage(batch)
+
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save remappings: {e}")
-
-    def generate_scancode_map(self):
-        # Initialize the scancode map structure
-        mappings = []
-        for remapping in self.remapped_keys:
-            key_from, key_to = remapping.split(" -> ")
-            key_from_scancode = self.available_keys[key_from]
-            key_to_scancode = self.available_keys[key_to]
-            mappings.append((key_to_scancode, key_from_scancode))
-
-        # The scancode map format:
-        # - Header: 8 bytes
-        # - Number of mappings + 1 (for null entry) (4 bytes)
-        # - Mappings: 4 bytes each (target, source) per entry
-        # - Footer: 4 bytes (null mapping)
-        num_mappings = len(mappings) + 1
-        header = b"\x00\x00\x00\x00\x00\x00\x00\x00"
-        body = b"".join([key_to.to_bytes(2, 'little') + key_from.to_bytes(2, 'little') for key_to, key_from in mappings])
-        footer = b"\x00\x00\x00\x00"
-        return header + num_mappings.to_bytes(4, 'little') + body + footer
+            return
+        messagebox.showinfo("Changes Staged", "Key remappings have been staged. Use \"Apply All Changes\" in the main menu to apply them.")
 
     def reset_mappings(self):
 
@@ -163,32 +113,24 @@ class KeyRemapView(SlidingFrame):
         
         if response:
             try:
-                self.remapped_keys = []
-                self.update_remapped_list()
+                self.remapped_keys.clear()
+                self.remap_graph.clear()
                 
-                # Remove the Scancode Map from the registry
-                reg_key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SYSTEM\CurrentControlSet\Control\Keyboard Layout", 0, winreg.KEY_ALL_ACCESS)
-                winreg.DeleteValue(reg_key, "Scancode Map")
-                winreg.CloseKey(reg_key)
-
-                # Inform the user that the mappings have been reset
-                prompt_reboot()
+                # Stage removing the Scancode Map from the registry
+                get_pending_changes().stage(WriteBatch().delete(HKLM, KEYBOARD_LAYOUT_PATH, "Scancode Map"))
                             
             except FileNotFoundError: #No remapping information at the first place
                 #print("No remapping found in the registry.")
                 pass
             except Exception as e:
-                #print(f"Failed to delete Scancode Map from registry")
-                pass
+                messagebox.showerror("Error", f"Failed to reset remappings: {e}")
+                return
+            messagebox.showinfo("Changes Staged", "Removing the key remappings has been staged. Use \"Apply All Changes\" in the main menu to apply it.")
 
     def get_remapped_list(self):
         try:
-            # Open the registry key
-            reg_key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SYSTEM\CurrentControlSet\Control\Keyboard Layout", 0, winreg.KEY_READ)
-
             # Try to read the Scancode Map value
-            scancode_map, _ = winreg.QueryValueEx(reg_key, "Scancode Map")
-            winreg.CloseKey(reg_key)
+            scancode_map, _ = get_registry_snapshot().read_value(HKLM, KEYBOARD_LAYOUT_PATH, "Scancode Map")
 
             # Decode the scancode map
             if scancode_map:
@@ -199,37 +141,33 @@ class KeyRemapView(SlidingFrame):
         except Exception as e:
             print(f"Failed to read Scancode Map from registry: {e}")
 
+    def on_registry_change(self, changes):
+        """Reload the remapping list when the Scancode Map was changed outside of the program."""
+        scancode_map = changes.get((HKLM, KEYBOARD_LAYOUT_PATH, "Scancode Map"))
+        self.remapped_keys.clear()
+        self.remap_graph.clear()
+        if scancode_map:
+            self.decode_and_update_remapped_keys(scancode_map)
+
     def decode_and_update_remapped_keys(self, scancode_map):
         if not scancode_map or len(scancode_map) < 12:
             return
 
-        self.remapped_keys = []  # Reset the remapped keys list
-        mappings = []
-
-        # Number of mappings + 1 (the last 4 bytes are null, indicating the end)
-        num_mappings = int.from_bytes(scancode_map[8:12], byteorder='little') - 1
-
-        # Each mapping consists of 4 bytes (new key, old key)
-        for i in range(num_mappings):
-            offset = 12 + i * 4
-            new_key = int.from_bytes(scancode_map[offset:offset + 2], byteorder='little')
-            old_key = int.from_bytes(scancode_map[offset + 2:offset + 4], byteorder='little')
-
-            # Find the corresponding key names using the self.available_keys dictionary
-            old_key_name = self.get_key_name_by_scancode(old_key)
-            new_key_name = self.get_key_name_by_scancode(new_key)
-
-            # If both keys are valid, add the remapping to the list
-            if old_key_name and new_key_name:
-                remapping = f"{old_key_name} -> {new_key_name}"
-                self.remapped_keys.append(remapping)
-
-        # Update the UI with the remapped keys
-        self.update_remapped_list()
-
-    def get_key_name_by_scancode(self, scancode):
-        # Search the available_keys dictionary to find the key by its scancode
-        for key_name, key_scancode in self.available_keys.items():
-            if key_scancode == scancode:
-                return key_name
-        return None
\ No newline at end of file
+        # Keys without a name in the key catalogue are not listed
+        try:
+            remappings = decode_remappings(scancode_map)
+        except ScancodeMapError as e:
+            print(f"Ignoring the Scancode Map in the registry: {e}")
+            return
+        remapped_keys = []
+        self.remap_graph.clear()
+        for old_key_name, new_key_name in remappings:
+            problems = self.remap_graph.add(self.key_catalogue.scancode(old_key_name), self.key_catalogue.scancode(new_key_name))
+            if errors(problems):
+                # Dropped from the list, so the next save writes a clean map
+                print(f"Skipping remapping in the registry: {problems[0].message}")
+                continue
+            remapped_keys.append(f"{old_key_name} -> {new_key_name}")
+
+        # Update the UI with the remapped keys in one go
+        self.remapped_keys.reset(remapped_keys)
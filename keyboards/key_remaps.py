@@ -0,0 +1,24 @@
+# key_remaps.py
+from keyboards.scancode_map import decode_remappings, encode_remappings
+from registry.managed_keys import KEYBOARD_LAYOUT_PATH
+from registry.registry_backend import HKLM, REG_BINARY, WriteBatch
+
+
+def remap_batch(remappings):
+    """WriteBatch replacing the Scancode Map with ("from key name", "to key name") pairs.
+
+    No remappings deletes the value instead of writing an empty map.
+    """
+    remappings = list(remappings)
+    if not remappings:
+        return WriteBatch().delete(HKLM, KEYBOARD_LAYOUT_PATH, "Scancode Map")
+    return WriteBatch().set(HKLM, KEYBOARD_LAYOUT_PATH, "Scancode Map", encode_remappings(remappings), REG_BINARY)
+
+
+def read_remappings(registry):
+    """Current ("from key name", "to key name") pairs, [] if there is no Scancode Map."""
+    try:
+        scancode_map, _ = registry.read_value(HKLM, KEYBOARD_LAYOUT_PATH, "Scancode Map")
+    except FileNotFoundError:
+        return []
+    return decode_remappings(scancode_map)
@@ -1,18 +1,20 @@
 import customtkinter as ctk
 import tkinter as tk
 from tkinter import messagebox
-from configuration_manager import ScreenInfo
+from configuration_manager import get_screen_info
 from widgets.switch import AnimatedSwitch
-import keyboard
-import json
-import os
 from widgets.sliding_frames import SlidingFrame
+from widgets.virtual_list import ListModel, VirtualList
 from widgets.theme_manager import register_theme_change_callback
+from settings.settings_store import get_settings_store
+from keyboards.hotkey_engine import get_hotkey_engine
+from keyboards.key_catalogue import get_key_catalogue
+from keyboards.remap_graph import RemapGraph, errors
+from keyboards.shortcut_store import load_shortcuts, save_shortcuts
+from settings.profiles import get_profile_store
 
 # Dictionary to store shortcut remappings
 shortcut_remappings = {}
-SHORTCUT_FILE = "shortcuts.json"
-SETTINGS_FILE = "settings/settings.json"
 
 class BouncingButton(ctk.CTkButton):
     def __init__(self, *args, **kwargs):
@@ -26,11 +28,14 @@ class BouncingButton(ctk.CTkButton):
 
 class KeyShortcutsView(SlidingFrame):
     def __init__(self, parent, controller):
-        self.screen_info = ScreenInfo()
+        self.screen_info = get_screen_info()
         super().__init__(parent, width=self.screen_info.window_width, height=self.screen_info.window_height)
         self.controller = controller
-        self.available_keys = self.get_available_keys()
-        self.shortcut_mappings = []  # To display in the UI
+        self.key_catalogue = get_key_catalogue()
+
+        # Remapped hotkeys are sent as key events that can trigger other remaps, so chains and cycles matter
+        self.shortcut_graph = RemapGraph(chained=True, name=" + ".join)
+        self.shortcut_mappings = ListModel()  # To display in the UI
 
         padding_x, padding_y = self.screen_info.padding_x, self.screen_info.padding_y
 
@@ -50,27 +55,8 @@ class KeyShortcutsView(SlidingFrame):
         self.setup_ui()
         self.load_settings_and_shortcuts()
 
-    def get_available_keys(self):
-        # Define key mappings
-        return {
-            "A": "a", "B": "b", "C": "c", "D": "d",
-            "E": "e", "F": "f", "G": "g", "H": "h",
-            "I": "i", "J": "j", "K": "k", "L": "l",
-            "M": "m", "N": "n", "O": "o", "P": "p",
-            "Q": "q", "R": "r", "S": "s", "T": "t",
-            "U": "u", "V": "v", "W": "w", "X": "x",
-            "Y": "y", "Z": "z",
-            "0": "0", "1": "1", "2": "2", "3": "3", "4": "4",
-            "5": "5", "6": "6", "7": "7", "8": "8", "9": "9",
-            "`": "`", "-": "-", "=": "=", "[": "[", "]": "]",
-            "\\": "\\", ";": ";", "'": "'", ",": ",", ".": ".", "/": "/",
-            "Esc": "esc", "F1": "f1", "F2": "f2", "F3": "f3", "F4": "f4",
-            "F5": "f5", "F6": "f6", "F7": "f7", "F8": "f8", "F9": "f9",
-            "F10": "f10", "F11": "f11", "F12": "f12",
-            "Tab": "tab", "Caps Lock": "caps lock", "Shift": "shift", "Ctrl": "ctrl",
-            "Alt": "alt", "Space": "space", "Enter": "enter", "Backspace": "backspace",
-            "Up": "up", "Down": "down", "Left": "left", "Right": "right"
-        }
+        # Profiles replace shortcuts.json, pick the new shortcuts up right away
+        get_profile_store().subscribe(self.on_profile_applied)
 
     def setup_ui(self):
         # Initialize the switch and bind the toggle method
@@ -95,12 +81,12 @@ class KeyShortcutsView(SlidingFrame):
         self.key_to_dropdowns = []
 
         for i in range(0, 4):
-            dropdown_from = ctk.CTkComboBox(self.from_key_frame, variable=self.key_from_vars[i], values=list(self.available_keys.keys()), 
+            dropdown_from = ctk.CTkComboBox(self.from_key_frame, variable=self.key_from_vars[i], values=self.key_catalogue.hotkey_names, 
                                             command=lambda value, idx=i : self.change_dropdown(0, 'dropdown', idx), width=self.dropdown_width)
             dropdown_from.pack(side=tk.LEFT, padx=5, pady=5)
             self.dropdown_lists[0].append(dropdown_from)
 
-            dropdown_to = ctk.CTkComboBox(self.to_key_frame, variable=self.key_to_vars[i], values=list(self.available_keys.keys()), 
+            dropdown_to = ctk.CTkComboBox(self.to_key_frame, variable=self.key_to_vars[i], values=self.key_catalogue.hotkey_names, 
                                           command=lambda value, idx=i : self.change_dropdown(1, 'dropdown', idx), width=self.dropdown_width)
             dropdown_to.pack(side=tk.LEFT, padx=5, pady=5)
             self.dropdown_lists[1].append(dropdown_to)
@@ -123,8 +109,9 @@ class KeyShortcutsView(SlidingFrame):
         self.add_button.pack(pady=10)
 
         # Scrollable frame for displaying shortcut mappings
-        self.scrollable_frame = ctk.CTkScrollableFrame(self.container_frame, width=self.screen_info.window_width*0.8, height=self.screen_info.window_height*0.3)
-        self.scrollable_frame.pack(pady=10)
+        self.shortcut_list = VirtualList(self.container_frame, self.shortcut_mappings,
+                                         width=int(self.screen_info.window_width*0.8), height=int(self.screen_info.window_height*0.3))
+        self.shortcut_list.pack(pady=10)
 
         # Save and reset buttons
         button_frame = ctk.CTkFrame(self.container_frame)
@@ -142,27 +129,37 @@ class KeyShortcutsView(SlidingFrame):
     def load_settings_and_shortcuts(self):
         """Load settings from settings.json and apply initial shortcut remapping settings."""
         # Load settings
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, "r") as f:
-                settings_data = json.load(f)
-                remapping_enabled = settings_data.get("enable_hotkey_remapping", False)
-                self.animated_switch.set(remapping_enabled)  # Set switch based on settings
-                self.toggle_shortcuts()  # Update UI elements based on switch state
-
-        # Load shortcuts
-        if os.path.exists(SHORTCUT_FILE):
-            with open(SHORTCUT_FILE, "r") as f:
-                saved_shortcuts = json.load(f)
-                for key, mapping in saved_shortcuts.items():
-                    shortcut_remappings[key] = mapping
-                    from_keys = mapping['modifiers'] + [mapping['key']]
-                    to_keys = mapping['to_modifiers'] + [mapping['to_key']]
-                    remapping = f"{' + '.join(from_keys)} -> {' + '.join(to_keys)}"
-                    self.shortcut_mappings.append(remapping)
-                self.update_shortcut_list()
-
-                if self.animated_switch.get():
-                    self.apply_shortcuts()
+        remapping_enabled = get_settings_store().settings.enable_hotkey_remapping
+        self.animated_switch.set(remapping_enabled)  # Set switch based on settings
+
+        # Load shortcuts before the switch state applies them
+        self.load_shortcuts(apply=False)
+        self.toggle_shortcuts()  # Update UI elements based on switch state
+
+    def load_shortcuts(self, apply=True):
+        """Show the saved shortcuts and register them if `apply` and remapping is enabled."""
+        saved_shortcuts = load_shortcuts()
+        shortcut_mappings = []
+        for key, mapping in saved_shortcuts.items():
+            shortcut_remappings[key] = mapping
+            from_keys = mapping['modifiers'] + [mapping['key']]
+            to_keys = mapping['to_modifiers'] + [mapping['to_key']]
+            self.shortcut_graph.add(self.chord(from_keys), self.chord(to_keys))
+            shortcut_mappings.append(f"{' + '.join(from_keys)} -> {' + '.join(to_keys)}")
+        self.shortcut_mappings.reset(shortcut_mappings)
+
+        if apply and saved_shortcuts and self.animated_switch.get():
+            self.apply_shortcuts()
+
+    def on_profile_applied(self, name, compiled):
+        """Replace the shortcuts with the ones of a profile that was just applied."""
+        if compiled.shortcuts is None:
+            return
+        if self.animated_switch.get():
+            get_hotkey_engine().stop()
+        shortcut_remappings.clear()
+        self.shortcut_graph.clear()
+        self.load_shortcuts()
 
     def toggle_shortcuts(self):
         """Enable or disable UI elements based on switch state."""
@@ -171,20 +168,12 @@ class KeyShortcutsView(SlidingFrame):
 
         # Unhook or apply hotkeys based on switch state
         if state == "disabled":
-            keyboard.unhook_all()
+            get_hotkey_engine().stop()
         else:
             self.apply_shortcuts()
 
-        # Update settings file with new switch state
-        if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, "r") as f:
-                settings_data = json.load(f)
-        else:
-            settings_data = {}
-
-        settings_data["enable_hotkey_remapping"] = state == "normal"
-        with open(SETTINGS_FILE, "w") as f:
-            json.dump(settings_data, f, indent=4)
+        # Update the setting, the store writes it to disk once toggling settles
+        get_settings_store().set("enable_hotkey_remapping", state == "normal")
 
     def toggle_widgets(self, state):
         """Enable or disable interactive widgets in the given frame, excluding the back button."""
@@ -250,6 +239,14 @@ class KeyShortcutsView(SlidingFrame):
             messagebox.showwarning("Input Error", "Please select keys for both from and to combinations.")
             return
 
+        # Overwriting a shortcut, no-ops and loops are refused; chains are added after a warning
+        problems = self.shortcut_graph.add(self.chord(keys_from), self.chord(keys_to))
+        if errors(problems):
+            messagebox.showwarning("Shortcut Not Added", "\n".join(problem.message for problem in problems))
+            return
+        if problems:
+            messagebox.showinfo("Check Shortcut", "\n".join(problem.message for problem in problems))
+
         shortcut = {
             'modifiers': keys_from[:-1],
             'key': keys_from[-1],
@@ -261,37 +258,36 @@ class KeyShortcutsView(SlidingFrame):
 
         remapping = f"{' + '.join(keys_from)} -> {' + '.join(keys_to)}"
         self.shortcut_mappings.append(remapping)
-        self.update_shortcut_list()
-
-    def update_shortcut_list(self):
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
 
-        for remapping in self.shortcut_mappings:
-            ctk.CTkLabel(self.scrollable_frame, text=remapping).pack(pady=5)
+    def chord(self, keys):
+        """Graph node of a key combination: its hook names, modifiers first, in a fixed order."""
+        names = {self.key_catalogue.hook_name(key) for key in keys}
+        return tuple(sorted(names, key=lambda name: (not name.endswith(("ctrl", "alt", "shift", "windows")), name)))
 
     def save_shortcuts(self):
-        with open(SHORTCUT_FILE, "w") as f:
-            json.dump(shortcut_remappings, f)
+        save_shortcuts(shortcut_remappings)
 
         self.apply_shortcuts()
         messagebox.showinfo("Success", "Shortcuts saved!")
 
     def apply_shortcuts(self):
-        for key, shortcut in shortcut_remappings.items():
-            self.register_hotkey(shortcut)
+        """Serve every shortcut from the hotkey engine's single keyboard hook."""
+        hook_name = self.key_catalogue.hook_name
+        shortcuts = {}
+        for combination, shortcut in shortcut_remappings.items():
+            shortcuts[combination] = {
+                'modifiers': [hook_name(key) for key in shortcut['modifiers']],
+                'key': hook_name(shortcut['key']),
+                'to_modifiers': [hook_name(key) for key in shortcut['to_modifiers']],
+                'to_key': hook_name(shortcut['to_key'])
+            }
+        get_hotkey_engine().start(shortcuts)
 
     def reset_shortcuts(self):
-        self.shortcut_mappings = []
+        self.shortcut_mappings.clear()
         shortcut_remappings.clear()
-        self.update_shortcut_list()
+        self.shortcut_graph.clear()
         messagebox.showinfo("Reset", "All shortcuts have been reset.")
-        if os.path.exists(SHORTCUT_FILE):
-            with open(SHORTCUT_FILE, "w") as f:
-                json.dump({}, f)
-        keyboard.unhook_all()
-
-    def register_hotkey(self, shortcut):
-        from_combination = '+'.join(shortcut['modifiers'] + [shortcut['key']])
-        to_combination = '+'.join(shortcut['to_modifiers'] + [shortcut['to_key']])
-        keyboard.remap_hotkey(from_combination, to_combination, suppress=True)
+        if load_shortcuts():
+            save_shortcuts({})
+        get_hotkey_engine().stop()
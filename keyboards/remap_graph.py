@@ -0,0 +1,108 @@
+# remap_graph.py
+from collections import namedtuple
+
+ERROR = "error"      # The remapping is not added
+WARNING = "warning"  # Added, but probably not what the user expects
+
+Problem = namedtuple("Problem", ["severity", "kind", "message"])
+
+
+class RemapGraph:
+    """Remappings as a directed graph (source -> target) that is checked on every add.
+
+    Each source has at most one target, so following a chain is a walk along single
+    edges and every check is O(1) apart from that walk. `chained` says whether the
+    output of one remapping can trigger the next: hotkey remaps send key events that
+    the hook sees again, so a cycle loops forever. The Scancode Map translates every
+    key once, so there swaps and rotations are fine, but a chain A -> B -> C gives
+    A -> B, not C.
+
+    `name(node)` turns a node into text for the messages.
+    """
+
+    def __init__(self, chained=False, name=str):
+        self.chained = chained
+        self.name = name
+        self.targets = {}  # source -> target
+        self._sources = {}  # target -> set of sources
+
+    def check(self, source, target):
+        """Problems adding source -> target would cause, without adding it."""
+        name = self.name
+        if source == target:
+            return [Problem(ERROR, "self", f"{name(source)} -> {name(target)} does nothing.")]
+
+        current = self.targets.get(source)
+        if current == target:
+            return [Problem(ERROR, "duplicate", f"{name(source)} -> {name(target)} is already in the list.")]
+        if current is not None:
+            return [Problem(ERROR, "conflict", f"{name(source)} is already remapped to {name(current)}.")]
+
+        cycle = self._path_to(target, source)
+        if cycle is not None and self.chained:
+            path = " -> ".join(name(node) for node in [source] + cycle)
+            return [Problem(ERROR, "cycle", f"{path} would trigger itself forever.")]
+
+        problems = []
+        if cycle is None and target in self.targets:
+            if self.chained:
+                problems.append(Problem(WARNING, "chain", f"{name(source)} -> {name(target)} continues to {name(self.targets[target])}."))
+            else:
+                problems.append(Problem(WARNING, "chain", f"{name(source)} types {name(target)}; the remapping of "
+                                                          f"{name(target)} to {name(self.targets[target])} does not apply to it."))
+        if self._sources.get(source) and cycle is None:
+            shadowed = ", ".join(sorted(name(node) for node in self._sources[source]))
+            if self.chained:
+                problems.append(Problem(WARNING, "shadowing", f"{shadowed} -> {name(source)} will now continue to {name(target)}."))
+            else:
+                problems.append(Problem(WARNING, "chain", f"{shadowed} will still type {name(source)}, not {name(target)}."))
+        return problems
+
+    def _path_to(self, start, end):
+        """Nodes from start along the remappings up to end, or None if end is not reached."""
+        path = [start]
+        node = start
+        for _ in range(len(self.targets)):
+            node = self.targets.get(node)
+            if node is None:
+                return None
+            path.append(node)
+            if node == end:
+                return path
+        return None
+
+    def add(self, source, target):
+        """Add source -> target unless that is an error. Returns the problems found."""
+        problems = self.check(source, target)
+        if not any(problem.severity == ERROR for problem in problems):
+            self.targets[source] = target
+            self._sources.setdefault(target, set()).add(source)
+        return problems
+
+    def remove(self, source):
+        target = self.targets.pop(source, None)
+        if target is not None:
+            self._sources[target].discard(source)
+
+    def clear(self):
+        self.targets.clear()
+        self._sources.clear()
+
+    def items(self):
+        return self.targets.items()
+
+    def __len__(self):
+        return len(self.targets)
+
+
+def analyze(pairs, chained=False, name=str):
+    """Build a graph from (source, target) pairs. Returns (graph, problems); rejected pairs are left out."""
+    graph = RemapGraph(chained, name)
+    problems = []
+    for source, target in pairs:
+        problems += graph.add(source, target)
+    return graph, problems
+
+
+def errors(problems):
+    return [problem for problem in problems if problem.severity == ERROR]
@@ -0,0 +1,70 @@
+# scancode_map.py
+import struct
+from keyboards.key_catalogue import get_key_catalogue
+
+# Scancode Map layout: 8 zero header bytes, a uint32 entry count (mappings + the
+# terminator), then one (to scancode, from scancode) uint16 pair per mapping and a
+# zero terminator, all little-endian
+HEADER_SIZE = 12
+ENTRY_SIZE = 4
+
+
+class ScancodeMapError(ValueError):
+    """A Scancode Map value that Windows would not accept."""
+
+
+def scancode_name(scancode):
+    """Key name of a scancode, or None."""
+    return get_key_catalogue().scancode_name(scancode)
+
+
+def encode_scancode_map(mappings):
+    """Build the Scancode Map value from (from scancode, to scancode) pairs."""
+    codes = []
+    for key_from, key_to in mappings:
+        if not (0 <= key_from <= 0xFFFF and 0 <= key_to <= 0xFFFF):
+            raise ScancodeMapError(f"Scancode out of range: {key_from:#x} -> {key_to:#x}")
+        codes += (key_to, key_from)
+    return struct.pack(f"<8xI{len(codes)}H4x", len(mappings) + 1, *codes)
+
+
+def decode_scancode_map(scancode_map):
+    """Return the (from scancode, to scancode) pairs of a Scancode Map value.
+
+    An empty or missing value has no mappings. Raises ScancodeMapError if the header,
+    entry count, size or terminator are invalid; valid values round-trip through
+    encode_scancode_map byte for byte.
+    """
+    if not scancode_map:
+        return []
+    view = memoryview(scancode_map)
+    if len(view) < HEADER_SIZE + ENTRY_SIZE or len(view) % ENTRY_SIZE:
+        raise ScancodeMapError(f"Invalid Scancode Map size: {len(view)} bytes")
+
+    version, flags, count = struct.unpack_from("<3I", view)
+    if version or flags:
+        raise ScancodeMapError("Invalid Scancode Map header")
+    if count < 1 or HEADER_SIZE + count * ENTRY_SIZE != len(view):
+        raise ScancodeMapError(f"Scancode Map entry count {count} does not match its size of {len(view)} bytes")
+    if any(view[-ENTRY_SIZE:]):
+        raise ScancodeMapError("Scancode Map does not end with a null entry")
+
+    codes = struct.unpack_from(f"<{(count - 1) * 2}H", view, HEADER_SIZE)
+    return list(zip(codes[1::2], codes[0::2]))
+
+
+def encode_remappings(remappings):
+    """Scancode Map value for ("from key name", "to key name") pairs."""
+    catalogue = get_key_catalogue()
+    return encode_scancode_map([(catalogue.scancode(key_from), catalogue.scancode(key_to)) for key_from, key_to in remappings])
+
+
+def decode_remappings(scancode_map):
+    """("from key name", "to key name") pairs of a Scancode Map value; unknown scancodes are skipped."""
+    catalogue = get_key_catalogue()
+    remappings = []
+    for old_key, new_key in decode_scancode_map(scancode_map):
+        old_key_name, new_key_name = catalogue.scancode_name(old_key), catalogue.scancode_name(new_key)
+        if old_key_name and new_key_name:
+            remappings.append((old_key_name, new_key_name))
+    return remappings
@@ -0,0 +1,24 @@
+# shortcut_store.py
+import json
+import os
+import tempfile
+
+# Next to main.py, wherever the program is started from
+SHORTCUT_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "shortcuts.json")
+
+
+def load_shortcuts(path=SHORTCUT_FILE):
+    """Return the saved shortcut remappings ({from combination: shortcut}), {} if there are none."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_shortcuts(shortcuts, path=SHORTCUT_FILE):
+    """Write the shortcut remappings (temporary file + rename, so readers never see half a file)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".shortcuts-", suffix=".tmp", dir=directory)
+    with os.fdopen(fd, "w") as f:
+        json.dump(shortcuts, f)
+    os.replace(temp_path, path)
@@ -0,0 +1,58 @@
+# lazy_imports.py
+import importlib
+import sys
+import threading
+import types
+
+_import_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """Module placeholder that imports the real module on first attribute access."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with _import_lock:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        module = self._load()
+        value = getattr(module, attr)
+        # Cache the attribute so later lookups skip __getattr__ entirely
+        self.__dict__[attr] = value
+        return value
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name):
+    """Return the module if it is already imported, otherwise a proxy that imports it on first use.
+
+    Import errors (e.g. a missing optional dependency) surface at first use rather
+    than at import time of the calling module.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def is_loaded(module):
+    """Check if a module returned by lazy_import has actually been imported."""
+    if isinstance(module, LazyModule):
+        return module.__dict__["_lazy_module"] is not None
+    return True
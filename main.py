@@ -1,10 +1,13 @@
+from startup_profiler import profiler
+import argparse
 import os
+import queue
 import sys
+import time
 import customtkinter as ctk
 import ctypes
-import json
-import psutil
 import tkinter as tk
+from tkinter import messagebox
 from tkinter.messagebox import askyesno
 
 # Import the consolidated trackpad view class
@@ -13,11 +16,23 @@ from trackpad.touchpad import TouchpadView
 from keyboards.key_mapping import KeyRemapView
 from keyboards.key_shortcuts import KeyShortcutsView
 from settings.settings import SettingsView
-from configuration_manager import ScreenInfo
+from settings.settings_store import get_settings_store
+from configuration_manager import get_screen_info
 from tray_icons import tray_manager
 from taskbar.taskbars import TaskbarView
 from widgets.button import BouncingButton
 from widgets.sliding_frames import SlidingFrame
+from view_registry import ViewRegistry
+from single_instance import RESTORE_MESSAGE, create_instance_guard
+from asset_loader import SIZED_ASSETS, get_asset_loader, start_preloading
+from registry.registry_watcher import get_registry_watcher
+from registry.apply_planner import APPLY_ACTIONS, COST_EXPLORER, set_dry_run
+from registry.pending_changes import get_pending_changes
+from registry.shell_refresh import restart_explorer_in_background
+
+IMPORTS_DONE = time.perf_counter()
+
+THREAD_CALL_POLL_MS = 200  # How often calls queued by other threads are run on the Tk thread
 
 def is_admin():
     """Check if the current script is run as an administrator."""
@@ -38,28 +53,32 @@ def run_as_admin(argv=None, debug=False):
     ctypes.windll.shell32.ShellExecuteW(None, "runas", executable, argument_line, None, 1)  # Change 1 to 0 for no terminal
     sys.exit(0)
 
-def is_already_running():
-    """Check if the program is already running to prevent multiple instances."""
-    current_process = psutil.Process()
-    for process in psutil.process_iter(['pid', 'name', 'cmdline']):
-        try:
-            if current_process.pid != process.pid and 'main.py' in process.cmdline():
-                return True
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            continue
-    return False
-
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="MyWindows")
+    parser.add_argument("--profile-startup", nargs="?", const="startup_profile.json", default=None, metavar="REPORT",
+                        help="time every start-up phase and write the results to a JSON report")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="print the registry changes a save would make instead of writing them")
+    # Ignore unknown arguments, e.g. the ones added by the admin re-launch
+    args, _ = parser.parse_known_args(argv)
+    return args
 
 class MainApp(ctk.CTk):
-    def __init__(self):
+    def __init__(self, eager_views=False):
         if not is_admin():
             run_as_admin()
 
-        super().__init__()
+        # Decode the view images on worker threads while the window and splash are set up
+        start_preloading()
+
+        with profiler.phase("Tk root"):
+            super().__init__()
         
-        self.screen_info = ScreenInfo()
+        with profiler.phase("ScreenInfo"):
+            self.screen_info = get_screen_info()
         
-        self.set_theme_from_settings()
+        with profiler.phase("theme load"):
+            self.set_theme_from_settings()
 
         self.title("Trackpad Registry Manager")
         self.resizable(False, False)
@@ -74,19 +93,24 @@ class MainApp(ctk.CTk):
         self.container.pack(fill="both", expand=True)
 
         # Create and display the IntroView within the main container
-        intro_frame = IntroView(self)
-        intro_frame.display()
+        with profiler.phase("IntroView"):
+            intro_frame = IntroView(self)
+            intro_frame.display()
 
         self.frame_stack = [self.container]
         
-        self.frames = {}
+        # Views are built on first use (or prewarmed in idle time) instead of all at startup
+        self.eager_views = eager_views
+        self.frames = ViewRegistry(self)
 
         self.touchpad_button_frame = SlidingFrame(self.container, width=self.container.winfo_width(), height=self.container.winfo_height())
         self.keyboard_button_frame = SlidingFrame(self.container, width=self.screen_info.window_width, height=self.screen_info.window_height)
 
         # Register the touchpad and keyboard frames in self.frames using unique keys
-        self.frames["TouchpadFrame"] = self.touchpad_button_frame
-        self.frames["KeyboardFrame"] = self.keyboard_button_frame
+        self.frames.register_instance("TouchpadFrame", self.touchpad_button_frame,
+                                      next_likely=("TrackpadCurtains", "TrackpadSuperCurtains", "TrackpadRightClick"))
+        self.frames.register_instance("KeyboardFrame", self.keyboard_button_frame,
+                                      next_likely=("KeyMapping", "KeyShortcuts"))
 
         # Main menu buttons: Trackpad, Keyboard, Taskbar, Settings, Quit
         self.main_buttons = [
@@ -94,22 +118,85 @@ class MainApp(ctk.CTk):
             ("Keyboard", self.wrap_command(lambda: self.show_frame("KeyboardFrame"))),
             ("Taskbar", self.wrap_command(lambda: self.show_frame("Taskbar"))),
             ("Settings", self.wrap_command(lambda: self.show_frame("Settings"))),
+            ("Apply All Changes", self.apply_all_changes),
             ("Quit", self.quit_app)
         ]
 
         self.main_button_objects = []
+        # Frames opened by each main menu button, prewarmed while the cursor hovers over it
+        main_button_targets = {"Trackpad": "TouchpadFrame", "Keyboard": "KeyboardFrame", "Taskbar": "Taskbar", "Settings": "Settings"}
+
         for text, command in self.main_buttons:
             btn = BouncingButton(self.container, text=text, command=command)
             btn.pack(fill="x", padx=10, pady=5, ipady=5)
+            if text in main_button_targets:
+                btn.bind("<Enter>", lambda event, key=main_button_targets[text]: self.prewarm_for(key), add="+")
             self.main_button_objects.append(btn)
+            if text == "Apply All Changes":
+                self.apply_all_button = btn
+
+        # The apply button doubles as the indicator of how many changes are staged
+        self.pending_changes = get_pending_changes()
+        self.pending_changes.subscribe(self.on_pending_changes)
+        self.on_pending_changes(0)
 
         self.after(100, self.create_sliding_frames)
 
-        tray_manager.start_main_tray_icon()
+        # Windows moves or resizes the window when the resolution, scaling or taskbar
+        # changes; recompute the shared screen metrics then, and only if they differ
+        self._display_check_pending = False
+        self.screen_info.subscribe(self.on_display_change)
+        self.bind("<Configure>", self.on_configure, add="+")
+        self.bind("<Map>", self.on_configure, add="+")
+        self.after_idle(self.attach_screen_info)
+
+        # Tk must only be used from this thread; other threads queue calls for it instead
+        self.thread_calls = queue.Queue()
+        self.after(THREAD_CALL_POLL_MS, self.run_thread_calls)
+
+        # Start the tray icon (and load pystray) once the window has been drawn
+        self.after_idle(self.start_tray_icon)
+
+        # Views get registry changes made outside of the program pushed to them on this thread
+        self.registry_watcher = get_registry_watcher()
+        self.registry_watcher.attach(self)
+        self.after_idle(self.registry_watcher.start)
         self.show_main_menu()
 
+    def call_from_thread(self, callback):
+        """Run `callback` on the Tk thread; safe to call from any thread."""
+        self.thread_calls.put(callback)
+
+    def run_thread_calls(self):
+        while True:
+            try:
+                callback = self.thread_calls.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in queued call: {e}")
+        self.after(THREAD_CALL_POLL_MS, self.run_thread_calls)
+
+    def start_tray_icon(self):
+        with profiler.phase("tray icon start"):
+            tray_manager.start_main_tray_icon()
+
     def create_sliding_frames(self):
         """Create the sliding frames and register frames using consistent string keys."""
+        with profiler.phase("create_sliding_frames"):
+            self.register_views()
+
+        # Startup is over once the event loop goes idle after the frames have been set up
+        self.after_idle(self.on_first_idle)
+
+    def on_first_idle(self):
+        profiler.mark("first idle")
+        profiler.finish()
+
+    def register_views(self):
+        """Build the submenu buttons and register the view factories."""
         # Create Trackpad sliding frame
         self.trackpad_buttons = [
             ("Curtains", self.wrap_command(lambda: self.show_frame("TrackpadCurtains"))),
@@ -122,10 +209,10 @@ class MainApp(ctk.CTk):
             btn = BouncingButton(self.touchpad_button_frame, text=text, command=command)
             btn.pack(fill="x", padx=10, pady=5, ipady=5)
 
-        # Register Trackpad views using string keys
-        self.frames["TrackpadCurtains"] = TouchpadView(self.container, self, mode="curtains")
-        self.frames["TrackpadSuperCurtains"] = TouchpadView(self.container, self, mode="supercurtains")
-        self.frames["TrackpadRightClick"] = TouchpadView(self.container, self, mode="rightclick")
+        # Register Trackpad view factories using string keys
+        self.frames.register("TrackpadCurtains", lambda: TouchpadView(self.container, self, mode="curtains"))
+        self.frames.register("TrackpadSuperCurtains", lambda: TouchpadView(self.container, self, mode="supercurtains"))
+        self.frames.register("TrackpadRightClick", lambda: TouchpadView(self.container, self, mode="rightclick"))
 
         # Create Keyboard sliding frame
         self.keyboard_buttons = [
@@ -138,13 +225,49 @@ class MainApp(ctk.CTk):
             btn = BouncingButton(self.keyboard_button_frame, text=text, command=command)
             btn.pack(fill="x", padx=10, pady=5, ipady=5)
 
-        # Register Keyboard views using string keys
-        self.frames["KeyMapping"] = KeyRemapView(self.container, self)
-        self.frames["KeyShortcuts"] = KeyShortcutsView(self.container, self)
+        # Register Keyboard view factories using string keys
+        self.frames.register("KeyMapping", lambda: KeyRemapView(self.container, self))
+        self.frames.register("KeyShortcuts", lambda: KeyShortcutsView(self.container, self))
+
+        # Register other view factories with string keys
+        self.frames.register("Settings", lambda: SettingsView(self.container, self))
+        self.frames.register("Taskbar", lambda: TaskbarView(self.container, self))
 
-        # Register other views with string keys
-        self.frames["Settings"] = SettingsView(self.container, self)
-        self.frames["Taskbar"] = TaskbarView(self.container, self)
+        if self.eager_views:
+            self.frames.build_all()
+        else:
+            # KeyShortcutsView applies the saved hotkey remaps when it is built, so it must exist
+            # even if the user never opens it
+            self.frames.prewarm(["KeyShortcuts"])
+
+    def prewarm_for(self, frame_key):
+        """Build the given frame and the views likely to be opened from it in idle time."""
+        if frame_key in self.frames:
+            self.frames.prewarm([frame_key])
+            self.frames.hint(frame_key)
+
+    def attach_screen_info(self):
+        """Let the screen metrics follow the DPI of this window's monitor."""
+        if sys.platform == "win32":
+            self.screen_info.attach_window(ctypes.windll.user32.GetParent(self.winfo_id()))
+
+    def on_configure(self, event):
+        # The root's bindings also see the events of every child widget
+        if event.widget is self and not self._display_check_pending:
+            self._display_check_pending = True
+            self.after_idle(self.check_display_change)
+
+    def check_display_change(self):
+        """Compare the cheap display signature and refresh the metrics if it changed."""
+        self._display_check_pending = False
+        self.screen_info.refresh_if_changed()
+
+    def on_display_change(self, screen_info):
+        """Move the window to the new bottom-right position after a display or DPI change."""
+        self.geometry(screen_info.geometry)
+
+        # Views built from now on need the images at the new size
+        get_asset_loader().invalidate(SIZED_ASSETS)
 
     def show_main_menu(self):
         """Show the main menu buttons."""
@@ -165,11 +288,14 @@ class MainApp(ctk.CTk):
         current_frame = self.frame_stack[-1]  # Get the top frame in the stack
         self.disable_widgets(current_frame)
 
-        # Show the selected frame and push it onto the frame stack
-        frame = self.frames[frame_key]
+        # Show the selected frame (building it on first use) and push it onto the frame stack
+        frame = self.frames.get(frame_key)
         frame.pack()
         self.frame_stack.append(frame)  # Push the new frame onto the stack
 
+        # Build the views reachable from this frame while the slide animation is idle
+        self.frames.hint(frame_key)
+
     def disable_widgets(self, frame):
         """Disable all buttons in the given frame."""
         for widget in frame.winfo_children():
@@ -206,16 +332,41 @@ class MainApp(ctk.CTk):
         for btn in self.main_button_objects:
             btn.pack_forget()
 
-    def load_settings(self):
-        """Load settings from settings.json."""
-        with open("settings/settings.json", "r") as f:
-            return json.load(f)
+    def on_pending_changes(self, count):
+        """Show the number of staged registry changes on the apply button."""
+        self.apply_all_button.configure(text=f"Apply All Changes ({count})" if count else "Apply All Changes")
+
+    def apply_all_changes(self):
+        """Write every staged change at once; Explorer restarts and the reboot prompt happen at most once."""
+        plan = self.pending_changes.plan()
+        if not plan:
+            messagebox.showinfo("Apply All Changes", "There are no pending changes.")
+            return
+        if not askyesno("Apply All Changes", f"Apply {len(plan)} pending registry change(s)?"):
+            return
+        # Restart Explorer off the Tk thread; its result is reported back on it
+        actions = dict(APPLY_ACTIONS)
+        actions[COST_EXPLORER] = lambda: restart_explorer_in_background(self.on_explorer_restarted)
+        try:
+            self.pending_changes.apply_all(actions=actions)
+        except Exception as e:
+            print(f"Error applying registry changes: {e}")
+            messagebox.showerror("Error", f"Error applying registry changes: {e}")
+
+    def on_explorer_restarted(self, ready):
+        """Called from the restart thread once Explorer is back (or the wait timed out)."""
+        if not ready:
+            self.call_from_thread(lambda: messagebox.showerror(
+                "Explorer Restart", "Explorer did not restart in time. The taskbar changes apply once it is running again."))
 
     def set_theme_from_settings(self):
-        """Set the application theme based on the theme setting in settings.json."""
-        settings = self.load_settings()
-        theme = settings.get("theme", "Dark")  # Default to 'Auto' if 'theme' not found
+        """Set the application theme based on the theme setting and follow later changes."""
+        settings_store = get_settings_store()
+        self.apply_theme("theme", settings_store.settings.theme)
+        settings_store.subscribe(self.apply_theme, key="theme")
 
+    def apply_theme(self, key, theme):
+        """Settings subscriber applying the appearance mode."""
         if theme.lower() == "dark":
             ctk.set_appearance_mode("Dark")
         elif theme.lower() == "light":
@@ -223,13 +374,26 @@ class MainApp(ctk.CTk):
         else:
             ctk.set_appearance_mode("Dark")
 
+    def restore_window(self):
+        """Bring the window back from the tray (or from behind other windows)."""
+        self.deiconify()
+        self.lift()
+        self.attributes("-topmost", True)
+        self.after(1000, lambda: self.attributes("-topmost", False))
+        self.focus_force()
+
+    def on_instance_message(self, message):
+        """Handle a message sent by a second launch. Called from the guard's listener thread."""
+        if message == RESTORE_MESSAGE:
+            self.call_from_thread(self.restore_window)
 
     def quit_app(self):
         """Quit the application."""
-        settings = self.load_settings()
-        if settings['minimize_to_tray'] is False:
+        settings_store = get_settings_store()
+        if not settings_store.settings.minimize_to_tray:
             if askyesno("Quit", "Do you want to quit the application?"):
                 self.quit()
+                settings_store.flush()  # os._exit skips atexit handlers
                 os._exit(0)
             else:
                 return
@@ -239,9 +403,30 @@ class MainApp(ctk.CTk):
 
 
 if __name__ == "__main__":
-    if is_already_running():
+    args = parse_arguments()
+    if args.profile_startup:
+        profiler.enable(args.profile_startup)
+        profiler.record("imports", profiler.origin, IMPORTS_DONE)
+    if args.dry_run:
+        set_dry_run(True)
+
+    with profiler.phase("single-instance check"):
+        instance_guard = create_instance_guard()
+        acquired = instance_guard.acquire()
+    if not acquired:
+        # Ask the running instance to show its window instead of starting a second one
+        instance_guard.send_message(RESTORE_MESSAGE)
         print("An instance of this program is already running.")
         sys.exit(0)
 
-    app = MainApp()
+    with profiler.phase("admin check"):
+        admin = is_admin()
+    if not admin:
+        # The elevated copy must be able to take the lock as soon as it starts
+        instance_guard.release()
+        run_as_admin()
+
+    with profiler.phase("MainApp"):
+        app = MainApp()
+    instance_guard.listen(app.on_instance_message)
     app.mainloop()
@@ -0,0 +1,211 @@
+# apply_planner.py
+from collections import namedtuple
+from registry.managed_keys import ADVANCED_PATH, KEYBOARD_LAYOUT_PATH, STUCKRECTS_PATH, TASKBAND_PATH, TOUCHPAD_PATH
+from registry.registry_backend import REG_BINARY, WriteBatch
+from registry.registry_snapshot import get_registry_snapshot
+from registry.registry_backups import get_backup_store
+from registry.change_journal import get_change_journal
+from registry.shell_refresh import broadcast_setting_change, restart_explorer_in_background
+
+# What it takes for a change to show up, cheapest first
+COST_NONE = 0      # Nothing changed
+COST_LIVE = 1      # Picked up by the running system once it is notified
+COST_EXPLORER = 2  # Explorer has to be restarted
+COST_REBOOT = 3    # Only read at boot
+
+COST_NAMES = {COST_NONE: "none", COST_LIVE: "live", COST_EXPLORER: "explorer restart", COST_REBOOT: "reboot"}
+
+# Values that the taskbar re-reads when it gets WM_SETTINGCHANGE
+VALUE_COSTS = {
+    (ADVANCED_PATH.lower(), "TaskbarSmallIcons"): COST_LIVE,
+    (ADVANCED_PATH.lower(), "TaskbarAl"): COST_LIVE,
+    (ADVANCED_PATH.lower(), "ShowClock"): COST_LIVE,
+}
+
+# Apply cost per registry key for everything else; keys not listed here need a reboot to be safe
+KEY_COSTS = {
+    TOUCHPAD_PATH.lower(): COST_REBOOT,
+    KEYBOARD_LAYOUT_PATH.lower(): COST_REBOOT,
+    STUCKRECTS_PATH.lower(): COST_EXPLORER,
+    ADVANCED_PATH.lower(): COST_EXPLORER,
+    TASKBAND_PATH.lower(): COST_EXPLORER,
+}
+
+Change = namedtuple("Change", ["root", "path", "name", "old", "new", "value_type", "cost", "old_type"])
+
+_dry_run = False
+
+
+def set_dry_run(enabled):
+    """Print plans instead of applying them (--dry-run)."""
+    global _dry_run
+    _dry_run = enabled
+
+
+def is_dry_run(dry_run=None):
+    return _dry_run if dry_run is None else dry_run
+
+
+def value_cost(path, name):
+    cost = VALUE_COSTS.get((path.lower(), name))
+    return cost if cost is not None else KEY_COSTS.get(path.lower(), COST_REBOOT)
+
+
+class ApplyPlan:
+    """The registry writes that actually change something, and what applying them takes."""
+
+    def __init__(self, changes):
+        self.changes = changes
+
+    @property
+    def cost(self):
+        """The most expensive change of the plan."""
+        return max((change.cost for change in self.changes), default=COST_NONE)
+
+    @property
+    def session_cost(self):
+        """The most expensive change that can take effect without a reboot."""
+        return max((change.cost for change in self.changes if change.cost < COST_REBOOT), default=COST_NONE)
+
+    def batch(self):
+        batch = WriteBatch()
+        for change in self.changes:
+            if change.new is None:
+                batch.delete(change.root, change.path, change.name)
+            else:
+                batch.set(change.root, change.path, change.name, change.new, change.value_type)
+        return batch
+
+    def describe(self):
+        if not self.changes:
+            return "No registry changes."
+        lines = [f"{len(self.changes)} registry change(s), apply cost: {COST_NAMES[self.cost]}"]
+        for change in self.changes:
+            new = "<deleted>" if change.new is None else _format_value(change.new)
+            old = "<missing>" if change.old is None else _format_value(change.old)
+            lines.append(f"  {change.root}\\{change.path}\\{change.name}: {old} -> {new} ({COST_NAMES[change.cost]})")
+        return "\n".join(lines)
+
+    def __len__(self):
+        return len(self.changes)
+
+    def __bool__(self):
+        return bool(self.changes)
+
+
+def _format_value(value):
+    return value.hex(" ") if isinstance(value, (bytes, bytearray)) else repr(value)
+
+
+def plan_batch(batch, registry=None):
+    """Compare a WriteBatch with the current registry and keep only the writes that differ."""
+    registry = registry or get_registry_snapshot()
+    changes = []
+    for (root, path), operations in batch.items():
+        try:
+            current = registry.read_values(root, path, list(operations))
+        except FileNotFoundError:
+            current = {}
+
+        for name, operation in operations.items():
+            old, old_type = current.get(name, (None, None))
+            if operation is None:
+                if old is not None:
+                    changes.append(Change(root, path, name, old, None, None, value_cost(path, name), old_type))
+                continue
+
+            new, value_type = operation
+            if value_type == REG_BINARY:
+                new = bytes(new)
+            if old != new or old_type != value_type:
+                changes.append(Change(root, path, name, old, new, value_type, value_cost(path, name), old_type))
+    return ApplyPlan(changes)
+
+
+def restart_explorer():
+    # Restarting takes seconds, do not hold up the UI thread while Explorer comes back
+    restart_explorer_in_background()
+
+
+def prompt_reboot():
+    from reboot_prompt import prompt_reboot  # Tk dialog, only imported when needed
+    prompt_reboot()
+
+
+# The action run after writing, keyed by plan cost
+APPLY_ACTIONS = {
+    COST_NONE: None,
+    COST_LIVE: broadcast_setting_change,
+    COST_EXPLORER: restart_explorer,
+    COST_REBOOT: prompt_reboot,
+}
+
+
+def apply_plan(plan, registry=None, dry_run=None, actions=None, backups=None, journal=None):
+    """Write the changes of a plan and run the actions its costs require.
+
+    At most two actions run: the cheapest one covering every change that does not
+    need a reboot (a broadcast or an Explorer restart), then the reboot prompt if
+    any change needs it. Returns the cost of the plan. With dry_run the plan is
+    printed and nothing is written.
+
+    The current values are backed up first and the written changes are journaled;
+    by default only when writing to the process-wide registry. Pass journal=False
+    to skip the journal (undo and redo record themselves).
+    """
+    if is_dry_run(dry_run):
+        print(plan.describe())
+        return COST_NONE
+    if not plan:
+        return COST_NONE
+
+    if registry is None:
+        backups = get_backup_store() if backups is None else backups
+        journal = get_change_journal() if journal is None else journal
+
+    registry = registry or get_registry_snapshot()
+    if backups is not None:
+        try:
+            backups.before_apply(plan, registry)
+        except OSError as e:
+            print(f"Could not back up the registry values: {e}")
+    registry.apply_batch(plan.batch())
+    if journal:
+        try:
+            journal.record(plan)
+        except (OSError, TypeError, ValueError) as e:
+            # The values are written already; a journal failure only costs the undo entry
+            print(f"Could not journal the registry changes: {e}")
+
+    actions = actions if actions is not None else APPLY_ACTIONS
+    for cost in (plan.session_cost, COST_REBOOT if plan.cost == COST_REBOOT else COST_NONE):
+        action = actions.get(cost)
+        if action is not None:
+            action()
+    return plan.cost
+
+
+def undo_last_change(journal=None, registry=None, dry_run=None, actions=None):
+    """Put back the values the newest journaled apply overwrote. Returns the plan, or None if there is nothing to undo."""
+    journal = journal or get_change_journal()
+    batch = journal.undo_batch()
+    if batch is None:
+        return None
+    plan = plan_batch(batch, registry)
+    apply_plan(plan, registry, dry_run, actions, journal=False)
+    if not is_dry_run(dry_run):
+        journal.mark_undone()
+    return plan
+
+
+def redo_last_change(journal=None, registry=None, dry_run=None, actions=None):
+    """Write the last undone change again. Returns the plan, or None if there is nothing to redo."""
+    journal = journal or get_change_journal()
+    batch = journal.redo_batch()
+    if batch is None:
+        return None
+    plan = plan_batch(batch, registry)
+    apply_plan(plan, registry, dry_run, actions, journal=False)
+    if not is_dry_run(dry_run):
+        journal.mark_redone()
+    return plan
@@ -0,0 +1,202 @@
+# change_journal.py
+import json
+import os
+import tempfile
+import threading
+import time
+from registry.registry_backend import REG_BINARY, WriteBatch
+from registry.registry_backups import default_data_dir
+
+
+def _encode(value, value_type):
+    """JSON form of a value: REG_BINARY as a hex string, bytes of any other type as {"hex": ...}."""
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex() if value_type == REG_BINARY else {"hex": value.hex()}
+    return value
+
+
+def _decode(value, value_type):
+    if isinstance(value, dict):
+        return bytes.fromhex(value["hex"])
+    return bytes.fromhex(value) if value_type == REG_BINARY and value is not None else value
+
+
+class ChangeJournal:
+    """Append-only record of every registry write the program makes.
+
+    Each applied plan becomes one entry holding the before and after value of every
+    change. Undo and redo move entries between two stacks (O(1)) and write the
+    before or after values back; they are journaled as small "undo"/"redo" records
+    so that replaying the file rebuilds the same stacks. Once `compact_every`
+    records have been appended since the last checkpoint, the file is rewritten as a
+    single checkpoint holding the journaled state and the last `max_undo` entries.
+
+    File format, one JSON object per line:
+        {"checkpoint": {"next_seq": n, "state": [...], "undo": [entry...], "redo": [entry...]}}
+        {"apply": entry}   with entry = {"seq": n, "time": "...", "changes": [[root, path, name, old_type, old, new_type, new], ...]}
+        {"undo": seq}
+        {"redo": seq}
+    """
+
+    def __init__(self, path=None, compact_every=500, max_undo=100):
+        self.path = path or os.path.join(default_data_dir(), "journal.jsonl")
+        self.compact_every = compact_every
+        self.max_undo = max_undo
+        self._lock = threading.RLock()
+        self._loaded = False
+
+    def _reset(self):
+        self.next_seq = 1
+        self.state = {}  # (root, path, name) -> (type, encoded value); type None for deleted values
+        self._undo = []  # Entries, newest last
+        self._redo = []
+        self.records_since_checkpoint = 0
+
+    def _load(self):
+        """Replay the file once: the last checkpoint, then every record after it."""
+        if self._loaded:
+            return
+        self._reset()
+        try:
+            with open(self.path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        self._replay_record(json.loads(line))
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            # A torn last line (e.g. power loss while appending) ends the replay
+            print(f"Journal '{self.path}' ends with an unreadable record: {e}")
+        self._loaded = True
+
+    def _replay_record(self, record):
+        if "checkpoint" in record:
+            checkpoint = record["checkpoint"]
+            self._reset()
+            self.next_seq = checkpoint["next_seq"]
+            self.state = {(root, path, name): (value_type, value) for root, path, name, value_type, value in checkpoint["state"]}
+            self._undo = checkpoint["undo"]
+            self._redo = checkpoint["redo"]
+            return
+
+        self.records_since_checkpoint += 1
+        if "apply" in record:
+            entry = record["apply"]
+            self._undo.append(entry)
+            self._redo.clear()
+            self.next_seq = entry["seq"] + 1
+            self._set_state(entry, after=True)
+        elif "undo" in record and self._undo and self._undo[-1]["seq"] == record["undo"]:
+            entry = self._undo.pop()
+            self._redo.append(entry)
+            self._set_state(entry, after=False)
+        elif "redo" in record and self._redo and self._redo[-1]["seq"] == record["redo"]:
+            entry = self._redo.pop()
+            self._undo.append(entry)
+            self._set_state(entry, after=True)
+
+    def _set_state(self, entry, after):
+        for root, path, name, old_type, old, new_type, new in entry["changes"]:
+            self.state[(root, path, name)] = (new_type, new) if after else (old_type, old)
+
+    def _append(self, record):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._replay_record(record)
+        if self.records_since_checkpoint >= self.compact_every:
+            self.compact()
+
+    def record(self, plan):
+        """Journal an applied plan (a registry.apply_planner.ApplyPlan)."""
+        if not plan:
+            return
+        with self._lock:
+            self._load()
+            changes = [[c.root, c.path, c.name, c.old_type, _encode(c.old, c.old_type), c.value_type, _encode(c.new, c.value_type)]
+                       for c in plan.changes]
+            self._append({"apply": {"seq": self.next_seq, "time": time.strftime("%Y-%m-%d %H:%M:%S"), "changes": changes}})
+
+    def can_undo(self):
+        with self._lock:
+            self._load()
+            return bool(self._undo)
+
+    def can_redo(self):
+        with self._lock:
+            self._load()
+            return bool(self._redo)
+
+    def undo_batch(self):
+        """WriteBatch putting back the before values of the newest entry, or None."""
+        with self._lock:
+            self._load()
+            return self._entry_batch(self._undo[-1], after=False) if self._undo else None
+
+    def redo_batch(self):
+        """WriteBatch writing the after values of the last undone entry again, or None."""
+        with self._lock:
+            self._load()
+            return self._entry_batch(self._redo[-1], after=True) if self._redo else None
+
+    def _entry_batch(self, entry, after):
+        batch = WriteBatch()
+        for root, path, name, old_type, old, new_type, new in entry["changes"]:
+            value_type, value = (new_type, new) if after else (old_type, old)
+            if value_type is None:
+                batch.delete(root, path, name)
+            else:
+                batch.set(root, path, name, _decode(value, value_type), value_type)
+        return batch
+
+    def mark_undone(self):
+        with self._lock:
+            self._append({"undo": self._undo[-1]["seq"]})
+
+    def mark_redone(self):
+        with self._lock:
+            self._append({"redo": self._redo[-1]["seq"]})
+
+    def state_batch(self):
+        """WriteBatch bringing the registry to the journaled state, e.g. to replay it on another machine."""
+        with self._lock:
+            self._load()
+            batch = WriteBatch()
+            for (root, path, name), (value_type, value) in self.state.items():
+                if value_type is None:
+                    batch.delete(root, path, name)
+                else:
+                    batch.set(root, path, name, _decode(value, value_type), value_type)
+            return batch
+
+    def compact(self):
+        """Rewrite the file as one checkpoint (atomically)."""
+        with self._lock:
+            self._load()
+            checkpoint = {
+                "next_seq": self.next_seq,
+                "state": [[root, path, name, value_type, value] for (root, path, name), (value_type, value) in self.state.items()],
+                "undo": self._undo[-self.max_undo:],
+                "redo": self._redo[-self.max_undo:],
+            }
+            directory = os.path.dirname(self.path) or "."
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=".journal-", suffix=".tmp", dir=directory)
+            with os.fdopen(fd, "w") as f:
+                f.write(json.dumps({"checkpoint": checkpoint}, separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self._replay_record({"checkpoint": checkpoint})
+
+
+_change_journal = None
+
+def get_change_journal():
+    """Return the process-wide change journal."""
+    global _change_journal
+    if _change_journal is None:
+        _change_journal = ChangeJournal()
+    return _change_journal
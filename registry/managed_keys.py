@@ -0,0 +1,31 @@
+# managed_keys.py
+from registry.registry_backend import HKCU, HKLM, REG_BINARY, REG_DWORD
+
+TOUCHPAD_PATH = r"SOFTWARE\Microsoft\Windows\CurrentVersion\PrecisionTouchPad"
+KEYBOARD_LAYOUT_PATH = r"SYSTEM\CurrentControlSet\Control\Keyboard Layout"
+STUCKRECTS_PATH = r"Software\Microsoft\Windows\CurrentVersion\Explorer\StuckRects3"
+ADVANCED_PATH = r"Software\Microsoft\Windows\CurrentVersion\Explorer\Advanced"
+TASKBAND_PATH = r"Software\Microsoft\Windows\CurrentVersion\Explorer\Taskband"
+
+# Every registry value this program changes, as (root, path, value names)
+MANAGED_VALUES = [
+    (HKLM, TOUCHPAD_PATH,
+     ['CurtainTop', 'CurtainLeft', 'CurtainRight', 'SuperCurtainTop', 'SuperCurtainLeft', 'SuperCurtainRight', 'RightClickZoneWidth', 'RightClickZoneHeight']),
+
+    (HKLM, KEYBOARD_LAYOUT_PATH,
+     ['Scancode Map']),  # Single value for keyboard layout
+
+    (HKCU, STUCKRECTS_PATH,
+     ['Settings']),  # Binary value for taskbar position and auto-hide
+
+    (HKCU, ADVANCED_PATH,
+     ['TaskbarSmallIcons', 'TaskbarAl', 'ShowClock', 'TaskbarGlomLevel']),  # Taskbar advanced options
+
+    (HKCU, TASKBAND_PATH,
+     ['MinThumbSizePx']),  # Taskbar thumbnail preview size
+]
+
+# Type of every managed value: the taskbar blob and the Scancode Map are binary, the rest DWORDs
+BINARY_VALUES = {(HKLM, KEYBOARD_LAYOUT_PATH, 'Scancode Map'), (HKCU, STUCKRECTS_PATH, 'Settings')}
+VALUE_TYPES = {(root, path, name): REG_BINARY if (root, path, name) in BINARY_VALUES else REG_DWORD
+               for root, path, names in MANAGED_VALUES for name in names}
@@ -0,0 +1,74 @@
+# pending_changes.py
+import threading
+from registry.apply_planner import apply_plan, is_dry_run, plan_batch
+from registry.registry_backend import WriteBatch
+
+
+class PendingChanges:
+    """Registry changes staged by the views, applied together by "Apply all".
+
+    Staging the same value twice keeps the latest one, and values staged back to
+    what the registry already holds do not count as pending. Applying writes one
+    batch and runs each required action (Explorer restart, reboot prompt) once.
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry
+        self._batch = WriteBatch()
+        self._lock = threading.RLock()
+        self._subscribers = []
+
+    def stage(self, batch):
+        """Add the writes and deletes of a WriteBatch to the queue."""
+        with self._lock:
+            self._batch.extend(batch)
+        self._publish()
+
+    def plan(self):
+        """The staged writes that differ from the registry."""
+        with self._lock:
+            return plan_batch(self._batch, self.registry)
+
+    @property
+    def count(self):
+        return len(self.plan())
+
+    def apply_all(self, dry_run=None, actions=None):
+        """Write every pending change in one batch. Returns the plan that was applied."""
+        with self._lock:
+            plan = plan_batch(self._batch, self.registry)
+            apply_plan(plan, self.registry, dry_run=dry_run, actions=actions)
+            if not is_dry_run(dry_run):
+                self._batch = WriteBatch()
+        self._publish()
+        return plan
+
+    def discard(self):
+        with self._lock:
+            self._batch = WriteBatch()
+        self._publish()
+
+    def subscribe(self, callback):
+        """Call `callback(count)` whenever the number of pending changes may have changed."""
+        self._subscribers.append(callback)
+
+    def _publish(self):
+        count = self.count
+        for callback in list(self._subscribers):
+            try:
+                callback(count)
+            except Exception as e:
+                print(f"Error in pending changes subscriber: {e}")
+
+
+_pending_changes = None
+_pending_changes_lock = threading.Lock()
+
+def get_pending_changes():
+    """Return the process-wide queue of staged registry changes."""
+    global _pending_changes
+    if _pending_changes is None:
+        with _pending_changes_lock:
+            if _pending_changes is None:
+                _pending_changes = PendingChanges()
+    return _pending_changes
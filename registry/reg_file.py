@@ -0,0 +1,217 @@
+# reg_file.py
+import codecs
+from keyboards.scancode_map import decode_scancode_map
+from registry.managed_keys import KEYBOARD_LAYOUT_PATH, MANAGED_VALUES, VALUE_TYPES
+from registry.registry_backend import HKCU, HKLM, REG_BINARY, REG_DWORD, REG_SZ, WriteBatch
+from registry.registry_snapshot import get_registry_snapshot
+
+REG_HEADER = "Windows Registry Editor Version 5.00"
+REGEDIT4_HEADER = "REGEDIT4"
+
+ROOT_NAMES = {HKLM: HKLM, HKCU: HKCU, "HKLM": HKLM, "HKCU": HKCU}
+
+TYPE_NAMES = {REG_SZ: "a string", REG_DWORD: "a DWORD", REG_BINARY: "binary data"}
+
+HEX_LINE_WIDTH = 80  # regedit wraps hex data at 80 columns
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def _format_hex(prefix, data):
+    """regedit-style hex data: comma separated bytes, wrapped with a trailing backslash."""
+    lines = []
+    line = prefix
+    for i, byte in enumerate(data):
+        token = f"{byte:02x}" + ("," if i < len(data) - 1 else "")
+        if len(line) + len(token) > HEX_LINE_WIDTH - 2 and line.strip():
+            lines.append(line + "\\")
+            line = "  "
+        line += token
+    lines.append(line)
+    return "\n".join(lines)
+
+
+def format_value(name, value, value_type):
+    """One .reg value line; value None writes a delete ("name"=-)."""
+    prefix = f'"{_escape(name)}"='
+    if value is None:
+        return prefix + "-"
+    if value_type == REG_DWORD:
+        return prefix + f"dword:{value & 0xFFFFFFFF:08x}"
+    if value_type == REG_SZ:
+        return prefix + f'"{_escape(value)}"'
+    if value_type == REG_BINARY:
+        return _format_hex(prefix + "hex:", bytes(value))
+    return _format_hex(prefix + f"hex({value_type:x}):", bytes(value))
+
+
+def export_reg(path, registry=None, managed=MANAGED_VALUES, encoding="utf-16"):
+    """Write every managed value to a .reg file, key by key. Returns the number of values written.
+
+    Values that do not exist are written as deletes, so importing the file reproduces
+    the exported state exactly. regedit writes UTF-16; pass encoding="utf-8" for files
+    that diff tools show as text (regedit reads both).
+    """
+    registry = registry or get_registry_snapshot()
+    count = 0
+    with open(path, "w", encoding=encoding, newline="\r\n") as f:
+        f.write(REG_HEADER + "\n")
+        for root, key_path, names in managed:
+            try:
+                found = registry.read_values(root, key_path, names)
+            except FileNotFoundError:
+                found = {}
+            f.write(f"\n[{root}\\{key_path}]\n")
+            for name in names:
+                value, value_type = found.get(name, (None, None))
+                f.write(format_value(name, value, value_type) + "\n")
+                count += 1
+    return count
+
+
+def _open_reg(path):
+    """Open a .reg file as text, detecting regedit's UTF-16 and UTF-8 byte order marks."""
+    with open(path, "rb") as f:
+        start = f.read(3)
+    if start.startswith(codecs.BOM_UTF16_LE) or start.startswith(codecs.BOM_UTF16_BE):
+        encoding = "utf-16"
+    elif start.startswith(codecs.BOM_UTF8):
+        encoding = "utf-8-sig"
+    else:
+        encoding = "utf-8"
+    return open(path, "r", encoding=encoding, errors="replace")
+
+
+def _parse_name(line):
+    """Split '"name"=data' into (name, data). The default value (@) has the name ""."""
+    if line.startswith("@="):
+        return "", line[2:]
+    if not line.startswith('"'):
+        raise ValueError(f"Invalid value line: {line[:40]}")
+    chars = []
+    i = 1
+    while i < len(line):
+        char = line[i]
+        if char == "\\" and i + 1 < len(line):
+            chars.append(line[i + 1])
+            i += 2
+            continue
+        if char == '"':
+            break
+        chars.append(char)
+        i += 1
+    if line[i + 1:i + 2] != "=":
+        raise ValueError(f"Invalid value line: {line[:40]}")
+    return "".join(chars), line[i + 2:]
+
+
+def parse_data(data):
+    """(value, value_type) of the data part of a value line; (None, None) for a delete."""
+    if data == "-":
+        return None, None
+    if data.startswith("dword:"):
+        return int(data[6:], 16), REG_DWORD
+    if data.startswith('"') and data.endswith('"'):
+        return data[1:-1].replace('\\"', '"').replace("\\\\", "\\"), REG_SZ
+
+    if data.startswith("hex:"):
+        value_type, hex_data = REG_BINARY, data[4:]
+    elif data.startswith("hex("):
+        type_text, _, hex_data = data[4:].partition("):")
+        value_type = int(type_text, 16)
+    else:
+        raise ValueError(f"Unsupported value data: {data[:40]}")
+    value = bytes(int(byte, 16) for byte in hex_data.replace(" ", "").split(",") if byte)
+    if value_type == REG_DWORD:
+        return int.from_bytes(value, "little"), REG_DWORD  # hex(4): written by some tools instead of dword:
+    return value, value_type
+
+
+def iter_reg_values(path, wanted=None):
+    """Stream (root, key path, name, value, value_type) from a .reg file; value None is a delete.
+
+    The file is read line by line and only the data of the current value is kept.
+    `wanted(root, key path, name)` filters values before their data is collected, so
+    large values of other keys cost no memory. Deleted keys ([-...]) and roots other
+    than HKLM and HKCU are skipped.
+    """
+    with _open_reg(path) as f:
+        header = next((line.strip() for line in f if line.strip()), "")
+        if header not in (REG_HEADER, REGEDIT4_HEADER):
+            raise ValueError(f"'{path}' is not a .reg file")
+
+        root = key_path = None
+        pending = None  # (name, data parts) of a wanted value continued on the next lines
+        skipping = False  # Inside the continued data of a value that is not wanted
+        for line in f:
+            line = line.strip()
+            continued = line.endswith("\\")
+            if pending is not None:
+                pending[1].append(line[:-1] if continued else line)
+                if not continued:
+                    name, parts = pending
+                    pending = None
+                    yield (root, key_path, name) + parse_data("".join(parts))
+                continue
+            if skipping:
+                skipping = continued
+                continue
+
+            if not line or line.startswith(";"):
+                continue
+            if line.startswith("["):
+                root_name, _, key_path = line.strip("[]").partition("\\")
+                root = None if root_name.startswith("-") else ROOT_NAMES.get(root_name.upper())
+                continue
+            if root is None:
+                skipping = continued
+                continue
+
+            name, data = _parse_name(line)
+            if wanted is not None and not wanted(root, key_path, name):
+                skipping = continued
+            elif continued:
+                pending = (name, [data[:-1]])
+            else:
+                yield (root, key_path, name) + parse_data(data)
+
+
+def managed_filter(managed=MANAGED_VALUES):
+    """wanted() callback for iter_reg_values that keeps only the values this program owns."""
+    owned = {(root, key_path.lower(), name) for root, key_path, names in managed for name in names}
+    return lambda root, key_path, name: (root, key_path.lower(), name) in owned
+
+
+def check_value(root, key_path, name, value, value_type):
+    """Raise ValueError unless a managed value has the type (and shape) the program writes."""
+    expected = VALUE_TYPES.get((root, key_path, name))
+    if expected is not None and value_type != expected:
+        raise ValueError(f"'{name}' must be {TYPE_NAMES.get(expected, expected)}, "
+                         f"not {TYPE_NAMES.get(value_type, f'type {value_type}')}")
+    if value_type == REG_DWORD and not 0 <= value <= 0xFFFFFFFF:
+        raise ValueError(f"'{name}' is out of the DWORD range")
+    if (root, key_path, name) == (HKLM, KEYBOARD_LAYOUT_PATH, 'Scancode Map'):
+        decode_scancode_map(value)  # Raises ScancodeMapError, a ValueError
+
+
+def import_batch(path, managed=MANAGED_VALUES):
+    """WriteBatch with the managed values of a .reg file; everything else in the file is ignored.
+
+    Key paths are matched case-insensitively but written with the program's own spelling.
+    The whole file is refused (ValueError) if a value does not have the expected type.
+    """
+    spelling = {(root, key_path.lower()): key_path for root, key_path, _ in managed}
+    batch = WriteBatch()
+    for root, key_path, name, value, value_type in iter_reg_values(path, managed_filter(managed)):
+        key_path = spelling[(root, key_path.lower())]
+        if value is None:
+            batch.delete(root, key_path, name)
+        else:
+            try:
+                check_value(root, key_path, name, value, value_type)
+            except ValueError as e:
+                raise ValueError(f"Refusing '{path}': {e}") from None
+            batch.set(root, key_path, name, value, value_type)
+    return batch
@@ -0,0 +1,260 @@
+# registry_backend.py
+import json
+import sys
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+# Root keys are referred to by name so the same code runs without winreg
+HKLM = "HKEY_LOCAL_MACHINE"
+HKCU = "HKEY_CURRENT_USER"
+
+# Same values as the winreg constants
+REG_SZ = 1
+REG_BINARY = 3
+REG_DWORD = 4
+
+
+class WriteBatch:
+    """Registry writes and deletes grouped by key, so each key is opened once."""
+
+    def __init__(self):
+        self._keys = OrderedDict()  # (root, path) -> {name: (value, type) or None for delete}
+
+    def set(self, root, path, name, value, value_type=REG_DWORD):
+        self._keys.setdefault((root, path), OrderedDict())[name] = (value, value_type)
+        return self
+
+    def delete(self, root, path, name):
+        self._keys.setdefault((root, path), OrderedDict())[name] = None
+        return self
+
+    def extend(self, other):
+        for (root, path), operations in other.items():
+            self._keys.setdefault((root, path), OrderedDict()).update(operations)
+        return self
+
+    def items(self):
+        """Yield ((root, path), {name: (value, type) or None}) per key."""
+        return self._keys.items()
+
+    def __len__(self):
+        return sum(len(operations) for operations in self._keys.values())
+
+    def __bool__(self):
+        return len(self) > 0
+
+
+class RegistryBackend(ABC):
+    """Interface shared by the real registry and its in-memory stand-in.
+
+    Missing keys and values raise FileNotFoundError, like winreg does.
+    """
+
+    @abstractmethod
+    def read_value(self, root, path, name):
+        """Return (value, type)."""
+
+    @abstractmethod
+    def read_values(self, root, path, names):
+        """Return {name: (value, type)} for the values that exist; raises if the key is missing."""
+
+    @abstractmethod
+    def apply_batch(self, batch):
+        """Execute every write and delete of a WriteBatch, one key at a time."""
+
+    def write_values(self, root, path, values, value_type=REG_DWORD):
+        """Write {name: value} (or {name: (value, type)}) to one key in a single batch."""
+        batch = WriteBatch()
+        for name, value in values.items():
+            if isinstance(value, tuple):
+                batch.set(root, path, name, *value)
+            else:
+                batch.set(root, path, name, value, value_type)
+        self.apply_batch(batch)
+
+    def delete_values(self, root, path, names):
+        """Delete values of one key in a single batch; values that do not exist are skipped."""
+        batch = WriteBatch()
+        for name in names:
+            batch.delete(root, path, name)
+        self.apply_batch(batch)
+
+    def close(self):
+        pass
+
+
+class WinRegBackend(RegistryBackend):
+    """winreg backend that keeps key handles open and reuses them."""
+
+    def __init__(self):
+        import winreg
+
+        self.winreg = winreg
+        self.roots = {HKLM: winreg.HKEY_LOCAL_MACHINE, HKCU: winreg.HKEY_CURRENT_USER}
+        self._handles = {}
+        self._lock = threading.RLock()
+
+    def _open(self, root, path, write=False, create=True):
+        """Return a cached handle; write handles also serve reads."""
+        cache_key = (root, path.lower())
+        with self._lock:
+            handle, writable = self._handles.get(cache_key, (None, False))
+            if handle is not None and (writable or not write):
+                return handle
+
+            if write and create:
+                new_handle = self.winreg.CreateKeyEx(self.roots[root], path, 0, self.winreg.KEY_READ | self.winreg.KEY_WRITE)
+            elif write:
+                new_handle = self.winreg.OpenKey(self.roots[root], path, 0, self.winreg.KEY_READ | self.winreg.KEY_WRITE)
+            else:
+                new_handle = self.winreg.OpenKey(self.roots[root], path, 0, self.winreg.KEY_READ)
+
+            if handle is not None:
+                self.winreg.CloseKey(handle)
+            self._handles[cache_key] = (new_handle, write)
+            return new_handle
+
+    def read_value(self, root, path, name):
+        with self._lock:
+            return self.winreg.QueryValueEx(self._open(root, path), name)
+
+    def read_values(self, root, path, names):
+        values = {}
+        with self._lock:
+            handle = self._open(root, path)
+            for name in names:
+                try:
+                    values[name] = self.winreg.QueryValueEx(handle, name)
+                except FileNotFoundError:
+                    pass
+        return values
+
+    def apply_batch(self, batch):
+        with self._lock:
+            for (root, path), operations in batch.items():
+                # Deleting values must not create a key that does not exist
+                only_deletes = all(operation is None for operation in operations.values())
+                try:
+                    handle = self._open(root, path, write=True, create=not only_deletes)
+                except FileNotFoundError:
+                    continue
+                for name, operation in operations.items():
+                    if operation is None:
+                        try:
+                            self.winreg.DeleteValue(handle, name)
+                        except FileNotFoundError:
+                            pass
+                    else:
+                        value, value_type = operation
+                        self.winreg.SetValueEx(handle, name, 0, value_type, value)
+
+    def invalidate(self, root, path):
+        """Drop a cached handle, e.g. after the key was deleted by someone else."""
+        with self._lock:
+            handle, _ = self._handles.pop((root, path.lower()), (None, False))
+            if handle is not None:
+                self.winreg.CloseKey(handle)
+
+    def close(self):
+        with self._lock:
+            for handle, _ in self._handles.values():
+                self.winreg.CloseKey(handle)
+            self._handles.clear()
+
+
+class MemoryRegistryBackend(RegistryBackend):
+    """Registry stand-in kept in a dict, optionally persisted to a JSON file.
+
+    Key paths are case-insensitive like in the real registry.
+    """
+
+    def __init__(self, path=None, initial=None):
+        self.path = path
+        self._keys = {}
+        self._lock = threading.RLock()
+        self.batch_count = 0
+        self.write_count = 0
+
+        if path is not None:
+            self._load_file()
+        for (root, key_path), values in (initial or {}).items():
+            for name, value in values.items():
+                self._keys.setdefault((root, key_path.lower()), {})[name] = value
+
+    def _load_file(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        for entry in data:
+            value = bytes.fromhex(entry["value"]) if entry["type"] == REG_BINARY else entry["value"]
+            self._keys.setdefault((entry["root"], entry["path"].lower()), {})[entry["name"]] = (value, entry["type"])
+
+    def _save_file(self):
+        data = []
+        for (root, key_path), values in self._keys.items():
+            for name, (value, value_type) in values.items():
+                data.append({
+                    "root": root, "path": key_path, "name": name, "type": value_type,
+                    "value": value.hex() if value_type == REG_BINARY else value,
+                })
+        with open(self.path, "w") as f:
+            json.dump(data, f, indent=4)
+
+    def _key(self, root, path):
+        key = self._keys.get((root, path.lower()))
+        if key is None:
+            raise FileNotFoundError(f"Registry key '{root}\\{path}' not found")
+        return key
+
+    def read_value(self, root, path, name):
+        with self._lock:
+            key = self._key(root, path)
+            if name not in key:
+                raise FileNotFoundError(f"Registry value '{name}' not found in '{path}'")
+            return key[name]
+
+    def read_values(self, root, path, names):
+        with self._lock:
+            key = self._key(root, path)
+            return {name: key[name] for name in names if name in key}
+
+    def apply_batch(self, batch):
+        with self._lock:
+            for (root, path), operations in batch.items():
+                if all(operation is None for operation in operations.values()):
+                    key = self._keys.get((root, path.lower()), {})  # Deleting values must not create the key
+                else:
+                    key = self._keys.setdefault((root, path.lower()), {})
+                for name, operation in operations.items():
+                    if operation is None:
+                        key.pop(name, None)
+                    else:
+                        value, value_type = operation
+                        key[name] = (bytes(value) if value_type == REG_BINARY else value, value_type)
+                    self.write_count += 1
+            self.batch_count += 1
+            if self.path is not None:
+                self._save_file()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_registry():
+    """Return the process-wide registry backend (in-memory when not on Windows)."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = WinRegBackend() if sys.platform == "win32" else MemoryRegistryBackend()
+    return _registry
+
+def set_registry(backend):
+    """Replace the process-wide backend (tests, benchmarks, headless runs)."""
+    global _registry
+    with _registry_lock:
+        _registry = backend
+    return backend
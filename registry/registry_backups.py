@@ -0,0 +1,141 @@
+# registry_backups.py
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from registry.managed_keys import MANAGED_VALUES
+from registry.registry_backend import REG_BINARY, WriteBatch
+from registry.registry_snapshot import get_registry_snapshot
+
+BASELINE = "baseline"
+
+
+def default_data_dir():
+    """Per-user data directory (%LOCALAPPDATA%\\MyWindows on Windows)."""
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+        return os.path.join(base, "MyWindows")
+    return os.path.join(os.path.expanduser("~"), ".local", "share", "mywindows")
+
+
+def default_backup_dir():
+    return os.path.join(default_data_dir(), "backups")
+
+
+def capture(registry=None, managed=MANAGED_VALUES, label=""):
+    """Record every managed value; values that do not exist are recorded as None."""
+    registry = registry or get_registry_snapshot()
+    values = []
+    for root, path, names in managed:
+        try:
+            found = registry.read_values(root, path, names)
+        except FileNotFoundError:
+            found = {}
+        for name in names:
+            if name in found:
+                value, value_type = found[name]
+                values.append([root, path, name, value_type, value.hex() if value_type == REG_BINARY else value])
+            else:
+                values.append([root, path, name, None, None])
+    return {"label": label, "created": time.strftime("%Y-%m-%d %H:%M:%S"), "values": values}
+
+
+def restore_batch(backup):
+    """A WriteBatch that puts every value of the backup back (deleting values it did not have).
+
+    Pass it to plan_batch to keep only the values that differ from the registry.
+    """
+    batch = WriteBatch()
+    for root, path, name, value_type, value in backup["values"]:
+        if value_type is None:
+            batch.delete(root, path, name)
+        else:
+            batch.set(root, path, name, bytes.fromhex(value) if value_type == REG_BINARY else value, value_type)
+    return batch
+
+
+class BackupStore:
+    """Compact JSON backups of the managed registry values.
+
+    The baseline is taken before the program's first write and never replaced, so a
+    reset can always go back to the user's own settings. A numbered backup is also
+    taken before every apply; only the newest `keep` of those are kept.
+    """
+
+    def __init__(self, directory=None, keep=20):
+        self.directory = directory or default_backup_dir()
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def _path(self, backup_id):
+        name = BASELINE if backup_id == BASELINE else f"backup-{int(backup_id):04d}"
+        return os.path.join(self.directory, name + ".json")
+
+    def _write(self, backup_id, backup):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".backup-", suffix=".tmp", dir=self.directory)
+        with os.fdopen(fd, "w") as f:
+            json.dump(backup, f, separators=(",", ":"))
+        os.replace(temp_path, self._path(backup_id))
+
+    def load(self, backup_id):
+        with open(self._path(backup_id), "r") as f:
+            return json.load(f)
+
+    def has_baseline(self):
+        return os.path.exists(self._path(BASELINE))
+
+    def numbered_ids(self):
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        ids = (name[len("backup-"):-len(".json")] for name in names if name.startswith("backup-") and name.endswith(".json"))
+        return sorted(int(backup_id) for backup_id in ids if backup_id.isdigit())
+
+    def list_backups(self):
+        """[(backup_id, label, created)], baseline first, then newest first."""
+        backups = []
+        for backup_id in ([BASELINE] if self.has_baseline() else []) + self.numbered_ids()[::-1]:
+            try:
+                backup = self.load(backup_id)
+            except (OSError, ValueError) as e:
+                print(f"Skipping unreadable backup '{backup_id}': {e}")
+                continue
+            backups.append((backup_id, backup["label"], backup["created"]))
+        return backups
+
+    def _latest_values(self, backup_id):
+        """Values of a backup, None if it cannot be read so a fresh backup is written after it."""
+        try:
+            backup = self.load(backup_id)
+            return backup["values"]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring unreadable backup {backup_id}: {e}")
+            return None
+
+    def before_apply(self, plan, registry=None):
+        """Back up the current values before a plan is written."""
+        with self._lock:
+            backup = capture(registry, label=f"Before applying {len(plan)} change(s)")
+            if not self.has_baseline():
+                self._write(BASELINE, dict(backup, label="Original settings"))
+
+            ids = self.numbered_ids()
+            if ids and self._latest_values(ids[-1]) == backup["values"]:
+                return  # Nothing changed since the last backup
+            self._write(ids[-1] + 1 if ids else 1, backup)
+            for old_id in ids[:max(len(ids) + 1 - self.keep, 0)]:
+                os.remove(self._path(old_id))
+
+
+_backup_store = None
+
+def get_backup_store():
+    """Return the process-wide backup store."""
+    global _backup_store
+    if _backup_store is None:
+        _backup_store = BackupStore()
+    return _backup_store
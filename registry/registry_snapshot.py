@@ -0,0 +1,145 @@
+# registry_snapshot.py
+import threading
+from registry.managed_keys import MANAGED_VALUES
+from registry.registry_backend import REG_BINARY, RegistryBackend, get_registry
+
+
+class RegistrySnapshot(RegistryBackend):
+    """In-memory copy of every registry value the program manages.
+
+    All managed keys are read in one pass the first time anything is requested;
+    afterwards reads are served from memory. Writes go through to the backend and
+    update the copy directly, so the registry is only read again after `invalidate`
+    or `refresh` (e.g. when an external change was detected).
+    """
+
+    def __init__(self, backend=None, managed=MANAGED_VALUES):
+        self._backend = backend
+        self.managed = managed
+        self._managed_names = {(root, path.lower()): set(names) for root, path, names in managed}
+        self._lock = threading.RLock()
+        self._keys = None  # (root, path.lower()) -> {name: (value, type)} or None if the key is missing
+        self._stale = set()
+        self.read_count = 0  # Number of backend key reads, for benchmarks
+
+    @property
+    def backend(self):
+        return self._backend if self._backend is not None else get_registry()
+
+    def _read_key(self, root, path, names):
+        self.read_count += 1
+        try:
+            return self.backend.read_values(root, path, names)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading registry key '{path}': {e}")
+            return None
+
+    def refresh(self, keys=None):
+        """Re-read the given (root, path) keys, or all managed keys.
+
+        Returns {(root, path, name): value} for the values that changed, with None for
+        values that no longer exist.
+        """
+        wanted = None if keys is None else {(root, path.lower()) for root, path in keys}
+        changes = {}
+        with self._lock:
+            if self._keys is None:
+                self._keys = {}
+            for root, path, names in self.managed:
+                cache_key = (root, path.lower())
+                if wanted is not None and cache_key not in wanted:
+                    continue
+                old = self._keys.get(cache_key) or {}
+                new = self._read_key(root, path, names)
+                self._keys[cache_key] = new
+                self._stale.discard(cache_key)
+                for name in names:
+                    if old.get(name) != (new or {}).get(name):
+                        changes[(root, path, name)] = (new or {}).get(name, (None, None))[0]
+        return changes
+
+    def invalidate(self, root=None, path=None):
+        """Mark one key (or everything) as out of date; it is re-read on next access."""
+        with self._lock:
+            if root is None:
+                self._keys = None
+                self._stale.clear()
+            else:
+                self._stale.add((root, path.lower()))
+
+    def _entries(self, root, path):
+        cache_key = (root, path.lower())
+        with self._lock:
+            if self._keys is None:
+                self.refresh()
+            elif cache_key in self._stale:
+                self.refresh([(root, path)])
+            entries = self._keys[cache_key]
+        if entries is None:
+            raise FileNotFoundError(f"Registry key '{root}\\{path}' not found")
+        return entries
+
+    def _is_managed(self, root, path, names):
+        managed_names = self._managed_names.get((root, path.lower()))
+        return managed_names is not None and managed_names.issuperset(names)
+
+    def read_value(self, root, path, name):
+        if not self._is_managed(root, path, [name]):
+            return self.backend.read_value(root, path, name)  # Not part of the snapshot
+
+        entries = self._entries(root, path)
+        if name not in entries:
+            raise FileNotFoundError(f"Registry value '{name}' not found in '{path}'")
+        return entries[name]
+
+    def read_values(self, root, path, names):
+        if not self._is_managed(root, path, names):
+            return self.backend.read_values(root, path, names)
+
+        entries = self._entries(root, path)
+        return {name: entries[name] for name in names if name in entries}
+
+    def apply_batch(self, batch):
+        """Write through to the backend and update the in-memory copy."""
+        with self._lock:
+            try:
+                self.backend.apply_batch(batch)
+            except Exception:
+                # Part of the batch may have been written, read those keys again later
+                for (root, path), _ in batch.items():
+                    self._stale.add((root, path.lower()))
+                raise
+
+            if self._keys is None:
+                return
+            for (root, path), operations in batch.items():
+                cache_key = (root, path.lower())
+                if cache_key not in self._keys or cache_key in self._stale:
+                    continue
+                entries = self._keys[cache_key]
+                for name, operation in operations.items():
+                    if name not in self._managed_names[cache_key]:
+                        continue  # Not part of the snapshot
+                    if operation is None:
+                        if entries is not None:
+                            entries.pop(name, None)
+                    else:
+                        if entries is None:
+                            entries = self._keys[cache_key] = {}
+                        value, value_type = operation
+                        entries[name] = (bytes(value) if value_type == REG_BINARY else value, value_type)
+
+
+_registry_snapshot = None
+_registry_snapshot_lock = threading.Lock()
+
+def get_registry_snapshot():
+    """Return the process-wide snapshot of the managed registry values."""
+    global _registry_snapshot
+    if _registry_snapshot is None:
+        with _registry_snapshot_lock:
+            if _registry_snapshot is None:
+                _registry_snapshot = RegistrySnapshot()
+    return _registry_snapshot
@@ -0,0 +1,207 @@
+# registry_watcher.py
+import queue
+import sys
+import threading
+from abc import ABC, abstractmethod
+from registry.registry_backend import HKCU, HKLM
+from registry.registry_snapshot import get_registry_snapshot
+
+
+class RegistryWatcher(ABC):
+    """Detect changes to the managed registry keys made outside of the program.
+
+    A background thread finds out which keys changed and refreshes them in the
+    registry snapshot. Only the values that actually differ are handed to the
+    subscribers, on the Tk thread once `attach` was called.
+    """
+
+    def __init__(self, snapshot=None):
+        self.snapshot = snapshot or get_registry_snapshot()
+        self._subscribers = []
+        self._changes = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+        self._root = None
+        self.poll_ms = 200
+
+    def subscribe(self, callback, keys=None):
+        """Call `callback(changes)` with {(root, path, name): value} for the given (root, path) keys (all if None)."""
+        wanted = None if keys is None else {(root, path.lower()) for root, path in keys}
+        self._subscribers.append((wanted, callback))
+
+    def unsubscribe(self, callback):
+        self._subscribers = [(wanted, cb) for wanted, cb in self._subscribers if cb != callback]
+
+    def attach(self, root, poll_ms=200):
+        """Deliver changes on the Tk thread of `root` instead of the watcher thread."""
+        self._root = root
+        self.poll_ms = poll_ms
+        root.after(poll_ms, self._drain)
+
+    def _drain(self):
+        self.dispatch_pending()
+        if not self._stop.is_set():
+            self._root.after(self.poll_ms, self._drain)
+
+    def dispatch_pending(self):
+        """Hand queued changes to the subscribers (called on the Tk thread)."""
+        while True:
+            try:
+                changes = self._changes.get_nowait()
+            except queue.Empty:
+                return
+            self._publish(changes)
+
+    def _publish(self, changes):
+        for wanted, callback in list(self._subscribers):
+            selected = changes if wanted is None else {
+                (root, path, name): value for (root, path, name), value in changes.items() if (root, path.lower()) in wanted
+            }
+            if selected:
+                try:
+                    callback(selected)
+                except Exception as e:
+                    print(f"Error in registry change subscriber: {e}")
+
+    def _keys_changed(self, keys=None):
+        """Refresh changed keys in the snapshot and queue the values that differ."""
+        changes = self.snapshot.refresh(keys)
+        if changes:
+            if self._root is None:
+                self._publish(changes)  # Not attached to Tk, deliver right away
+            else:
+                self._changes.put(changes)
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="registry-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _wake(self):
+        pass
+
+    @abstractmethod
+    def _run(self):
+        pass
+
+
+class PollingRegistryWatcher(RegistryWatcher):
+    """Re-read the managed keys every `interval_s` seconds. Used off Windows and in tests."""
+
+    def __init__(self, snapshot=None, interval_s=2.0):
+        super().__init__(snapshot)
+        self.interval_s = interval_s
+
+    def poll(self):
+        """Check for changes once."""
+        self._keys_changed()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"Error polling the registry: {e}")
+
+
+class NotifyRegistryWatcher(RegistryWatcher):
+    """Wait on RegNotifyChangeKeyValue events, one per managed key, on a single thread."""
+
+    # Keys that do not exist yet cannot be watched, opening them is retried this often
+    RETRY_MS = 5000
+
+    def __init__(self, snapshot=None):
+        super().__init__(snapshot)
+        import win32api
+        import win32con
+        import win32event
+
+        self.win32api = win32api
+        self.win32con = win32con
+        self.win32event = win32event
+        self.roots = {HKLM: win32con.HKEY_LOCAL_MACHINE, HKCU: win32con.HKEY_CURRENT_USER}
+        self._stop_event = win32event.CreateEvent(None, True, False, None)
+        self._watches = {}  # (root, path) -> (key handle, event)
+
+    def start(self):
+        if self._thread is None:
+            # The stop event is manual-reset, so the last stop() left it signalled
+            self.win32event.ResetEvent(self._stop_event)
+        return super().start()
+
+    def _wake(self):
+        self.win32event.SetEvent(self._stop_event)
+
+    def _arm(self, handle, event):
+        self.win32api.RegNotifyChangeKeyValue(handle, False, self.win32con.REG_NOTIFY_CHANGE_LAST_SET, event, True)
+
+    def _open_watches(self):
+        """Start watching every managed key that exists and is not watched yet."""
+        opened = []
+        for root, path, _ in self.snapshot.managed:
+            if (root, path) in self._watches:
+                continue
+            try:
+                handle = self.win32api.RegOpenKeyEx(self.roots[root], path, 0, self.win32con.KEY_NOTIFY)
+            except self.win32api.error:
+                continue
+            event = self.win32event.CreateEvent(None, False, False, None)
+            self._arm(handle, event)
+            self._watches[(root, path)] = (handle, event)
+            opened.append((root, path))
+        return opened
+
+    def _run(self):
+        self._open_watches()
+        try:
+            while not self._stop.is_set():
+                keys = list(self._watches)
+                events = [self._watches[key][1] for key in keys] + [self._stop_event]
+                result = self.win32event.WaitForMultipleObjects(events, False, self.RETRY_MS)
+                if self._stop.is_set():
+                    return
+
+                if result == self.win32event.WAIT_TIMEOUT:
+                    opened = self._open_watches()
+                    if opened:
+                        self._keys_changed(opened)  # Created since the last look
+                    continue
+
+                index = result - self.win32event.WAIT_OBJECT_0
+                if 0 <= index < len(keys):
+                    handle, event = self._watches[keys[index]]
+                    self._arm(handle, event)  # Notifications fire once, re-arm before reading
+                    self._keys_changed([keys[index]])
+        finally:
+            for handle, _ in self._watches.values():
+                self.win32api.RegCloseKey(handle)
+            self._watches.clear()
+
+
+def create_registry_watcher(snapshot=None):
+    """Notification based watcher on Windows, polling elsewhere."""
+    if sys.platform == "win32":
+        return NotifyRegistryWatcher(snapshot)
+    return PollingRegistryWatcher(snapshot)
+
+
+_registry_watcher = None
+_registry_watcher_lock = threading.Lock()
+
+def get_registry_watcher():
+    """Return the process-wide registry watcher (not started)."""
+    global _registry_watcher
+    if _registry_watcher is None:
+        with _registry_watcher_lock:
+            if _registry_watcher is None:
+                _registry_watcher = create_registry_watcher()
+    return _registry_watcher
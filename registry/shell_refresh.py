@@ -0,0 +1,75 @@
+# shell_refresh.py
+import ctypes
+import subprocess
+import sys
+import threading
+import time
+
+HWND_BROADCAST = 0xFFFF
+WM_SETTINGCHANGE = 0x001A
+SMTO_ABORTIFHUNG = 0x0002
+
+TASKBAR_WINDOW_CLASS = "Shell_TrayWnd"
+
+
+def broadcast_setting_change(area="TraySettings", timeout_ms=1000):
+    """Tell running programs (Explorer's taskbar in particular) to re-read their settings.
+
+    Uses SendMessageTimeout so a hung window cannot block the caller for longer
+    than `timeout_ms`. Returns True if the broadcast was sent.
+    """
+    if sys.platform != "win32":
+        return False
+    result = ctypes.c_size_t()
+    sent = ctypes.windll.user32.SendMessageTimeoutW(
+        HWND_BROADCAST, WM_SETTINGCHANGE, 0, ctypes.c_wchar_p(area), SMTO_ABORTIFHUNG, timeout_ms, ctypes.byref(result))
+    return bool(sent)
+
+
+def taskbar_window():
+    """Handle of the taskbar window, 0 while Explorer is not (yet) running."""
+    return ctypes.windll.user32.FindWindowW(TASKBAR_WINDOW_CLASS, None)
+
+
+def wait_for_taskbar(timeout_s=15.0, interval_s=0.1):
+    """Wait until the taskbar window exists. Returns False on timeout."""
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if taskbar_window():
+            return True
+        time.sleep(interval_s)
+    return False
+
+
+def restart_explorer(timeout_s=15.0):
+    """Restart Explorer and wait (at most `timeout_s`) for its taskbar to come back."""
+    if sys.platform != "win32":
+        return False
+    subprocess.run(["taskkill", "/f", "/im", "explorer.exe"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    # Wait for the old taskbar to disappear so its window is not mistaken for the new one
+    deadline = time.monotonic() + timeout_s
+    while taskbar_window() and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    subprocess.Popen(["explorer.exe"], close_fds=True)
+    ready = wait_for_taskbar(max(deadline - time.monotonic(), 0))
+    if not ready:
+        print(f"Explorer did not come back within {timeout_s:g} s")
+    return ready
+
+
+def restart_explorer_in_background(on_done=None, timeout_s=15.0):
+    """Restart Explorer without blocking the caller; `on_done(ready)` is called from the worker thread."""
+    def run():
+        try:
+            ready = restart_explorer(timeout_s)
+        except OSError as e:
+            print(f"Could not restart Explorer: {e}")
+            ready = False
+        if on_done is not None:
+            on_done(ready)
+
+    thread = threading.Thread(target=run, name="explorer-restart", daemon=True)
+    thread.start()
+    return thread
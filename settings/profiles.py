@@ -0,0 +1,273 @@
+# profiles.py
+import json
+import os
+import tempfile
+import threading
+from keyboards.key_remaps import read_remappings, remap_batch
+from keyboards.remap_graph import analyze, errors
+from keyboards.key_catalogue import get_key_catalogue
+from keyboards.shortcut_store import SHORTCUT_FILE, load_shortcuts, save_shortcuts
+from registry.apply_planner import apply_plan, is_dry_run, plan_batch
+from registry.managed_keys import STUCKRECTS_PATH
+from registry.registry_backend import HKCU, WriteBatch
+from registry.registry_snapshot import get_registry_snapshot
+from taskbar.taskbar_options import (ALIGNMENT_OPTIONS, AUTO_HIDE_OPTIONS, CLOCK_VISIBILITY_OPTIONS, ICON_SIZE_OPTIONS,
+                                     LABEL_VISIBILITY_OPTIONS, STUCKRECTS_BYTES, TASKBAR_POSITIONS, patch_stuckrects,
+                                     read_taskbar_values, taskbar_batch)
+from trackpad.touchpad_values import TOUCHPAD_VALUES, read_touchpad_values, touchpad_batch
+
+PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles.json")
+
+# Taskbar option in a profile -> (registry name, {label: value} or None for plain numbers)
+TASKBAR_PROFILE_OPTIONS = {
+    "Position": ("Position", TASKBAR_POSITIONS),
+    "AutoHide": ("AutoHide", AUTO_HIDE_OPTIONS),
+    "IconSize": ("TaskbarSmallIcons", ICON_SIZE_OPTIONS),
+    "Alignment": ("TaskbarAl", ALIGNMENT_OPTIONS),
+    "Clock": ("ShowClock", CLOCK_VISIBILITY_OPTIONS),
+    "Labels": ("TaskbarGlomLevel", LABEL_VISIBILITY_OPTIONS),
+    "ThumbnailSize": ("MinThumbSizePx", None),
+}
+
+DWORD_MAX = 0xFFFFFFFF  # Plain numbers are written as REG_DWORD
+
+SHORTCUT_FIELDS = {"modifiers", "key", "to_modifiers", "to_key"}
+
+
+class CompiledProfile:
+    """A profile turned into registry operations, ready to be applied.
+
+    `batch` holds every plain value. Position and auto-hide live in the StuckRects3
+    blob next to other taskbar state, so they are kept as a byte patch and applied
+    to the current blob at apply time. `shortcuts` is the shortcuts.json payload,
+    None if the profile leaves the shortcuts alone.
+    """
+
+    def __init__(self, name, batch, stuckrects_patch, shortcuts):
+        self.name = name
+        self.batch = batch
+        self.stuckrects_patch = stuckrects_patch
+        self.shortcuts = shortcuts
+
+    def to_batch(self, registry):
+        batch = WriteBatch().extend(self.batch)
+        if self.stuckrects_patch:
+            blob, blob_type = registry.read_value(HKCU, STUCKRECTS_PATH, "Settings")
+            batch.set(HKCU, STUCKRECTS_PATH, "Settings", patch_stuckrects(blob, self.stuckrects_patch), blob_type)
+        return batch
+
+
+def _is_dword(value):
+    return type(value) is int and 0 <= value <= DWORD_MAX
+
+
+def _check_shortcut(name, combination, shortcut):
+    """Raise ValueError unless the shortcut is a shortcuts.json entry made of known key names."""
+    catalogue = get_key_catalogue()
+    if not isinstance(shortcut, dict) or set(shortcut) != SHORTCUT_FIELDS:
+        raise ValueError(f"Profile '{name}': shortcut '{combination}' must have exactly {', '.join(sorted(SHORTCUT_FIELDS))}")
+    for field in ("modifiers", "to_modifiers"):
+        keys = shortcut[field]
+        if not isinstance(keys, list) or any(not isinstance(key, str) or key not in catalogue.hotkey_names for key in keys):
+            raise ValueError(f"Profile '{name}': shortcut '{combination}' has invalid {field} {keys!r}")
+    for field in ("key", "to_key"):
+        key = shortcut[field]
+        if not isinstance(key, str) or key not in catalogue:
+            raise ValueError(f"Profile '{name}': shortcut '{combination}' has invalid {field} {key!r}")
+
+
+def compile_profile(name, definition):
+    """Validate a profile definition and compile it. Raises ValueError for invalid profiles.
+
+    A definition has up to four sections; sections that are left out are not changed:
+        "touchpad":   {"CurtainTop": 1000, ...}            registry values, in 1/1000 cm
+        "key_remaps": [["Caps Lock", "Left Ctrl"], ...]     key names as in the key remap view
+        "shortcuts":  {...}                                 same payload as shortcuts.json
+        "taskbar":    {"Position": "Bottom", "IconSize": "Small", "ThumbnailSize": 200, ...}
+    """
+    if not isinstance(definition, dict):
+        raise ValueError(f"Profile '{name}' must be an object")
+    unknown = set(definition) - {"touchpad", "key_remaps", "shortcuts", "taskbar"}
+    if unknown:
+        raise ValueError(f"Profile '{name}' has unknown sections: {', '.join(sorted(unknown))}")
+    for section, section_type in (("touchpad", dict), ("key_remaps", list), ("taskbar", dict)):
+        if not isinstance(definition.get(section, section_type()), section_type):
+            raise ValueError(f"Profile '{name}': {section} must be {'an object' if section_type is dict else 'a list'}")
+
+    touchpad = definition.get("touchpad", {})
+    for value_name, value in touchpad.items():
+        if value_name not in TOUCHPAD_VALUES:
+            raise ValueError(f"Profile '{name}': unknown touchpad value '{value_name}'")
+        if not _is_dword(value):
+            raise ValueError(f"Profile '{name}': touchpad value '{value_name}' must be an integer from 0 to {DWORD_MAX}")
+    batch = touchpad_batch(touchpad)
+
+    if "key_remaps" in definition:
+        remappings = definition["key_remaps"]
+        for remapping in remappings:
+            if (not isinstance(remapping, (list, tuple)) or len(remapping) != 2
+                    or any(not isinstance(key, str) or key not in get_key_catalogue() for key in remapping)):
+                raise ValueError(f"Profile '{name}': invalid key remapping {remapping!r}")
+        catalogue = get_key_catalogue()
+        _, problems = analyze(((catalogue.scancode(key_from), catalogue.scancode(key_to)) for key_from, key_to in remappings),
+                              name=catalogue.scancode_name)
+        if errors(problems):
+            raise ValueError(f"Profile '{name}': {errors(problems)[0].message}")
+        batch.extend(remap_batch(remappings))
+
+    taskbar_values = {}
+    for option, label in definition.get("taskbar", {}).items():
+        if option not in TASKBAR_PROFILE_OPTIONS:
+            raise ValueError(f"Profile '{name}': unknown taskbar option '{option}'")
+        registry_name, choices = TASKBAR_PROFILE_OPTIONS[option]
+        if choices is None:
+            if not _is_dword(label):
+                raise ValueError(f"Profile '{name}': taskbar option '{option}' must be an integer from 0 to {DWORD_MAX}")
+            taskbar_values[registry_name] = label
+        elif label in choices:
+            taskbar_values[registry_name] = choices[label]
+        else:
+            raise ValueError(f"Profile '{name}': taskbar option '{option}' must be one of {list(choices)}")
+
+    stuckrects_patch = {option: taskbar_values.pop(option) for option in STUCKRECTS_BYTES if option in taskbar_values}
+    batch.extend(taskbar_batch(taskbar_values, registry=None))
+
+    shortcuts = definition.get("shortcuts")
+    if shortcuts is not None and not isinstance(shortcuts, dict):
+        raise ValueError(f"Profile '{name}': shortcuts must be an object like shortcuts.json")
+    for combination, shortcut in (shortcuts or {}).items():
+        _check_shortcut(name, combination, shortcut)
+    return CompiledProfile(name, batch, stuckrects_patch, shortcuts)
+
+
+def apply_compiled(compiled, registry=None, dry_run=None, actions=None, shortcuts_path=SHORTCUT_FILE):
+    """Write a compiled profile: one planned registry batch plus the shortcuts payload. Returns the plan."""
+    plan = plan_batch(compiled.to_batch(registry or get_registry_snapshot()), registry)
+    apply_plan(plan, registry, dry_run=dry_run, actions=actions)
+
+    if compiled.shortcuts is not None:
+        if is_dry_run(dry_run):
+            print(f"{shortcuts_path}: {len(compiled.shortcuts)} shortcut(s)")
+        else:
+            save_shortcuts(compiled.shortcuts, shortcuts_path)
+    return plan
+
+
+def capture_profile(registry=None, shortcuts_path=SHORTCUT_FILE):
+    """Profile definition holding the current touchpad, key remap, shortcut and taskbar settings."""
+    registry = registry or get_registry_snapshot()
+    definition = {
+        "touchpad": read_touchpad_values(registry),
+        "key_remaps": [list(remapping) for remapping in read_remappings(registry)],
+        "shortcuts": load_shortcuts(shortcuts_path),
+    }
+
+    taskbar = {}
+    current = read_taskbar_values(registry)
+    for option, (registry_name, choices) in TASKBAR_PROFILE_OPTIONS.items():
+        if registry_name not in current:
+            continue
+        if choices is None:
+            taskbar[option] = current[registry_name]
+        else:
+            labels = [label for label, value in choices.items() if value == current[registry_name]]
+            if labels:
+                taskbar[option] = labels[0]
+    definition["taskbar"] = taskbar
+    return definition
+
+
+class ProfileStore:
+    """Named profiles kept in profiles.json, compiled once and cached until they change."""
+
+    def __init__(self, path=PROFILES_PATH, registry=None):
+        self.path = path
+        self.registry = registry
+        self._profiles = None
+        self._compiled = {}
+        self._subscribers = []
+        self._lock = threading.RLock()
+
+    def _load(self):
+        if self._profiles is None:
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+                profiles = data.get("profiles", {}) if isinstance(data, dict) else None
+                if not isinstance(profiles, dict):
+                    raise ValueError("expected an object with a \"profiles\" object")
+                self._profiles = profiles
+            except FileNotFoundError:
+                self._profiles = {}
+            except (OSError, ValueError) as e:
+                # Start with an empty store; _profiles is set, so this is only reported once
+                print(f"Warning: ignoring unreadable profiles file '{self.path}': {e}")
+                self._profiles = {}
+        return self._profiles
+
+    def _save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(prefix=".profiles-", suffix=".tmp", dir=directory)
+        with os.fdopen(fd, "w") as f:
+            json.dump({"version": 1, "profiles": self._profiles}, f, indent=4)
+        os.replace(temp_path, self.path)
+
+    def names(self):
+        with self._lock:
+            return sorted(self._load())
+
+    def definition(self, name):
+        with self._lock:
+            return self._load()[name]
+
+    def save_profile(self, name, definition):
+        """Store a profile; it is compiled first so invalid profiles are rejected."""
+        compiled = compile_profile(name, definition)
+        with self._lock:
+            self._load()[name] = definition
+            self._compiled[name] = compiled
+            self._save()
+
+    def save_current(self, name):
+        """Store the current settings as a profile."""
+        self.save_profile(name, capture_profile(self.registry))
+
+    def delete_profile(self, name):
+        with self._lock:
+            del self._load()[name]
+            self._compiled.pop(name, None)
+            self._save()
+
+    def compiled(self, name):
+        with self._lock:
+            compiled = self._compiled.get(name)
+            if compiled is None:
+                compiled = self._compiled[name] = compile_profile(name, self._load()[name])
+            return compiled
+
+    def apply(self, name, dry_run=None):
+        """Switch to a profile: one planned registry batch plus the shortcuts payload. Returns the plan."""
+        compiled = self.compiled(name)
+        plan = apply_compiled(compiled, self.registry, dry_run)
+
+        if not is_dry_run(dry_run):
+            for callback in list(self._subscribers):
+                try:
+                    callback(name, compiled)
+                except Exception as e:
+                    print(f"Error in profile subscriber: {e}")
+        return plan
+
+    def subscribe(self, callback):
+        """Call `callback(name, compiled_profile)` after a profile was applied."""
+        self._subscribers.append(callback)
+
+
+_profile_store = None
+
+def get_profile_store():
+    """Return the process-wide profile store."""
+    global _profile_store
+    if _profile_store is None:
+        _profile_store = ProfileStore()
+    return _profile_store
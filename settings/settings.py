@@ -1,24 +1,25 @@
 import customtkinter as ctk
-import json
-import shutil
-import os
-import winreg
 
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import filedialog, messagebox
 from tray_icons import tray_manager
 from widgets.button import BouncingButton
 from widgets.sliding_frames import SlidingFrame
 from widgets.theme_manager import trigger_theme_change
-from configuration_manager import ScreenInfo
-
-# settings.json 파일 경로
-SETTINGS_PATH = os.path.join(os.path.dirname(__file__), "settings.json")
+from configuration_manager import get_screen_info
+from settings.settings_store import get_settings_store
+from registry.registry_backend import WriteBatch
+from registry.managed_keys import MANAGED_VALUES
+from registry.apply_planner import apply_plan, is_dry_run, plan_batch, redo_last_change, undo_last_change
+from registry.pending_changes import get_pending_changes
+from registry.registry_backups import BASELINE, get_backup_store, restore_batch
+from registry.reg_file import export_reg, import_batch
+from settings.profiles import get_profile_store
 
 class SettingsView(SlidingFrame):
     def __init__(self, parent, controller):
         
-        self.screen_info = ScreenInfo()
+        self.screen_info = get_screen_info()
         
         super().__init__(parent, width=self.screen_info.window_width, height=self.screen_info.window_height)
         self.controller = controller
@@ -32,76 +33,78 @@ class SettingsView(SlidingFrame):
         self.scrollable_frame.pack(fill="both", expand=True, padx=padding_x, pady=padding_y)
 
         
-        # Load settings.json
-        self.settings = self.load_settings()
+        # Shared settings, loaded once per process
+        self.settings_store = get_settings_store()
+        self.backup_store = get_backup_store()
+        self.profile_store = get_profile_store()
 
         # Create the UI elements
         self.create_ui_elements()
 
-        # Define registry paths and values to delete
-        self.registry_paths = [
-            (winreg.HKEY_LOCAL_MACHINE, r'SOFTWARE\Microsoft\Windows\CurrentVersion\PrecisionTouchPad',
-             ['CurtainTop', 'CurtainLeft', 'CurtainRight', 'SuperCurtainTop', 'SuperCurtainLeft', 'SuperCurtainRight', 'RightClickZoneWidth', 'RightClickZoneHeight']),
-            
-            (winreg.HKEY_LOCAL_MACHINE, r'SYSTEM\CurrentControlSet\Control\Keyboard Layout',
-             ['Scancode Map']),  # Single value for keyboard layout
-            
-            (winreg.HKEY_CURRENT_USER, r'Software\Microsoft\Windows\CurrentVersion\Explorer\StuckRects3',
-             ['Settings']),  # Binary value for taskbar position and auto-hide
-            
-            (winreg.HKEY_CURRENT_USER, r'Software\Microsoft\Windows\CurrentVersion\Explorer\Advanced',
-             ['TaskbarSmallIcons', 'TaskbarAl', 'ShowClock', 'TaskbarGlomLevel']),  # Taskbar advanced options
-            
-            (winreg.HKEY_CURRENT_USER, r'Software\Microsoft\Windows\CurrentVersion\Explorer\Taskband',
-             ['MinThumbSizePx'])  # Taskbar thumbnail preview size
-        ]
+        # Registry paths and values to delete, shared with the registry snapshot
+        self.registry_paths = MANAGED_VALUES
 
     def create_ui_elements(self):
         """Create the UI elements for the settings view."""
-        self.admin_rights_var = ctk.BooleanVar(value=self.settings.get("require_admin", False))
+        self.admin_rights_var = ctk.BooleanVar(value=self.settings_store.settings.require_admin)
         self.admin_rights_checkbox = ctk.CTkCheckBox(self.scrollable_frame, text="Automatically give admin rights", variable=self.admin_rights_var, command=self.toggle_admin_rights)
         self.admin_rights_checkbox.pack(pady=10)
 
+        # Named profiles (e.g. docked, travel), each applied as a single batch
+        self.profile_var = ctk.StringVar()
+        self.profile_dropdown = ctk.CTkOptionMenu(self.scrollable_frame, variable=self.profile_var, values=[""])
+        self.profile_dropdown.pack(pady=(10, 0))
+        self.update_profile_list()
+
+        profile_frame = ctk.CTkFrame(self.scrollable_frame)
+        profile_frame.pack(pady=10)
+        BouncingButton(profile_frame, text="Apply Profile", command=self.apply_profile).grid(row=0, column=0, padx=10)
+        BouncingButton(profile_frame, text="Save Current as Profile", command=self.save_profile).grid(row=0, column=1, padx=10)
+
+        # Backup to reset to, the original settings by default
+        self.backup_var = ctk.StringVar()
+        self.backup_dropdown = ctk.CTkOptionMenu(self.scrollable_frame, variable=self.backup_var, values=[""])
+        self.backup_dropdown.pack(pady=(10, 0))
+        self.update_backup_list()
+
         self.reset_button = BouncingButton(self.scrollable_frame, text="Reset All Changes", command=self.reset_options)
         self.reset_button.pack(pady=10)
 
-        self.minimize_to_tray_var = ctk.BooleanVar(value=self.settings.get("minimize_to_tray", False))
+        # Step through the journal of applied registry changes
+        history_frame = ctk.CTkFrame(self.scrollable_frame)
+        history_frame.pack(pady=10)
+        BouncingButton(history_frame, text="Undo Last Change", command=self.undo_change).grid(row=0, column=0, padx=10)
+        BouncingButton(history_frame, text="Redo", command=self.redo_change).grid(row=0, column=1, padx=10)
+
+        # Move the managed values between machines as standard .reg files
+        reg_frame = ctk.CTkFrame(self.scrollable_frame)
+        reg_frame.pack(pady=10)
+        BouncingButton(reg_frame, text="Export .reg", command=self.export_reg_file).grid(row=0, column=0, padx=10)
+        BouncingButton(reg_frame, text="Import .reg", command=self.import_reg_file).grid(row=0, column=1, padx=10)
+
+        self.minimize_to_tray_var = ctk.BooleanVar(value=self.settings_store.settings.minimize_to_tray)
         self.minimize_to_tray_checkbox = ctk.CTkCheckBox(self.scrollable_frame, text="Minimize to system tray instead of completely quitting", variable=self.minimize_to_tray_var, command=self.toggle_minimize_to_tray)
         self.minimize_to_tray_checkbox.pack(pady=10)
 
-        self.display_discharge_rate_var = ctk.BooleanVar(value=self.settings.get("Display discharge rate", False))
+        self.display_discharge_rate_var = ctk.BooleanVar(value=self.settings_store.settings.display_discharge_rate)
         self.display_discharge_rate_checkbox = ctk.CTkCheckBox(self.scrollable_frame, text="Always display battery discharge rate", variable=self.display_discharge_rate_var, command=self.toggle_display_discharge_rate)
         self.display_discharge_rate_checkbox.pack(pady=10)
 
         # Theme selection dropdown
-        self.theme_var = ctk.StringVar(value=self.settings.get("theme", "Auto"))
+        self.theme_var = ctk.StringVar(value=self.settings_store.settings.theme)
         self.theme_dropdown = ctk.CTkOptionMenu(self.scrollable_frame, variable=self.theme_var, values=["Dark", "Light"], command=self.change_theme)
         self.theme_dropdown.pack(pady=10)
 
         BouncingButton(self.scrollable_frame, text="Back", command=self.controller.wrap_command(self.controller.go_back)).pack(pady=10)
 
-    def load_settings(self):
-        """Load settings from settings.json"""
-        try:
-            with open(SETTINGS_PATH, "r") as file:
-                return json.load(file)
-        except FileNotFoundError:
-            return {"require_admin": False, "minimize_to_tray": False, "Display discharge rate": False, "theme": "Auto"}
-
-    def save_settings(self):
-        """Save settings to settings.json"""
-        with open(SETTINGS_PATH, "w") as file:
-            json.dump(self.settings, file, indent=4)
-
     def toggle_admin_rights(self):
         """Toggle admin rights setting"""
-        self.settings["require_admin"] = self.admin_rights_var.get()
-        self.save_settings()
+        self.settings_store.set("require_admin", self.admin_rights_var.get())
 
     def toggle_minimize_to_tray(self):
         """Toggle minimize to tray setting"""
         minimize_to_tray = self.minimize_to_tray_var.get()
-        self.settings['minimize_to_tray'] = minimize_to_tray
+        changes = {'minimize_to_tray': minimize_to_tray}
 
         if not minimize_to_tray and self.display_discharge_rate_var.get():
             ask_user = messagebox.askyesno(
@@ -110,18 +113,18 @@ class SettingsView(SlidingFrame):
             )
             if ask_user:
                 self.display_discharge_rate_var.set(False)
-                self.settings['Display discharge rate'] = False
+                changes['display_discharge_rate'] = False
                 tray_manager.stop_battery_discharge_icon()
             else:
                 self.minimize_to_tray_var.set(True)
-                self.settings['minimize_to_tray'] = True
+                changes['minimize_to_tray'] = True
 
-        self.save_settings()
+        self.settings_store.update(changes)
 
     def toggle_display_discharge_rate(self):
         """Toggle display discharge rate setting"""
         display = self.display_discharge_rate_var.get()
-        minimize_to_tray = self.settings.get('minimize_to_tray', False)
+        minimize_to_tray = self.settings_store.settings.minimize_to_tray
 
         if not minimize_to_tray and display:
             user_response = messagebox.askyesno(
@@ -130,8 +133,7 @@ class SettingsView(SlidingFrame):
             )
             if user_response:
                 self.minimize_to_tray_var.set(True)
-                self.settings['minimize_to_tray'] = True
-                self.settings['Display discharge rate'] = True
+                self.settings_store.update({'minimize_to_tray': True, 'display_discharge_rate': True})
                 tray_manager.start_battery_discharge_icon()
             else:
                 self.display_discharge_rate_var.set(False)
@@ -141,46 +143,155 @@ class SettingsView(SlidingFrame):
             else:
                 tray_manager.stop_battery_discharge_icon()
 
-            self.settings['Display discharge rate'] = display
-        self.save_settings()
+            self.settings_store.set('display_discharge_rate', display)
 
     def change_theme(self, theme):
-        """Change theme setting and apply the theme immediately."""
-        self.settings['theme'] = theme
-        self.save_settings()
-        
-        if theme == "Light":
-            ctk.set_appearance_mode("light")
-        elif theme == "Dark":
-            ctk.set_appearance_mode("dark")
+        """Change theme setting, MainApp applies the theme as soon as the setting changes."""
+        self.settings_store.set('theme', theme)
             
         trigger_theme_change() #re-render switch image
 
+    def update_profile_list(self):
+        names = self.profile_store.names()
+        self.profile_dropdown.configure(values=names or ["No profiles"])
+        self.profile_var.set(names[0] if names else "No profiles")
+
+    def apply_profile(self):
+        """Switch every touchpad, keyboard and taskbar setting to the selected profile."""
+        name = self.profile_var.get()
+        if name not in self.profile_store.names():
+            messagebox.showinfo("Profiles", "Save the current settings as a profile first.")
+            return
+        try:
+            plan = self.profile_store.apply(name)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not apply profile '{name}': {e}")
+            return
+        if is_dry_run():
+            messagebox.showinfo("Dry Run", f"{len(plan)} registry change(s) were printed; profile '{name}' was not applied.")
+            return
+        messagebox.showinfo("Profile Applied", f"Profile '{name}' applied ({len(plan)} registry change(s)).")
+
+    def save_profile(self):
+        """Store the current settings under a name."""
+        name = ctk.CTkInputDialog(text="Profile name:", title="Save Profile").get_input()
+        if not name:
+            return
+        try:
+            self.profile_store.save_current(name.strip())
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not save profile '{name}': {e}")
+            return
+        self.update_profile_list()
+        self.profile_var.set(name.strip())
+
+    def update_backup_list(self):
+        """Fill the backup dropdown, the original settings first."""
+        self.backup_choices = {}
+        for backup_id, label, created in self.backup_store.list_backups():
+            self.backup_choices[f"{label} ({created})" if backup_id != BASELINE else label] = backup_id
+
+        choices = list(self.backup_choices) or ["Original settings"]
+        self.backup_dropdown.configure(values=choices)
+        self.backup_var.set(choices[0])
+
     def reset_options(self):
         """Reset registry keys to default values and reset settings"""
-        if messagebox.askyesno("Confirm Reset", "Are you sure you want to reset all modified settings to default? This will undo all changes made by this program."):
-            # Delete only the specific registry values added by this program
-            for root_key, path, values in self.registry_paths:
-                self.delete_registry(root_key, path, values)
-            
-            # Restart Explorer for taskbar settings
-            os.system("taskkill /f /im explorer.exe & start explorer.exe")
+        if messagebox.askyesno("Confirm Reset", "Are you sure you want to reset all modified settings to the selected backup? This will undo the changes made by this program since then."):
+            backup_id = self.backup_choices.get(self.backup_var.get())
+            try:
+                plan = plan_batch(self.reset_batch(backup_id))
+                if not plan:
+                    messagebox.showinfo("Reset", "The settings already match the selected backup.")
+                    return
+                apply_plan(plan)
+            except PermissionError:
+                messagebox.showerror("Error", "Permission denied while resetting registry values. Run the program as administrator.")
+                return
+            except Exception as e:
+                messagebox.showerror("Error", f"An error occurred while resetting registry values: {e}")
+                return
+
+            if is_dry_run():
+                messagebox.showinfo("Dry Run", f"{len(plan)} registry change(s) were printed; nothing was reset.")
+                return
+
+            # Staged changes would undo the reset
+            get_pending_changes().discard()
+            self.update_backup_list()
             
-            messagebox.showinfo("Reset Complete", "All settings have been reset to default.")
+            messagebox.showinfo("Reset Complete", f"{len(plan)} registry value(s) have been reset.")
 
-    def delete_registry(self, registry_root, registry_path, values_to_delete):
-        """Delete specific registry values inside the specified registry path."""
+    def undo_change(self):
+        """Put back the registry values overwritten by the last apply."""
         try:
-            reg_key = winreg.OpenKey(registry_root, registry_path, 0, winreg.KEY_ALL_ACCESS)
-            for value_name in values_to_delete:
-                try:
-                    winreg.DeleteValue(reg_key, value_name)
-                except FileNotFoundError:
-                    pass
-            winreg.CloseKey(reg_key)
-        except FileNotFoundError:
-            print(f"Registry path '{registry_path}' not found. Skipping...")
+            plan = undo_last_change()
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not undo the last change: {e}")
+            return
+        if plan is None:
+            messagebox.showinfo("Undo", "There is nothing to undo.")
+
+    def redo_change(self):
+        """Apply the last undone change again."""
+        try:
+            plan = redo_last_change()
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not redo the change: {e}")
+            return
+        if plan is None:
+            messagebox.showinfo("Redo", "There is nothing to redo.")
+
+    def export_reg_file(self):
+        """Write every value this program manages to a .reg file."""
+        path = filedialog.asksaveasfilename(title="Export Settings", defaultextension=".reg", filetypes=[("Registry files", "*.reg")])
+        if not path:
+            return
+        try:
+            count = export_reg(path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not export the settings: {e}")
+            return
+        messagebox.showinfo("Export Complete", f"{count} registry value(s) exported.")
+
+    def import_reg_file(self):
+        """Apply the managed values of a .reg file in one batch; other keys in the file are ignored."""
+        path = filedialog.askopenfilename(title="Import Settings", filetypes=[("Registry files", "*.reg")])
+        if not path:
+            return
+        try:
+            plan = plan_batch(import_batch(path))
+            if not plan:
+                messagebox.showinfo("Import", "The settings in this file are already applied.")
+                return
+            message = f"{plan.describe()}\n\nApply these changes?"
+            # Staged changes would overwrite the imported values, so they are dropped
+            staged = get_pending_changes().plan()
+            if staged:
+                message += f"\n\nThese staged changes will be discarded:\n{staged.describe()}"
+            if not messagebox.askyesno("Confirm Import", message):
+                return
+            apply_plan(plan)
         except PermissionError:
-            print(f"Permission denied for '{registry_path}'. Run the script as administrator.")
+            messagebox.showerror("Error", "Permission denied while importing. Run the program as administrator.")
+            return
         except Exception as e:
-            print(f"An error occurred while deleting registry values in '{registry_path}': {e}")
+            messagebox.showerror("Error", f"Could not import '{path}': {e}")
+            return
+
+        if is_dry_run():
+            return
+        get_pending_changes().discard()
+        self.update_backup_list()
+
+    def reset_batch(self, backup_id):
+        """WriteBatch restoring a backup; with no backup (None) the managed values are deleted."""
+        if backup_id is not None:
+            return restore_batch(self.backup_store.load(backup_id))
+
+        # No backup yet: the values were changed before backups existed, delete them
+        batch = WriteBatch()
+        for registry_root, registry_path, values_to_delete in self.registry_paths:
+            for value_name in values_to_delete:
+                batch.delete(registry_root, registry_path, value_name)
+        return batch
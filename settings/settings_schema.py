@@ -0,0 +1,110 @@
+# settings_schema.py
+from dataclasses import asdict, dataclass, field, fields, replace
+
+SCHEMA_VERSION = 1
+
+THEMES = ("Dark", "Light")
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Typed, validated view of settings.json.
+
+    Instances are immutable: changing a setting produces a new instance, so readers
+    always see a consistent snapshot and can read plain attributes on hot paths.
+    """
+
+    require_admin: bool = False
+    minimize_to_tray: bool = False
+    display_discharge_rate: bool = False
+    theme: str = "Dark"
+    enable_hotkey_remapping: bool = False
+
+    # Keys this version does not know about, kept so that they survive a rewrite
+    extra: dict = field(default_factory=dict, compare=False)
+
+    def to_dict(self):
+        """Serialize for settings.json, including the schema version."""
+        data = dict(self.extra)
+        data.update(asdict(self))
+        del data["extra"]
+        data["version"] = SCHEMA_VERSION
+        return data
+
+
+FIELD_TYPES = {f.name: f.type for f in fields(Settings) if f.name != "extra"}
+FIELD_DEFAULTS = {f.name: f.default for f in fields(Settings) if f.name != "extra"}
+
+# Extra constraints on top of the type
+FIELD_CHOICES = {"theme": THEMES}
+
+
+def _migrate_0_to_1(data):
+    """Unversioned files used a display label as key and allowed an 'Auto' theme."""
+    if "Display discharge rate" in data:
+        data["display_discharge_rate"] = data.pop("Display discharge rate")
+    if data.get("theme") not in THEMES:
+        data["theme"] = "Dark"  # 'Auto' was never implemented and always fell back to Dark
+    return data
+
+# MIGRATIONS[n] upgrades a version n dict to version n + 1
+MIGRATIONS = {
+    0: _migrate_0_to_1,
+}
+
+
+def migrate(data):
+    """Upgrade a raw settings dict to SCHEMA_VERSION. Returns (data, migrated)."""
+    if not isinstance(data, dict):
+        raise ValueError(f"Settings must be a JSON object, not {type(data).__name__}")
+    data = dict(data)
+    version = data.pop("version", 0)
+    if not isinstance(version, int) or version > SCHEMA_VERSION:
+        raise ValueError(f"Unsupported settings version: {version!r}")
+
+    migrated = version != SCHEMA_VERSION
+    while version < SCHEMA_VERSION:
+        data = MIGRATIONS[version](data)
+        version += 1
+    return data, migrated
+
+
+def validate_value(name, value):
+    """Check one value against the schema; raises KeyError/TypeError/ValueError."""
+    expected = FIELD_TYPES[name]
+    if type(value) is not expected:
+        raise TypeError(f"Setting '{name}' must be {expected.__name__}, got {type(value).__name__}")
+    choices = FIELD_CHOICES.get(name)
+    if choices is not None and value not in choices:
+        raise ValueError(f"Setting '{name}' must be one of {choices}, got {value!r}")
+    return value
+
+
+def load_settings(data):
+    """Migrate and validate a raw settings dict into a Settings object.
+
+    Invalid values are replaced by their defaults. Returns (settings, changed) where
+    `changed` tells whether the file should be rewritten.
+    """
+    data, changed = migrate(data)
+
+    values = {}
+    for name, default in FIELD_DEFAULTS.items():
+        if name not in data:
+            values[name] = default
+            continue
+        try:
+            values[name] = validate_value(name, data.pop(name))
+        except (TypeError, ValueError) as e:
+            print(f"{e}; using default {default!r}")
+            values[name] = default
+            changed = True
+
+    return Settings(extra=data, **values), changed
+
+
+def with_changes(settings, changes):
+    """Return a copy of `settings` with validated changes applied."""
+    for name, value in changes.items():
+        validate_value(name, value)
+    return replace(settings, **changes)
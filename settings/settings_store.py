@@ -0,0 +1,180 @@
+# settings_store.py
+import atexit
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from settings.settings_schema import SCHEMA_VERSION, Settings, load_settings, with_changes
+
+# settings.json 파일 경로
+SETTINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "settings.json")
+
+
+class SettingsStore:
+    """Single in-memory copy of settings.json.
+
+    The file is read, migrated and validated once into a typed `Settings` object;
+    reads are plain attribute lookups on `store.settings`. Changes are published to
+    subscribers immediately and written back once the settings have been quiet for
+    `debounce_s` seconds, atomically (temporary file + rename). A file that could not
+    be read (corrupted, or written by a newer version) is copied to settings.json.bak
+    before it is first overwritten.
+    """
+
+    def __init__(self, path=SETTINGS_PATH, debounce_s=0.5):
+        self.path = path
+        self.debounce_s = debounce_s
+        self.write_count = 0
+
+        self._settings = None
+        self._lock = threading.RLock()
+        self._subscribers = []
+        self._writer = None
+        self._deadline = 0.0
+        self._dirty = False
+        self._backup_before_write = False
+
+    @property
+    def settings(self):
+        """The current, validated settings (an immutable snapshot)."""
+        settings = self._settings
+        if settings is None:
+            with self._lock:
+                settings = self._load()
+        return settings
+
+    def _load(self):
+        if self._settings is None:
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+            except FileNotFoundError:
+                data = {"version": SCHEMA_VERSION}
+            except ValueError as e:
+                print(f"Settings file '{self.path}' is corrupted, using defaults: {e}")
+                data = {"version": SCHEMA_VERSION}
+                self._backup_before_write = True
+
+            try:
+                self._settings, changed = load_settings(data)
+            except ValueError as e:
+                print(f"{e}; using defaults")
+                self._settings, changed = Settings(), False
+                self._backup_before_write = True
+
+            if changed:
+                self._schedule_write()  # Persist the migrated/repaired file
+        return self._settings
+
+    def get(self, name):
+        """Return one setting by attribute name."""
+        return getattr(self.settings, name)
+
+    def as_dict(self):
+        """Return all settings as they are written to settings.json."""
+        return self.settings.to_dict()
+
+    def set(self, name, value):
+        """Change one setting."""
+        self.update({name: value})
+
+    def update(self, changes):
+        """Validate and apply several changes at once; subscribers are called for each changed setting."""
+        with self._lock:
+            current = self.settings
+            changed = {name: value for name, value in changes.items() if getattr(current, name) != value}
+            if not changed:
+                return
+            self._settings = with_changes(current, changed)
+            self._schedule_write()
+
+        for name, value in changed.items():
+            self._publish(name, value)
+
+    def subscribe(self, callback, key=None):
+        """Call `callback(name, value)` when a setting changes (only setting `key` if given)."""
+        self._subscribers.append((key, callback))
+
+    def _publish(self, key, value):
+        for wanted_key, callback in list(self._subscribers):
+            if wanted_key is None or wanted_key == key:
+                try:
+                    callback(key, value)
+                except Exception as e:
+                    print(f"Error in settings subscriber for '{key}': {e}")
+
+    def _schedule_write(self):
+        """Push the write deadline back so a burst of changes results in one write."""
+        self._dirty = True
+        self._deadline = time.monotonic() + self.debounce_s
+        if self._writer is None:
+            # One writer thread per burst; later changes only move the deadline
+            self._writer = threading.Thread(target=self._write_when_quiet, name="settings-writer", daemon=True)
+            self._writer.start()
+
+    def _write_when_quiet(self):
+        while True:
+            with self._lock:
+                remaining = self._deadline - time.monotonic()
+                if remaining <= 0:
+                    self._writer = None
+                    self._flush_locked()
+                    return
+            time.sleep(remaining)
+
+    def flush(self):
+        """Write pending changes now."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._dirty:
+            return
+        if self._backup_before_write:
+            self._backup_unreadable_file()
+        self._write_atomic(self._settings.to_dict())
+        self._dirty = False
+
+    def _backup_unreadable_file(self):
+        """Keep the file the defaults replaced, e.g. for a newer version of the program."""
+        backup_path = self.path + ".bak"
+        try:
+            shutil.copy2(self.path, backup_path)
+            print(f"Settings file '{self.path}' could not be read; it was saved as '{backup_path}'")
+        except FileNotFoundError:
+            pass
+        self._backup_before_write = False
+
+    def _write_atomic(self, data):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".settings-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self.write_count += 1
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+
+_settings_store = None
+_settings_store_lock = threading.Lock()
+
+def get_settings_store():
+    """Return the process-wide settings store."""
+    global _settings_store
+    if _settings_store is None:
+        with _settings_store_lock:
+            if _settings_store is None:
+                _settings_store = SettingsStore()
+                atexit.register(_settings_store.flush)
+    return _settings_store
@@ -0,0 +1,166 @@
+# single_instance.py
+import ctypes
+import os
+import sys
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from multiprocessing.connection import Client, Listener
+
+APP_ID = "MyWindows.SingleInstance"
+RESTORE_MESSAGE = "restore"
+AUTH_KEY = APP_ID.encode()
+
+
+class InstanceGuard(ABC):
+    """Allow a single running instance and forward messages from later launches to it.
+
+    Subclasses provide the lock (`_try_lock`/`_unlock`) and the address of the local
+    channel the running instance listens on.
+    """
+
+    family = None
+
+    def __init__(self, name=APP_ID):
+        self.name = name
+        self.address = None
+        self._locked = False
+        self._listener = None
+
+    def acquire(self):
+        """Try to become the running instance. Returns False if another instance holds the lock."""
+        if not self._locked:
+            self._locked = self._try_lock()
+        return self._locked
+
+    def release(self):
+        """Release the lock and stop listening."""
+        if self._listener is not None:
+            try:
+                self._listener.close()
+            except OSError:
+                pass
+            self._listener = None
+        if self._locked:
+            self._unlock()
+            self._locked = False
+
+    def send_message(self, message=RESTORE_MESSAGE, timeout=2.0):
+        """Send a message to the running instance. Returns True if it was delivered."""
+        result = []
+
+        def send():
+            try:
+                with Client(self.address, family=self.family, authkey=AUTH_KEY) as connection:
+                    connection.send(message)
+                result.append(True)
+            except (OSError, EOFError) as e:
+                print(f"Could not reach the running instance: {e}")
+
+        # Connecting can block if the other instance is hung, do not wait forever
+        sender = threading.Thread(target=send, daemon=True)
+        sender.start()
+        sender.join(timeout)
+        return bool(result)
+
+    def listen(self, callback):
+        """Call `callback(message)` from a background thread for every message received."""
+        self._listener = self._create_listener()
+
+        def serve(listener):
+            while True:
+                try:
+                    with listener.accept() as connection:
+                        callback(connection.recv())
+                except (OSError, EOFError):
+                    if self._listener is not listener:
+                        return  # Listener closed by release()
+                except Exception as e:
+                    print(f"Error handling single-instance message: {e}")
+
+        threading.Thread(target=serve, args=(self._listener,), daemon=True).start()
+
+    def _create_listener(self):
+        return Listener(self.address, family=self.family, authkey=AUTH_KEY)
+
+    @abstractmethod
+    def _try_lock(self):
+        pass
+
+    @abstractmethod
+    def _unlock(self):
+        pass
+
+
+class NamedMutexGuard(InstanceGuard):
+    """Windows guard based on a named mutex, messages go through a named pipe."""
+
+    family = "AF_PIPE"
+    ERROR_ACCESS_DENIED = 5
+    ERROR_ALREADY_EXISTS = 183
+
+    def __init__(self, name=APP_ID):
+        super().__init__(name)
+        self.address = rf"\\.\pipe\{name}"
+        self._handle = None
+
+    def _try_lock(self):
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        handle = kernel32.CreateMutexW(None, False, f"Local\\{self.name}")
+        error = ctypes.get_last_error()
+
+        # Access denied means the mutex exists but was created by an elevated instance
+        if not handle or error in (self.ERROR_ALREADY_EXISTS, self.ERROR_ACCESS_DENIED):
+            if handle:
+                kernel32.CloseHandle(handle)
+            return False
+
+        self._handle = handle
+        return True
+
+    def _unlock(self):
+        ctypes.windll.kernel32.CloseHandle(self._handle)
+        self._handle = None
+
+
+class LockFileGuard(InstanceGuard):
+    """POSIX stand-in based on an flock'ed lockfile, messages go through a Unix socket."""
+
+    family = "AF_UNIX"
+
+    def __init__(self, name=APP_ID, directory=None):
+        super().__init__(name)
+        directory = directory or tempfile.gettempdir()
+        self.lock_path = os.path.join(directory, f"{name}.lock")
+        self.address = os.path.join(directory, f"{name}.sock")
+        self._lock_file = None
+
+    def _try_lock(self):
+        import fcntl
+
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        self._lock_file = lock_file
+        return True
+
+    def _create_listener(self):
+        # A socket left over by a crashed instance would make bind() fail; we own the lock so it is stale
+        if os.path.exists(self.address):
+            os.remove(self.address)
+        return super()._create_listener()
+
+    def _unlock(self):
+        self._lock_file.close()
+        self._lock_file = None
+
+
+def create_instance_guard(name=APP_ID):
+    """Return the guard implementation for the current platform."""
+    if sys.platform == "win32":
+        return NamedMutexGuard(name)
+    return LockFileGuard(name)
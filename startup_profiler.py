@@ -0,0 +1,79 @@
+# startup_profiler.py
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_REPORT_PATH = "startup_profile.json"
+
+
+class StartupProfiler:
+    """Timestamp the start-up phases of the application.
+
+    Disabled by default; every call is then a cheap no-op so the instrumentation can
+    stay in field builds. Enable it with `--profile-startup`.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.finished = False
+        self.report_path = DEFAULT_REPORT_PATH
+        self.origin = time.perf_counter()  # Close enough to process start, this module is imported first
+        self.phases = []
+        self._lock = threading.Lock()
+
+    def enable(self, report_path=None):
+        self.enabled = True
+        if report_path:
+            self.report_path = report_path
+
+    @contextmanager
+    def phase(self, name):
+        """Time the enclosed block as one phase."""
+        if not self.enabled or self.finished:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def mark(self, name):
+        """Record an instantaneous event, e.g. the first idle of the event loop."""
+        if self.enabled and not self.finished:
+            now = time.perf_counter()
+            self.record(name, now, now)
+
+    def record(self, name, start, end):
+        """Record a phase from two perf_counter timestamps."""
+        with self._lock:
+            self.phases.append({
+                "name": name,
+                "start_ms": round((start - self.origin) * 1000, 3),
+                "duration_ms": round((end - start) * 1000, 3),
+                "thread": threading.current_thread().name,
+            })
+
+    def finish(self):
+        """Stop recording, write the JSON report and print a summary sorted by duration."""
+        if not self.enabled or self.finished:
+            return
+        self.finished = True
+
+        total_ms = round((time.perf_counter() - self.origin) * 1000, 3)
+        report = {"total_ms": total_ms, "phases": sorted(self.phases, key=lambda phase: phase["start_ms"])}
+        with open(self.report_path, "w") as f:
+            json.dump(report, f, indent=4)
+
+        self.print_summary(total_ms)
+
+    def print_summary(self, total_ms):
+        print(f"Startup took {total_ms:.1f} ms (report written to {self.report_path})")
+        print(f"{'phase':<40}{'start ms':>10}{'duration ms':>14}")
+        for phase in sorted(self.phases, key=lambda phase: phase["duration_ms"], reverse=True):
+            print(f"{phase['name']:<40}{phase['start_ms']:>10.1f}{phase['duration_ms']:>14.1f}")
+
+
+profiler = StartupProfiler()
@@ -0,0 +1,65 @@
+# taskbar_options.py
+from registry.managed_keys import ADVANCED_PATH, STUCKRECTS_PATH, TASKBAND_PATH
+from registry.registry_backend import HKCU, REG_BINARY, WriteBatch
+
+# Option labels shown in the UI -> registry values
+TASKBAR_POSITIONS = {"Bottom": 0x03, "Top": 0x01}
+AUTO_HIDE_OPTIONS = {"Disabled": 0x03, "Enabled": 0x02}
+ICON_SIZE_OPTIONS = {"Large": 0, "Small": 1}
+ALIGNMENT_OPTIONS = {"Center": 1, "Left": 0}  # Windows 11 only
+CLOCK_VISIBILITY_OPTIONS = {"Show": 1, "Hide": 0}
+LABEL_VISIBILITY_OPTIONS = {"Always Combine, Hide Labels": 0, "Combine Only When Taskbar Is Full": 1, "Never Combine": 2}
+THUMBNAIL_SIZE_OPTIONS = [str(i) for i in range(100, 301, 50)]  # From 100px to 300px in steps of 50px
+
+# Taskbar options kept in the StuckRects3 "Settings" blob, by byte offset
+STUCKRECTS_BYTES = {"AutoHide": 8, "Position": 12}
+
+# Taskbar options kept as DWORD values, by value name
+ADVANCED_VALUES = ("TaskbarSmallIcons", "TaskbarAl", "ShowClock", "TaskbarGlomLevel")
+TASKBAND_VALUES = ("MinThumbSizePx",)
+
+
+def patch_stuckrects(blob, patch):
+    """Return the StuckRects3 blob with {option: byte value} applied."""
+    value_list = list(blob)
+    for option, byte_value in patch.items():
+        value_list[STUCKRECTS_BYTES[option]] = byte_value
+    return bytes(value_list)
+
+
+def taskbar_batch(values, registry):
+    """WriteBatch for taskbar options given by registry name (AutoHide, Position, TaskbarSmallIcons, ...).
+
+    AutoHide and Position are patched into the current StuckRects3 blob read from
+    `registry`; that raises FileNotFoundError if the blob does not exist.
+    """
+    batch = WriteBatch()
+    patch = {option: values[option] for option in STUCKRECTS_BYTES if option in values}
+    if patch:
+        blob, blob_type = registry.read_value(HKCU, STUCKRECTS_PATH, "Settings")
+        batch.set(HKCU, STUCKRECTS_PATH, "Settings", patch_stuckrects(blob, patch), blob_type)
+
+    for name in ADVANCED_VALUES:
+        if name in values:
+            batch.set(HKCU, ADVANCED_PATH, name, int(values[name]))
+    for name in TASKBAND_VALUES:
+        if name in values:
+            batch.set(HKCU, TASKBAND_PATH, name, int(values[name]))
+    return batch
+
+
+def read_taskbar_values(registry):
+    """Current taskbar options by registry name; options that are not set are missing."""
+    values = {}
+    try:
+        blob, blob_type = registry.read_value(HKCU, STUCKRECTS_PATH, "Settings")
+        if blob_type == REG_BINARY:
+            values.update({option: blob[offset] for option, offset in STUCKRECTS_BYTES.items()})
+    except FileNotFoundError:
+        pass
+    for path, names in ((ADVANCED_PATH, ADVANCED_VALUES), (TASKBAND_PATH, TASKBAND_VALUES)):
+        try:
+            values.update({name: value for name, (value, _) in registry.read_values(HKCU, path, list(names)).items()})
+        except FileNotFoundError:
+            pass
+    return values
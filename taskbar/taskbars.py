@@ -1,28 +1,32 @@
 import customtkinter as ctk
 import tkinter as tk
-import winreg
-import os
 from tkinter import messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from reboot_prompt import prompt_reboot
 from PIL import Image, ImageTk
-import numpy as np
-import pywinstyles
 from widgets.button import BouncingButton
 from widgets.sliding_frames import SlidingFrame
-from configuration_manager import ScreenInfo
+from configuration_manager import get_screen_info
+from asset_loader import get_asset_loader, taskbar_preview_sizes
+from lazy_imports import lazy_import
+from registry.registry_backend import HKCU
+from registry.managed_keys import ADVANCED_PATH, STUCKRECTS_PATH, TASKBAND_PATH
+from registry.registry_snapshot import get_registry_snapshot
+from registry.apply_planner import plan_batch
+from registry.pending_changes import get_pending_changes
+from taskbar.taskbar_options import (ALIGNMENT_OPTIONS, AUTO_HIDE_OPTIONS, CLOCK_VISIBILITY_OPTIONS, ICON_SIZE_OPTIONS,
+                                     LABEL_VISIBILITY_OPTIONS, TASKBAR_POSITIONS, THUMBNAIL_SIZE_OPTIONS, taskbar_batch)
+from registry.registry_watcher import get_registry_watcher
+
+# pywinstyles is only needed once the taskbar preview is drawn
+pywinstyles = lazy_import("pywinstyles")
 
 
 class TaskbarView(SlidingFrame):
     def __init__(self, parent, controller):
         
-        self.screen_info = ScreenInfo()
+        self.screen_info = get_screen_info()
         super().__init__(parent, width=self.screen_info.window_width, height=self.screen_info.window_height)
         self.controller = controller
         
-        self.screen_info = ScreenInfo()
-        
         # Scrollable frame for taskbar settings
         padding_x, padding_y = self.screen_info.padding_x, self.screen_info.padding_y
 
@@ -33,25 +37,21 @@ class TaskbarView(SlidingFrame):
         self.scrollable_frame.pack(fill="both", expand=True, padx=padding_x, pady=padding_y)
 
         # Registry paths and keys for taskbar settings
-        self.registry_path_advanced = r'SOFTWARE\Microsoft\Windows\CurrentVersion\Explorer\Advanced'
-        self.registry_path_stuckrects = r'SOFTWARE\Microsoft\Windows\CurrentVersion\Explorer\StuckRects3'
+        self.registry_path_advanced = ADVANCED_PATH
+        self.registry_path_stuckrects = STUCKRECTS_PATH
+        self.registry_path_taskband = TASKBAND_PATH
 
-        # Construct paths relative to the current script's directory
-        base_dir = os.path.dirname(__file__)
-        self.background_img_path = os.path.join(base_dir, "background_image.png")
-        self.taskbar_img_path = os.path.join(base_dir, "taskbar.png")
-        
         # Max values for sliders
         self.max_taskbar_size = 100.0  # Taskbar length max value
         self.max_taskbar_transparency = 100.0  # Transparency max value
 
-        self.taskbar_positions = {"Bottom": 0x03, "Top": 0x01}
-        self.auto_hide_options = {"Disabled": 0x03, "Enabled": 0x02}
-        self.icon_size_options = {"Large": 0, "Small": 1}
-        self.alignment_options = {"Center": 1, "Left": 0}  # Windows 11 only
-        self.clock_visibility_options = {"Show": 1, "Hide": 0}
-        self.label_visibility_options = {"Always Combine, Hide Labels": 0, "Combine Only When Taskbar Is Full": 1, "Never Combine": 2}
-        self.thumbnail_size_options = [str(i) for i in range(100, 301, 50)]  # From 100px to 300px in steps of 50px
+        self.taskbar_positions = TASKBAR_POSITIONS
+        self.auto_hide_options = AUTO_HIDE_OPTIONS
+        self.icon_size_options = ICON_SIZE_OPTIONS
+        self.alignment_options = ALIGNMENT_OPTIONS  # Windows 11 only
+        self.clock_visibility_options = CLOCK_VISIBILITY_OPTIONS
+        self.label_visibility_options = LABEL_VISIBILITY_OPTIONS
+        self.thumbnail_size_options = THUMBNAIL_SIZE_OPTIONS
 
         # Setup UI        
         self.current_values = self.get_current_taskbar_values()
@@ -63,7 +63,25 @@ class TaskbarView(SlidingFrame):
         self.label_position = 0 if self.current_values["Position"] == self.taskbar_positions["Top"] else None
         
         self.after(500, self.setup_image())
+
+        # Follow taskbar changes made outside of the program (e.g. in Windows Settings)
+        get_registry_watcher().subscribe(self.on_registry_change, keys=[
+            (HKCU, self.registry_path_stuckrects), (HKCU, self.registry_path_advanced), (HKCU, self.registry_path_taskband)])
             
+    def on_registry_change(self, changes):
+        """Show taskbar settings that were changed outside of the program."""
+        self.current_values.update({key: value for key, value in self.get_current_taskbar_values().items()
+                                    if key not in ("TaskbarLength", "TaskbarTransparency")})  # Not stored in the registry
+
+        self.position_dropdown.set(self.get_dropdown_key(self.taskbar_positions, self.current_values["Position"]))
+        self.auto_hide_dropdown.set(self.get_dropdown_key(self.auto_hide_options, self.current_values["AutoHide"]))
+        self.icon_size_dropdown.set(self.get_dropdown_key(self.icon_size_options, self.current_values["TaskbarSmallIcons"]))
+        self.alignment_dropdown.set(self.get_dropdown_key(self.alignment_options, self.current_values["TaskbarAlignment"]))
+        self.clock_dropdown.set(self.get_dropdown_key(self.clock_visibility_options, self.current_values["ShowClock"]))
+        self.label_dropdown.set(self.get_dropdown_key(self.label_visibility_options, self.current_values["TaskbarGlomLevel"]))
+        self.thumbnail_dropdown.set(str(self.current_values["MinThumbSizePx"]))
+        self.position_taskbar_image()
+
     def get_dropdown_key(self, mapping, value):
         """Retrieve the key (label) for a given value in a dictionary."""
         for k, v in mapping.items():
@@ -119,25 +137,17 @@ class TaskbarView(SlidingFrame):
 
         self.update_idletasks()
 
-        # Calculate dimensions for the background image dynamically
-        image_width = self.screen_info.window_width * 0.8
-        
-        background_image_width = int(image_width)  # Ensure this is an integer
-        screen_ratio = self.screen_info.screen_width / self.screen_info.screen_height # Screen ratio
-        background_image_height = int(background_image_width / screen_ratio)  # Ensure this is an integer
-
-        taskbar_ratio = 40.55  # width is 40.55 times larger than height
-        taskbar_width = background_image_width
-        taskbar_height = int(taskbar_width / taskbar_ratio)  # Ensure this is an integer
+        # Dimensions of the background and taskbar images, derived from the window size
+        (background_image_width, background_image_height), (taskbar_width, taskbar_height) = taskbar_preview_sizes(self.screen_info)
 
-        # Load and resize background image
-        self.background_image = Image.open(self.background_img_path)
-        self.background_image_resized = self.background_image.resize((background_image_width, background_image_height), Image.Resampling.LANCZOS)  # Resize to fit
+        # The images were decoded and resized in the background since startup, wait for them if needed
+        asset_loader = get_asset_loader()
+        self.background_image_resized = asset_loader.result("taskbar_background")
         self.background_image_ctk = ctk.CTkImage(self.background_image_resized, size=(background_image_width, background_image_height))  # Convert to CTkImage
 
-        # Load and resize taskbar image
-        self.taskbar_image = Image.open(self.taskbar_img_path)
-        self.taskbar_image_resized = self.taskbar_image.resize((taskbar_width, taskbar_height), Image.Resampling.LANCZOS)  # Resize to fit at bottom
+        # The taskbar image is loaded at full width, shorter taskbar lengths are resized down from it
+        self.taskbar_image = asset_loader.result("taskbar_image")
+        self.taskbar_image_resized = self.taskbar_image
         self.taskbar_image_ctk = ctk.CTkImage(self.taskbar_image_resized, size=(taskbar_width, taskbar_height))  # Convert to CTkImage
 
         # Create and place background image label
@@ -316,47 +326,28 @@ class TaskbarView(SlidingFrame):
         taskbar_thumbnail_size = int(self.thumbnail_var.get())  # Thumbnail size is stored as an integer
 
         try:
-            # Save taskbar position and auto-hide settings
-            reg_key_stuckrects = winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.registry_path_stuckrects, 0, winreg.KEY_READ | winreg.KEY_WRITE)
-            value, regtype = winreg.QueryValueEx(reg_key_stuckrects, "Settings")
-            value_list = list(value)
-
-            # Modify the taskbar position and auto-hide options in the registry
-            value_list[8] = auto_hide_value  # Auto-hide: byte 8
-            value_list[12] = position_value  # Taskbar position: byte 12
-
-            # Save modified settings
-            winreg.SetValueEx(reg_key_stuckrects, "Settings", 0, regtype, bytes(value_list))
-            winreg.CloseKey(reg_key_stuckrects)
-
-            # Save taskbar advanced options
-            reg_key_advanced = winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.registry_path_advanced, 0, winreg.KEY_SET_VALUE)
-            
-            # Save taskbar icon size (small/large icons)
-            winreg.SetValueEx(reg_key_advanced, "TaskbarSmallIcons", 0, winreg.REG_DWORD, taskbar_icon_size)
-            
-            # Save taskbar alignment (only effective in Windows 11)
-            winreg.SetValueEx(reg_key_advanced, "TaskbarAl", 0, winreg.REG_DWORD, taskbar_alignment)
-            
-            # Save taskbar clock visibility
-            winreg.SetValueEx(reg_key_advanced, "ShowClock", 0, winreg.REG_DWORD, taskbar_clock)
-            
-            # Save taskbar label visibility
-            winreg.SetValueEx(reg_key_advanced, "TaskbarGlomLevel", 0, winreg.REG_DWORD, taskbar_labels)
-            
-            winreg.CloseKey(reg_key_advanced)
-
-            # Save taskbar thumbnail preview size
-            reg_key_taskband = winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.registry_path_taskband, 0, winreg.KEY_SET_VALUE)
-            winreg.SetValueEx(reg_key_taskband, "MinThumbSizePx", 0, winreg.REG_DWORD, taskbar_thumbnail_size)
-            winreg.CloseKey(reg_key_taskband)
-
-            # Restart Explorer to apply the changes
-            os.system("taskkill /f /im explorer.exe & start explorer.exe")
-
-            # Display success message
-            print("Taskbar settings have been successfully updated and applied.")
-            messagebox.showinfo("Success", "Taskbar settings have been successfully updated. Explorer will restart to apply the changes.")
+            registry = get_registry_snapshot()
+
+            # Position and auto-hide are patched into the StuckRects3 blob; the three keys are written in one batch
+            batch = taskbar_batch({
+                "AutoHide": auto_hide_value,
+                "Position": position_value,
+                "TaskbarSmallIcons": taskbar_icon_size,  # Small/large icons
+                "TaskbarAl": taskbar_alignment,  # Alignment, only effective in Windows 11
+                "ShowClock": taskbar_clock,  # Clock visibility
+                "TaskbarGlomLevel": taskbar_labels,  # Label visibility
+                "MinThumbSizePx": taskbar_thumbnail_size,  # Thumbnail preview size
+            }, registry)
+
+            if not plan_batch(batch, registry):
+                messagebox.showinfo("No Changes", "The taskbar settings are already applied.")
+                return
+
+            # Written together with the other views' changes by "Apply All Changes"; only values that
+            # differ are written, and Explorer is only restarted if one of them needs it
+            get_pending_changes().stage(batch)
+
+            messagebox.showinfo("Changes Staged", "Taskbar settings have been staged. Use \"Apply All Changes\" in the main menu to apply them.")
             
         except Exception as e:
             print(f"Error saving taskbar settings: {e}")
@@ -376,13 +367,13 @@ class TaskbarView(SlidingFrame):
             "TaskbarLength": 100
         }
 
+        registry = get_registry_snapshot()
+
         try:
             # Retrieve taskbar position and auto-hide from the "StuckRects3" registry key
-            reg_key_stuckrects = winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.registry_path_stuckrects, 0, winreg.KEY_READ)
-            value, _ = winreg.QueryValueEx(reg_key_stuckrects, "Settings")
+            value, _ = registry.read_value(HKCU, self.registry_path_stuckrects, "Settings")
             taskbar_values["AutoHide"] = value[8]  # Byte 8 for auto-hide setting
             taskbar_values["Position"] = value[12]  # Byte 12 for position setting
-            winreg.CloseKey(reg_key_stuckrects)
 
         except FileNotFoundError:
             print(f"Error: 'StuckRects3' registry key not found.")
@@ -391,12 +382,11 @@ class TaskbarView(SlidingFrame):
 
         try:
             # Retrieve taskbar advanced settings (icon size, alignment, clock, labels) from "Advanced" registry key
-            reg_key_advanced = winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.registry_path_advanced, 0, winreg.KEY_READ)
-            taskbar_values["TaskbarSmallIcons"], _ = winreg.QueryValueEx(reg_key_advanced, "TaskbarSmallIcons")
-            taskbar_values["TaskbarAlignment"], _ = winreg.QueryValueEx(reg_key_advanced, "TaskbarAl")  # Alignment (Windows 11)
-            taskbar_values["ShowClock"], _ = winreg.QueryValueEx(reg_key_advanced, "ShowClock")
-            taskbar_values["TaskbarGlomLevel"], _ = winreg.QueryValueEx(reg_key_advanced, "TaskbarGlomLevel")  # Labels visibility
-            winreg.CloseKey(reg_key_advanced)
+            advanced = registry.read_values(HKCU, self.registry_path_advanced, ["TaskbarSmallIcons", "TaskbarAl", "ShowClock", "TaskbarGlomLevel"])
+            for value_name, result_name in [("TaskbarSmallIcons", "TaskbarSmallIcons"), ("TaskbarAl", "TaskbarAlignment"),  # Alignment (Windows 11)
+                                            ("ShowClock", "ShowClock"), ("TaskbarGlomLevel", "TaskbarGlomLevel")]:  # Labels visibility
+                if value_name in advanced:
+                    taskbar_values[result_name] = advanced[value_name][0]
 
         except FileNotFoundError:
             print(f"Error: 'Advanced' registry key not found.")
@@ -405,9 +395,7 @@ class TaskbarView(SlidingFrame):
 
         try:
             # Retrieve thumbnail preview size from "Taskband" registry key
-            reg_key_taskband = winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.registry_path_taskband, 0, winreg.KEY_READ)
-            taskbar_values["MinThumbSizePx"], _ = winreg.QueryValueEx(reg_key_taskband, "MinThumbSizePx")  # Thumbnail preview size
-            winreg.CloseKey(reg_key_taskband)
+            taskbar_values["MinThumbSizePx"], _ = registry.read_value(HKCU, self.registry_path_taskband, "MinThumbSizePx")  # Thumbnail preview size
 
         except FileNotFoundError:
             print(f"Error: 'Taskband' registry key not found.")
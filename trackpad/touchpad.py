@@ -1,20 +1,27 @@
 # touchpad.py
 import customtkinter as ctk
-import winreg
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import os
 import tkinter as tk
 from tkinter import messagebox
-from reboot_prompt import prompt_reboot
 from widgets.button import BouncingButton
 from widgets.sliding_frames import SlidingFrame
-from configuration_manager import ScreenInfo
+from configuration_manager import get_screen_info
+from asset_loader import get_asset_loader
+from registry.registry_backend import HKLM
+from registry.pending_changes import get_pending_changes
+from registry.managed_keys import TOUCHPAD_PATH
+from registry.registry_snapshot import get_registry_snapshot
+from registry.registry_watcher import get_registry_watcher
+from trackpad.touchpad_values import TOUCHPAD_MODES, read_touchpad_values, touchpad_batch
+from lazy_imports import lazy_import
+
+# matplotlib is only needed once a trackpad view is built
+plt = lazy_import("matplotlib.pyplot")
+backend_tkagg = lazy_import("matplotlib.backends.backend_tkagg")
 
 
 class TouchpadView(SlidingFrame):
     def __init__(self, parent, controller, mode="curtains"):
-        self.screen_info = ScreenInfo()
+        self.screen_info = get_screen_info()
         super().__init__(parent, width=self.screen_info.window_width, height=self.screen_info.window_height)
         self.controller = controller
         self.mode = mode
@@ -34,26 +41,21 @@ class TouchpadView(SlidingFrame):
         # Set up UI components
         self.setup_ui()
 
+        # Follow changes made outside of the program (e.g. in Windows Settings)
+        get_registry_watcher().subscribe(self.on_registry_change, keys=[(HKLM, self.registry_path)])
+
     def configure_mode(self):
         """Configure the registry path, keys, and visual settings based on the mode."""
-        self.registry_path = r'SOFTWARE\Microsoft\Windows\CurrentVersion\PrecisionTouchPad'
-        if self.mode == "curtains":
-            self.curtain_keys = ['CurtainTop', 'CurtainLeft', 'CurtainRight']
-            self.max_top_cm = 5
-            self.max_left_right_cm = 7.5
-        elif self.mode == "supercurtains":
-            self.curtain_keys = ['SuperCurtainTop', 'SuperCurtainLeft', 'SuperCurtainRight']
-            self.max_top_cm = 5
-            self.max_left_right_cm = 7.5
-        elif self.mode == "rightclick":
-            self.curtain_keys = ['RightClickZoneWidth', 'RightClickZoneHeight']
+        self.registry_path = TOUCHPAD_PATH
+        if self.mode not in TOUCHPAD_MODES:
+            raise ValueError("Invalid mode for TouchpadView")
+        self.curtain_keys = TOUCHPAD_MODES[self.mode]
+        if self.mode == "rightclick":
             self.max_width_cm = 7.5
             self.max_height_cm = 5
         else:
-            raise ValueError("Invalid mode for TouchpadView")
-
-        # Trackpad Image Path
-        self.trackpad_img_path = os.path.join("trackpad", "gb4p16_trackpad.jpg")
+            self.max_top_cm = 5
+            self.max_left_right_cm = 7.5
 
         # Trackpad dimensions
         self.trackpad_width_cm = 15
@@ -84,12 +86,13 @@ class TouchpadView(SlidingFrame):
     def setup_image(self):
         """Set up the trackpad image display."""
         fig, self.ax = plt.subplots(figsize=(6, 4))
-        self.img = plt.imread(self.trackpad_img_path)
+        # Decoded once in the background since startup and shared by the three modes
+        self.img = get_asset_loader().result("trackpad_image")
         self.ax.imshow(self.img)
         self.ax.axis('off')
         plt.subplots_adjust(left=0, right=1, top=1, bottom=0)
 
-        self.canvas = FigureCanvasTkAgg(fig, master=self.scrollable_frame)
+        self.canvas = backend_tkagg.FigureCanvasTkAgg(fig, master=self.scrollable_frame)
         self.canvas.get_tk_widget().pack(pady=10)
 
     def create_slider_input(self):
@@ -149,18 +152,18 @@ class TouchpadView(SlidingFrame):
         """Retrieve current registry values based on mode."""
         values = {}
         try:
-            reg_key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, self.registry_path, 0, winreg.KEY_READ)
+            found = read_touchpad_values(get_registry_snapshot(), self.curtain_keys)
             for key in self.curtain_keys:
-                try:
-                    value, _ = winreg.QueryValueEx(reg_key, key)
-                    values[key] = value
-                except FileNotFoundError:
-                    values[key] = 0
-            winreg.CloseKey(reg_key)
+                values[key] = found.get(key, 0)
         except Exception as e:
             print(f"Error reading registry values: {e}")
         return values
 
+    def on_registry_change(self, changes):
+        """Show registry values that were changed outside of the program."""
+        if any(name in self.curtain_keys for _, _, name in changes):
+            self.initialize_slider_values()
+
     def update_image(self):
         """Update the trackpad image based on slider values."""
         self.ax.clear()
@@ -263,17 +266,16 @@ class TouchpadView(SlidingFrame):
             for key in self.curtain_keys
         }
         self.set_values(values)
-        prompt_reboot()
 
     def set_values(self, values):
-        """Set the new values in the registry."""
+        """Stage the new values; they are written by "Apply All Changes" in the main menu."""
         try:
-            reg_key = winreg.CreateKey(winreg.HKEY_LOCAL_MACHINE, self.registry_path)
-            for key, value in values.items():
-                winreg.SetValueEx(reg_key, key, 0, winreg.REG_DWORD, int(value))
-            winreg.CloseKey(reg_key)
+            get_pending_changes().stage(touchpad_batch(values))
         except Exception as e:
-            print(f"Error setting registry values: {e}")
+            print(f"Error staging registry values: {e}")
+            messagebox.showerror("Error", f"Error staging registry values: {e}")
+            return
+        messagebox.showinfo("Changes Staged", "Touchpad settings have been staged. Use \"Apply All Changes\" in the main menu to apply them.")
 
     def back_to_main_menu(self):
         """Return to the main menu."""
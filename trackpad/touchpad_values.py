@@ -0,0 +1,28 @@
+# touchpad_values.py
+from registry.managed_keys import TOUCHPAD_PATH
+from registry.registry_backend import HKLM, REG_DWORD, WriteBatch
+
+# Registry values edited by each touchpad mode, in 1/1000 cm
+TOUCHPAD_MODES = {
+    "curtains": ['CurtainTop', 'CurtainLeft', 'CurtainRight'],
+    "supercurtains": ['SuperCurtainTop', 'SuperCurtainLeft', 'SuperCurtainRight'],
+    "rightclick": ['RightClickZoneWidth', 'RightClickZoneHeight'],
+}
+
+TOUCHPAD_VALUES = [name for names in TOUCHPAD_MODES.values() for name in names]
+
+
+def touchpad_batch(values):
+    """WriteBatch setting touchpad values ({name: 1/1000 cm})."""
+    batch = WriteBatch()
+    for name, value in values.items():
+        batch.set(HKLM, TOUCHPAD_PATH, name, int(value), REG_DWORD)
+    return batch
+
+
+def read_touchpad_values(registry, names=TOUCHPAD_VALUES):
+    """Current touchpad values by name; values that are not set are missing."""
+    try:
+        return {name: value for name, (value, _) in registry.read_values(HKLM, TOUCHPAD_PATH, list(names)).items()}
+    except FileNotFoundError:
+        return {}
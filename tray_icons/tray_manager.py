@@ -1,23 +1,23 @@
 # tray_manager.py
 import os
-import psutil
-from pystray import Icon as TrayIcon, Menu as TrayMenu, MenuItem as TrayMenuItem
-from PIL import Image
-from battery.display_discharge import stop_monitoring, start_tray_icon
-import json
-import win32gui
-import win32con
+from asset_loader import get_asset_loader
+from lazy_imports import lazy_import
+from settings.settings_store import get_settings_store
+
+# pystray, pywin32 and the battery monitor (wmi, pythoncom) are loaded when first used
+pystray = lazy_import("pystray")
+win32gui = lazy_import("win32gui")
+win32con = lazy_import("win32con")
+display_discharge = lazy_import("battery.display_discharge")
 
 tray_icon = None  # Global variable to keep track of the main tray icon
 battery_icon = None  # Global variable to keep track of the battery discharge icon
-SETTINGS_FILE = "settings/settings.json"  # File to store settings
 
 # Create the tray icon image
 def create_image():
     """Create the tray icon image."""
     try:
-        image = Image.open('tray_icons/registry.png')  # Specify the path to your icon file
-        return image
+        return get_asset_loader().result("app_icon")  # Decoded in the background at startup
     except Exception as e:
         print(f"Error loading tray icon image: {e}")
         return None
@@ -28,24 +28,16 @@ def start_main_tray_icon():
     global tray_icon, battery_icon
     image = create_image()
     if image:
-        menu = TrayMenu(
-            TrayMenuItem('Restore', restore_application),
-            TrayMenuItem('Quit', quit_application)
+        menu = pystray.Menu(
+            pystray.MenuItem('Restore', restore_application),
+            pystray.MenuItem('Quit', quit_application)
         )
-        tray_icon = TrayIcon("MyWindows", image, menu=menu)
+        tray_icon = pystray.Icon("MyWindows", image, menu=menu)
         tray_icon.run_detached()  # Detach so that it runs in the background
     else:
         print("Could not create tray icon due to missing image.")
         
-    # Load the settings properly
-    try:
-        with open(SETTINGS_FILE, 'r') as f:
-            settings = json.load(f)
-    except FileNotFoundError:
-        print(f"Settings file '{SETTINGS_FILE}' not found. Skipping battery discharge icon.")
-        settings = {}
-        
-    if settings.get('Display discharge rate', False):
+    if get_settings_store().settings.display_discharge_rate:
         start_battery_discharge_icon()
         
     return tray_icon
@@ -89,6 +81,7 @@ def quit_application(icon, item):
         battery_icon = None
     stop_main_tray_icon()  # Quit the main tray icon
     tray_icon = None
+    get_settings_store().flush()  # os._exit skips atexit handlers
     os._exit(0)
 
 # Stop the battery discharge tray icon if running
@@ -96,14 +89,14 @@ def stop_battery_discharge_icon():
     """Stop the battery discharge tray icon if it is running."""
     global battery_icon
     if battery_icon:
-        stop_monitoring(battery_icon)
+        display_discharge.stop_monitoring(battery_icon)
         battery_icon = None
 
 def start_battery_discharge_icon():
     """Start the battery discharge tray icon."""
     global battery_icon
     if not battery_icon:
-        battery_icon = start_tray_icon()
+        battery_icon = display_discharge.start_tray_icon()
 
 # Helper function to check if a specific tray icon process is running (battery discharge)
 def is_battery_discharge_running():
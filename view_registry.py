@@ -0,0 +1,95 @@
+# view_registry.py
+from collections import deque
+from startup_profiler import profiler
+
+
+class ViewRegistry:
+    """Map frame keys to view factories and build each view on first use.
+
+    Views that are likely to be opened next can be queued for prewarming, in which
+    case they are built one per Tk idle slice so the UI keeps processing events
+    between constructions.
+    """
+
+    def __init__(self, root, slice_gap_ms=30):
+        self.root = root
+        self.slice_gap_ms = slice_gap_ms  # Pause between two prewarm slices so input events get through
+
+        self._factories = {}
+        self._views = {}
+        self._next_likely = {}
+        self._prewarm_queue = deque()
+        self._prewarm_scheduled = False
+
+    def register(self, key, factory, next_likely=()):
+        """Register a factory for the given frame key.
+
+        `next_likely` lists the keys the user usually opens from this view; they are
+        prewarmed as soon as this view is shown.
+        """
+        self._factories[key] = factory
+        self._next_likely[key] = tuple(next_likely)
+
+    def register_instance(self, key, view, next_likely=()):
+        """Register a view that has already been built."""
+        self._views[key] = view
+        self._next_likely[key] = tuple(next_likely)
+
+    def __contains__(self, key):
+        return key in self._views or key in self._factories
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def get(self, key):
+        """Return the view for the key, building it now if it does not exist yet."""
+        view = self._views.get(key)
+        if view is None:
+            factory = self._factories[key]
+            with profiler.phase(f"view {key}"):
+                view = factory()
+            self._views[key] = view
+        return view
+
+    def is_built(self, key):
+        return key in self._views
+
+    def values(self):
+        """Return the views that have been built so far."""
+        return list(self._views.values())
+
+    def build_all(self):
+        """Build every registered view immediately (the old eager behaviour)."""
+        for key in self._factories:
+            self.get(key)
+
+    def hint(self, key):
+        """Prewarm the views that are likely to be opened after the given one."""
+        self.prewarm(self._next_likely.get(key, ()))
+
+    def prewarm(self, keys):
+        """Queue views to be built in Tk idle time, one view per slice."""
+        for key in keys:
+            if key in self._factories and not self.is_built(key) and key not in self._prewarm_queue:
+                self._prewarm_queue.append(key)
+
+        if self._prewarm_queue and not self._prewarm_scheduled:
+            self._prewarm_scheduled = True
+            self.root.after_idle(self._prewarm_step)
+
+    def _prewarm_step(self):
+        """Build the next queued view, then yield back to the event loop."""
+        while self._prewarm_queue:
+            key = self._prewarm_queue.popleft()
+            if not self.is_built(key):
+                try:
+                    self.get(key)
+                except Exception as e:
+                    print(f"Error prewarming view '{key}': {e}")
+                break
+
+        if self._prewarm_queue:
+            # Wait a little before the next idle slice so pending input is handled first
+            self.root.after(self.slice_gap_ms, lambda: self.root.after_idle(self._prewarm_step))
+        else:
+            self._prewarm_scheduled = False
@@ -1,5 +1,5 @@
 import customtkinter as ctk
-from configuration_manager import ScreenInfo
+from configuration_manager import get_screen_info
 
 class SlidingFrame(ctk.CTkFrame):
     # Class-level attribute to track global animation state across all instances
@@ -7,7 +7,7 @@ class SlidingFrame(ctk.CTkFrame):
 
     def __init__(self, parent, width=None, height=None, x=None, y=None, slide_out_x=None, slide_out_y=None, **kwargs):
         """Initialize the SlidingFrame with fixed dimensions."""
-        self.screen_info = ScreenInfo()
+        self.screen_info = get_screen_info()
         self.width = width if width is not None else self.screen_info.window_width
         self.height = height if height is not None else self.screen_info.window_height
 
@@ -0,0 +1,160 @@
+import customtkinter as ctk
+
+
+class ListModel:
+    """Rows shown by a VirtualList. Changes are reported to subscribers as
+    (event, index, count) with event "insert", "remove", "update" or "reset".
+    """
+
+    def __init__(self, items=()):
+        self._items = list(items)
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def _notify(self, event, index, count):
+        for callback in self._subscribers:
+            callback(event, index, count)
+
+    def insert(self, index, item):
+        index = max(0, min(index, len(self._items)))
+        self._items.insert(index, item)
+        self._notify("insert", index, 1)
+
+    def append(self, item):
+        self.insert(len(self._items), item)
+
+    def remove(self, index):
+        del self._items[index]
+        self._notify("remove", index, 1)
+
+    def update(self, index, item):
+        self._items[index] = item
+        self._notify("update", index, 1)
+
+    def reset(self, items=()):
+        self._items = list(items)
+        self._notify("reset", 0, len(self._items))
+
+    def clear(self):
+        self.reset()
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class VirtualList(ctk.CTkFrame):
+    """Scrollable list that only has widgets for the visible rows.
+
+    The row labels are created once for the height of the list and reused while
+    scrolling; a model change only re-renders the visible rows it touches, so adding
+    a row costs the same with ten rows as with ten thousand.
+    """
+
+    def __init__(self, master, model, width=400, height=200, row_height=30, render=None, **kwargs):
+        super().__init__(master, width=width, height=height, **kwargs)
+        self.model = model
+        self.row_height = row_height
+        self.render = render or (lambda label, item: label.configure(text=str(item)))
+        self.first = 0  # Index of the top visible row
+        self.rows = []
+        self.shown = set()  # Positions of the row labels that are gridded
+
+        self.grid_propagate(False)
+        self.grid_columnconfigure(0, weight=1)
+        self.rows_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.rows_frame.grid(row=0, column=0, sticky="nsew")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky="ns")
+        self.grid_rowconfigure(0, weight=1)
+
+        self.visible_count = max(height // row_height, 1)
+        self.ensure_rows(self.visible_count)
+
+        self.bind("<Configure>", self.on_resize)
+        self.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.rows_frame.bind("<MouseWheel>", self.on_mouse_wheel)
+        model.subscribe(self.on_model_change)
+        self.refresh()
+
+    def ensure_rows(self, count):
+        """Create row labels until there are `count`; they are never destroyed."""
+        while len(self.rows) < count:
+            label = ctk.CTkLabel(self.rows_frame, text="", height=self.row_height)
+            label.bind("<MouseWheel>", self.on_mouse_wheel)
+            self.rows.append(label)
+
+    def on_resize(self, event):
+        visible_count = max(event.height // self.row_height, 1)
+        if visible_count != self.visible_count:
+            self.visible_count = visible_count
+            self.ensure_rows(visible_count)
+            # Growing at the bottom of the list shows more rows above instead of blank ones below
+            self.first = max(0, min(self.first, len(self.model) - visible_count))
+            self.refresh()
+
+    def scroll_to(self, first):
+        first = max(0, min(first, len(self.model) - self.visible_count))
+        if first != self.first:
+            self.first = first
+            self.refresh()
+
+    def on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(round(float(amount) * len(self.model)))
+        elif action == "scroll":
+            step = self.visible_count if unit == "pages" else 1
+            self.scroll_to(self.first + int(amount) * step)
+
+    def on_mouse_wheel(self, event):
+        self.scroll_to(self.first - int(event.delta / 120) * 3)
+
+    def on_model_change(self, event, index, count):
+        if event == "update":
+            if self.first <= index < self.first + self.visible_count:
+                self.render_row(index - self.first)
+            return
+        if event == "insert" and index >= self.first + self.visible_count:
+            # Added below the visible rows: scroll down so the new row is seen
+            self.first = max(len(self.model) - self.visible_count, 0)
+            self.refresh()
+            return
+
+        first = max(0, min(self.first, len(self.model) - self.visible_count))
+        start = 0 if first != self.first else max(index - first, 0)
+        self.first = first
+        self.refresh(start)
+
+    def render_row(self, position):
+        label = self.rows[position]
+        index = self.first + position
+        if index < len(self.model):
+            self.render(label, self.model[index])
+            if position not in self.shown:
+                label.grid(row=position, column=0, sticky="ew")
+                self.shown.add(position)
+        elif position in self.shown:
+            label.grid_remove()
+            self.shown.discard(position)
+
+    def refresh(self, start=0):
+        """Re-render the visible rows from position `start` down and update the scrollbar."""
+        for position in range(start, len(self.rows)):
+            if position < self.visible_count:
+                self.render_row(position)
+            elif position in self.shown:
+                self.rows[position].grid_remove()
+                self.shown.discard(position)
+
+        total = len(self.model)
+        if total <= self.visible_count:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.first / total, (self.first + self.visible_count) / total)